@@ -34,6 +34,8 @@ class Settings(BaseSettings):
 
     # Database Settings (Optional - for future use)
     DATABASE_URL: Optional[str] = None
+    SQLITE_PATH: str = "data/monitoring.db"   # 로컬 운영 상태 저장소 (임계값 변경 이력, 알림 이벤트)
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000       # 다른 연결이 잠금을 잡고 있을 때 대기 시간 (VACUUM 중 임계값 저장 등)
 
     # JWT Settings
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
@@ -42,6 +44,96 @@ class Settings(BaseSettings):
 
     # Data Generation Settings
     ZONE_COUNT: int = 5  # 5개 지(池)
+    TOPOLOGY_PATH: Optional[str] = None    # 처리장/지/설치 센서 구성 JSON (없으면 ZONE_COUNT개 지의 기본 구성)
+    SIMULATION_SEED: int = 20240101        # 모의 데이터 시드 (같은 시드면 같은 시각에 항상 같은 값)
+    SIMULATION_FEATURES: int = 16          # 채널별 AR(1) 변동 특징 수 (클수록 정규분포에 가깝고 계산량 비례)
+    SIMULATION_EVENT_RATE: float = 0.3     # 하루당 부하 충격(강우/유입 부하 급증) 발생 확률
+
+    # Query Admission Control (이력/내보내기 요청 비용 제한)
+    HISTORY_MAX_ROWS: int = 500000        # 이력 조회 요청당 최대 행 수
+    EXPORT_MAX_ROWS: int = 2000000        # 스트림 내보내기(Arrow) 요청당 최대 행 수
+    EXCEL_MAX_ROWS: int = 1048575         # Excel 내보내기 요청당 최대 행 수 (시트 한도 1,048,576행 - 머리글 1행 이하)
+    HEAVY_QUERY_ROWS: int = 50000         # 이 행 수 이상은 무거운 요청으로 분류
+    HEAVY_QUERY_CONCURRENCY: int = 2      # 무거운 요청 동시 처리 한도
+    HEAVY_QUERY_RETRY_AFTER: int = 5      # 429 응답 Retry-After (초)
+
+    # History Query Cache
+    HISTORY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024   # 캐시 전체 크기 예산
+    HISTORY_CACHE_LIVE_TTL: int = 30                   # 현재 시각을 포함하는 범위의 캐시 유지 시간 (초)
+
+    # Forecast Engine (감쇠 추세 Holt 지수평활)
+    FORECAST_LEVEL_SECONDS: float = 300       # 수준 평활 시정수 (초)
+    FORECAST_TREND_SECONDS: float = 3600      # 추세 평활 시정수 (초)
+    FORECAST_DAMPING_SECONDS: float = 3600    # 추세 감쇠 시간 (초)
+    FORECAST_HORIZONS: list = [1, 2, 3, 6, 12, 24]   # 예측 곡선 기본 시점 (시간)
+    FORECAST_MAX_HORIZON: int = 48                    # 최대 예측 시점 (시간)
+
+    # Inference Service (예측 모델 추론 워커)
+    FORECAST_MODEL: str = "app.services.inference:HoltForecastModel"   # "모듈:클래스" 형식
+    INFERENCE_WORKERS: int = 1              # 추론 워커 프로세스 수 (0: 스레드에서 실행)
+    INFERENCE_BATCH_WINDOW_MS: float = 5    # 마이크로 배치 수집 시간 (ms)
+    INFERENCE_MAX_BATCH: int = 32           # 배치당 최대 요청 수
+    INFERENCE_DEADLINE_MS: float = 250      # 요청당 응답 기한 (초과 시 마지막 정상 예측 사용)
+
+    # Alarm State Machine (알림 발생/해제 판정)
+    ALARM_HYSTERESIS_RATIO: float = 0.02       # 해제 판정 안쪽 여유 (임계 범위 대비 비율)
+    ALARM_RAISE_SECONDS: float = 10            # 임계값 이탈이 이 시간 이상 지속되면 발생
+    ALARM_CLEAR_SECONDS: float = 30            # 정상 범위 복귀가 이 시간 이상 지속되면 해제
+    ALARM_MIN_INTERVAL_SECONDS: float = 60     # 채널별 상태 변경 최소 간격
+    ALARM_MAX_EVENTS_PER_MINUTE: int = 60      # 전체 알림 이벤트 분당 상한 (초과분은 다음 갱신으로 보류)
+    ALARM_RECENT_EVENTS: int = 200             # 메모리에 보관할 최근 이벤트 수
+
+    # Rolling Statistics (채널별 이동 통계/이상 점수)
+    STATS_EWMA_SECONDS: float = 600        # EWMA 평균/분산 시정수 (초)
+    STATS_WINDOW_SECONDS: float = 3600     # 이동 최소/최대 집계 구간 (초)
+    STATS_WINDOW_BUCKETS: int = 12         # 집계 구간 분할 수 (구간 경계 정밀도 = 구간 / 분할 수)
+    STATS_ZSCORE_ALERT: float = 3.0        # 이상 채널로 표시할 |z-score| 기준
+    STATS_MIN_SAMPLES: int = 10            # z-score 계산 시작 측정 횟수
+
+    # Runtime Metrics (/metrics, Prometheus 텍스트 형식)
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5    # 이벤트 루프 지연 측정 주기 (0: 측정 안 함)
+
+    # Recent Trend (채널별 최근 추이 링 버퍼, 스파크라인용)
+    TREND_MAX_SECONDS: float = 6 * 3600        # 보관 구간 (조회 가능한 최대 구간)
+    TREND_RESOLUTION_SECONDS: float = 30       # 버킷 길이 (버킷마다 마지막 측정값 유지)
+
+    # Sensor Ingestion (외부 센서 측정값 수집)
+    LIVE_SOURCE: str = "mock"                  # 지별 센서 실시간 데이터 출처 (mock: 모의 데이터, ingest: 수집 데이터, replay: 녹화 재생)
+    READINGS_PATH: str = "data/readings.db"    # 수집 측정값 저장 파일
+    INGEST_MAX_BODY_BYTES: int = 16 * 1024 * 1024   # 수집 요청 본문 최대 크기
+    INGEST_MAX_ROWS: int = 100000              # 요청당 최대 측정값 수
+    INGEST_MAX_ERRORS: int = 20                # 응답에 포함할 거부 행 상세 수
+    INGEST_MAX_AGE_SECONDS: float = 86400      # 이보다 오래된 측정값은 거부
+    INGEST_MAX_SKEW_SECONDS: float = 60        # 서버 시각보다 이만큼 이후인 측정값은 거부
+    INGEST_COMMIT_ROWS: int = 2000             # 모인 측정값이 이 수 이상이면 즉시 커밋
+    INGEST_COMMIT_INTERVAL_MS: float = 50      # 그 외 커밋 주기 (배치 대기 시간 상한)
+    INGEST_BROADCAST_INTERVAL_MS: float = 1000 # 수집 데이터 실시간 전송 최소 간격
+    INGEST_QUEUE_BATCHES: int = 64             # 처리 대기 배치가 이 수 이상이면 TCP 수신 일시 중지
+
+    # Segment Storage (수집 측정값 압축 세그먼트 보관)
+    SEGMENT_PATH: str = "data/segments"        # 봉인된 세그먼트 파일 디렉터리
+    SEGMENT_SECONDS: int = 86400               # 세그먼트 기간 (초, 이 단위로 봉인)
+
+    # Background Maintenance (세그먼트 봉인, 시간 요약, 보관 기간 정리, 병합/VACUUM)
+    MAINTENANCE_INTERVAL_SECONDS: float = 600          # 정리 작업 주기
+    ROLLUP_AFTER_DAYS: float = 7                       # 이 기간이 지난 세그먼트는 시간별 요약 생성
+    RAW_RETENTION_DAYS: float = 90                     # 원본 측정값 보관 기간 (0: 무기한, 요약은 유지)
+    ROLLUP_RETENTION_DAYS: float = 0                   # 시간별 요약 보관 기간 (0: 무기한)
+    ALARM_RETENTION_DAYS: float = 365                  # 알림 이벤트 기록 보관 기간 (0: 무기한)
+    MAINTENANCE_QUIET_HOURS: str = "2-5"               # 병합/VACUUM 실행 시간대 (로컬 시각 "시작-끝", 끝 미포함)
+    MERGE_SEGMENT_DAYS: int = 30                       # 요약이 끝난 세그먼트를 이 기간 단위 파일로 병합 (0: 병합 안 함)
+    VACUUM_MIN_FREE_RATIO: float = 0.2                 # 빈 페이지 비율이 이 이상이면 VACUUM
+    MAINTENANCE_IO_BYTES_PER_SECOND: int = 8 * 1024 * 1024   # 정리 작업 디스크 처리량 상한
+
+    # Line Protocol Ingestion (게이트웨이 TCP 수집)
+    LINE_PROTOCOL_HOST: str = "127.0.0.1"             # 인증 없는 쓰기 수신이므로 기본은 로컬만 (게이트웨이망 주소로 지정)
+    LINE_PROTOCOL_PORT: int = 8089                     # 0이면 사용 안 함 (LIVE_SOURCE=ingest일 때만 수신)
+    LINE_PROTOCOL_BUFFER_BYTES: int = 256 * 1024       # 연결당 수신 버퍼 (최대 줄 길이)
+
+    # Recording Replay (LIVE_SOURCE=replay, 녹화 파일 재생)
+    REPLAY_PATH: Optional[str] = None          # 녹화 파일 (.csv / .parquet / .ndjson)
+    REPLAY_SPEED: float = 1.0                  # 재생 배속 (1, 10, 100 ...)
+    REPLAY_LOOP: bool = False                  # 끝나면 처음부터 반복 (시각은 녹화 길이만큼 이어서 증가)
 
     # Default Thresholds
     DEFAULT_PROCESS_THRESHOLDS: dict = {
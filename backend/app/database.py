@@ -0,0 +1,43 @@
+"""
+로컬 SQLite 저장소 연결
+임계값 변경 이력 등 서버 재시작 후에도 유지해야 하는 운영 상태 저장용
+"""
+import sqlite3
+from pathlib import Path
+
+from app.config import settings
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """
+    SQLite 연결 생성 (디렉터리 자동 생성)
+    - WAL 저널: 쓰기 중에도 읽기 가능, 커밋마다 fsync (synchronous=FULL)
+    - 여러 스레드(threadpool)에서 사용하므로 호출 측에서 잠금으로 직렬화
+    - 같은 파일을 여는 다른 연결(임계값 저장소 ↔ 알림 기록 VACUUM)이 잠금을 잡고 있으면
+      SQLITE_BUSY_TIMEOUT_MS까지 기다린 뒤 실패 (바로 "database is locked" 방지)
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def vacuum_sqlite(conn: sqlite3.Connection, min_free_ratio: float) -> int:
+    """
+    빈 페이지 비율이 기준 이상이면 VACUUM 후 WAL 파일 비우기 (줄어든 바이트 수 반환)
+    VACUUM은 파일 전체를 다시 쓰므로 호출 측 잠금을 잡은 채 한가한 시간대에만 실행
+    (다른 연결의 트랜잭션이 끝날 때까지 busy_timeout만큼 대기, 그래도 잠겨 있으면 예외 → 다음 주기에 재시도)
+    """
+    if conn is None:
+        return 0
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not pages or free / pages < min_free_ratio:
+        return 0
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return (pages - conn.execute("PRAGMA page_count").fetchone()[0]) * page_size
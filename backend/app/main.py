@@ -7,8 +7,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from app.config import settings
-from app.routers import monitoring, prediction, history, export, settings as settings_router
-from app.websocket.connection import manager, start_data_streaming
+from app.routers import monitoring, prediction, history, export, ingest, metrics, settings as settings_router
+from app.websocket.connection import manager, send_snapshot, start_data_streaming, start_ingest_streaming
+from app.services.inference import inference_service
+from app.services.alarm_engine import alarm_engine
+from app.services.line_protocol import line_protocol_server
+from app.services.maintenance import maintenance_service
+from app.services.metrics import MetricsMiddleware, http_request_seconds, loop_lag_monitor
+from app.services.reading_store import reading_store
+from app.services.threshold_store import threshold_store
+from app.services.topology import plant_topology
+from app.services.trend import parse_window, trend_buffer
+from typing import Optional
 import asyncio
 import os
 from pathlib import Path
@@ -32,6 +42,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 처리 시간 계측 (/metrics)
+app.add_middleware(MetricsMiddleware, histogram=http_request_seconds)
+
 
 # 라우터 등록
 app.include_router(monitoring.router)
@@ -39,6 +52,8 @@ app.include_router(prediction.router)
 app.include_router(history.router)
 app.include_router(export.router)
 app.include_router(settings_router.router)
+app.include_router(ingest.router)
+app.include_router(metrics.router)
 
 
 # 정적 파일 서빙 (프로덕션 모드)
@@ -88,16 +103,35 @@ async def health_check():
 
 # WebSocket 엔드포인트
 @app.websocket("/ws/monitoring")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, plant: Optional[str] = None, trend: Optional[str] = None):
     """
     WebSocket 실시간 데이터 스트리밍
+    - plant 쿼리(처리장 id)를 주면 지별 센서 데이터는 해당 처리장 지만 전송
+    - 연결 직후 현재 상태(snapshot) 전송, trend 쿼리(예: 2h)를 주면 채널별 최근 추이 포함
     - 5초마다 센서 데이터 전송
     - 10초마다 TMS 데이터 전송
     - 15초마다 처리장 공종 현황 전송
     - 30초마다 예측 데이터 전송
-    - 7초마다 알림 데이터 전송
+    - 알림 발생/해제 시 알림 데이터 전송
     """
-    await manager.connect(websocket)
+    selected = None
+    if plant is not None:
+        selected = plant_topology.plant(plant)
+        if selected is None:
+            await websocket.close(code=1008)
+            return
+    trend_seconds = None
+    if trend is not None:
+        try:
+            trend_seconds = parse_window(trend)
+        except ValueError:
+            trend_seconds = None
+        if trend_seconds is None or trend_seconds > trend_buffer.max_seconds:
+            await websocket.close(code=1008)
+            return
+
+    await manager.connect(websocket, selected)
+    await send_snapshot(websocket, selected, trend_seconds)
     try:
         # 클라이언트로부터 메시지 수신 대기
         while True:
@@ -121,8 +155,32 @@ async def startup_event():
     print(f"[WEBSOCKET] ws://{settings.HOST}:{settings.PORT}/ws/monitoring")
     print("=" * 80)
 
-    # WebSocket 데이터 스트리밍 시작
+    # 저장된 임계값 적재, 알림 이벤트 기록 파일 열기
+    threshold_store.open(settings.SQLITE_PATH)
+    alarm_engine.open(settings.SQLITE_PATH)
+
+    # 수집 측정값 저장소 열기, 그룹 커밋 루프 시작
+    reading_store.open(settings.READINGS_PATH)
+    await reading_store.start()
+
+    # 이력 데이터 정리 (세그먼트 봉인, 시간 요약, 보관 기간, 한가한 시간대 병합/VACUUM)
+    await maintenance_service.start()
+
+    # 예측 추론 워커 풀 기동 (모델 로드 및 워밍업)
+    await inference_service.start()
+
+    # WebSocket 데이터 스트리밍 시작 (수집 데이터는 들어온 경우에만 전송)
+    if settings.LIVE_SOURCE == "replay" and not settings.REPLAY_PATH:
+        raise RuntimeError("LIVE_SOURCE=replay에는 REPLAY_PATH 설정이 필요합니다.")
     asyncio.create_task(start_data_streaming())
+    asyncio.create_task(start_ingest_streaming())
+
+    # 게이트웨이 라인 프로토콜 수신 시작 (수집 데이터를 사용할 때만)
+    if settings.LIVE_SOURCE == "ingest":
+        await line_protocol_server.start()
+
+    # 이벤트 루프 지연 측정 (/metrics)
+    await loop_lag_monitor.start()
 
 
 # 앱 종료 시 실행
@@ -130,6 +188,14 @@ async def startup_event():
 async def shutdown_event():
     """앱 종료 시 실행되는 이벤트"""
     print("\n[SHUTDOWN] Shutting down API server...")
+    await loop_lag_monitor.stop()
+    await inference_service.stop()
+    await line_protocol_server.stop()
+    await maintenance_service.stop()
+    await reading_store.stop()
+    reading_store.close()
+    threshold_store.close()
+    alarm_engine.close()
 
 
 if __name__ == "__main__":
@@ -142,6 +142,7 @@ class SensorDataHistoryRequest(BaseModel):
     interval: Literal["hour", "minute"] = "hour"
     page: int = Field(1, ge=1)
     pageSize: int = Field(15, ge=1, le=10000)
+    format: Literal["rows", "columnar"] = Field("rows", description="응답 형식: rows / columnar")
 
 
 class SensorDataRecord(BaseModel):
@@ -171,6 +172,7 @@ class PredictionHistoryRequest(BaseModel):
     interval: Literal["hour", "minute"] = "hour"
     page: int = Field(1, ge=1)
     pageSize: int = Field(15, ge=1, le=10000)
+    format: Literal["rows", "columnar"] = Field("rows", description="응답 형식: rows / columnar")
 
 
 class PredictionRecord(BaseModel):
@@ -192,6 +194,84 @@ class PredictionHistoryResponse(BaseModel):
     data: List[PredictionRecord]
 
 
+class HistoryTimestamps(BaseModel):
+    """컬럼형 응답 타임스탬프 (고정 간격이면 start/step, 아니면 values)"""
+    count: int
+    start: Optional[str] = None
+    step: Optional[float] = Field(None, description="간격 (초)")
+    repeat: Optional[int] = Field(None, description="동일 시각 반복 횟수 (전체 지 조회 시 지 개수)")
+    offset: Optional[int] = Field(None, description="첫 묶음에서 생략된 레코드 수")
+    values: Optional[List[Optional[str]]] = None
+
+
+class ColumnarHistoryResponse(BaseModel):
+    """컬럼형 이력 응답 (format=columnar)"""
+    total: int
+    page: int
+    pageSize: int
+    totalPages: int
+    format: Literal["columnar"] = "columnar"
+    timestamps: HistoryTimestamps
+    columns: dict[str, list]
+    constants: dict
+
+
+class ChartSeriesRequest(BaseModel):
+    """차트용 다운샘플링 시계열 요청"""
+    zone: str = Field(..., description="지 번호 (예: 1)")
+    processType: Literal["anaerobic", "anoxic", "aerobic"]
+    sensor: Literal["orp", "ph", "do", "mlss"]
+    startDateTime: datetime
+    endDateTime: datetime
+    interval: Literal["hour", "minute"] = "minute"
+    points: int = Field(1000, ge=3, le=10000, description="목표 포인트 수 (차트 가로 픽셀 수 수준)")
+
+
+class ChartSeriesResponse(BaseModel):
+    """차트용 다운샘플링 시계열 응답"""
+    zone: str
+    processType: str
+    sensor: str
+    total: int = Field(..., description="다운샘플링 전 포인트 수")
+    points: int = Field(..., description="반환 포인트 수")
+    timestamps: List[str]
+    values: List[float]
+
+
+class AggregationRequest(BaseModel):
+    """시간 버킷 집계 요청"""
+    zone: str = Field("all", description="지 번호 또는 'all'")
+    processType: Literal["anaerobic", "anoxic", "aerobic", "all"] = Field("all", description="anaerobic / anoxic / aerobic / all")
+    sensor: Literal["orp", "ph", "do", "mlss", "all"] = Field("all", description="orp / ph / do / mlss / all")
+    groupBy: List[Literal["zone", "reactor", "sensor"]] = Field(
+        ["zone", "reactor", "sensor"], description="그룹 기준 (생략된 차원은 합쳐서 집계)"
+    )
+    startDateTime: datetime
+    endDateTime: datetime
+    interval: Literal["hour", "minute"] = Field("minute", description="원본 데이터 간격")
+    bucket: str = Field("1h", pattern=r"^\d+[mhd]$", description="버킷 폭 (예: 15m, 1h, 1d)")
+    statistics: List[str] = Field(
+        ["min", "max", "mean"], min_length=1,
+        description="count / sum / min / max / mean / std / median / pNN (예: p95)"
+    )
+
+
+class AggregationGroup(BaseModel):
+    """집계 그룹 결과"""
+    zone: Optional[str] = None
+    processType: Optional[str] = None
+    sensor: Optional[str] = None
+    buckets: List[str] = Field(..., description="버킷 시작 시각")
+    values: dict[str, List[float]] = Field(..., description="통계 이름별 버킷 값")
+
+
+class AggregationResponse(BaseModel):
+    """시간 버킷 집계 응답"""
+    bucket: str
+    statistics: List[str]
+    groups: List[AggregationGroup]
+
+
 class AlarmProcessHistoryRequest(BaseModel):
     """공종 알림 이력 조회 요청"""
     zone: str = Field("all")
@@ -202,6 +282,7 @@ class AlarmProcessHistoryRequest(BaseModel):
     interval: Literal["hour", "minute"] = "hour"
     page: int = Field(1, ge=1)
     pageSize: int = Field(15, ge=1, le=10000)
+    format: Literal["rows", "columnar"] = Field("rows", description="응답 형식: rows / columnar")
 
 
 class AlarmProcessRecord(BaseModel):
@@ -234,6 +315,7 @@ class AlarmPredictionHistoryRequest(BaseModel):
     interval: Literal["hour", "minute"] = "hour"
     page: int = Field(1, ge=1)
     pageSize: int = Field(15, ge=1, le=10000)
+    format: Literal["rows", "columnar"] = Field("rows", description="응답 형식: rows / columnar")
 
 
 class AlarmPredictionRecord(BaseModel):
@@ -281,12 +363,17 @@ class ThresholdsResponse(BaseModel):
     effluent: EffluentThresholds
     lastUpdated: datetime
     updatedBy: str = "system"
+    version: int = Field(1, description="임계값 버전 (변경 시마다 1씩 증가)")
 
 
 class ThresholdsUpdateRequest(BaseModel):
-    """임계값 저장 요청"""
+    """
+    임계값 저장 요청
+    - updatedBy: 요청 측이 적어 보내는 변경자 표시 (인증된 사용자 식별자가 아님, 감사 근거로 쓰지 말 것)
+    """
     category: Literal["process", "effluent"]
     thresholds: dict
+    updatedBy: str = Field("admin", min_length=1, max_length=100, description="변경자 표시 (요청 측 입력, 인증 안 됨)")
 
 
 class ThresholdsUpdateResponse(BaseModel):
@@ -294,6 +381,40 @@ class ThresholdsUpdateResponse(BaseModel):
     success: bool
     message: str
     timestamp: datetime
+    version: Optional[int] = Field(None, description="저장 후 임계값 버전")
+
+
+class ThresholdChange(BaseModel):
+    """임계값 변경 이력 항목"""
+    version: int
+    category: str = Field(..., description="process / effluent (all: 최초 기록)")
+    changes: dict = Field(..., description="요청한 변경 내용")
+    updatedAt: datetime
+    updatedBy: str = Field(..., description="저장 요청의 변경자 표시 (인증 안 됨)")
+
+
+class ThresholdHistoryResponse(BaseModel):
+    """임계값 변경 이력 응답"""
+    history: List[ThresholdChange]
+
+
+# ============================================================================
+# Ingest API Models
+# ============================================================================
+
+class IngestRejectedRow(BaseModel):
+    """거부된 측정값"""
+    row: int = Field(..., description="요청 내 순번 (0부터)")
+    reason: str
+
+
+class IngestResponse(BaseModel):
+    """센서 측정값 수집 응답"""
+    accepted: int = Field(..., description="저장된 측정값 수")
+    rejected: int = Field(..., description="거부된 측정값 수")
+    rejectedByReason: dict[str, int] = Field(default_factory=dict, description="거부 사유별 건수")
+    errors: List[IngestRejectedRow] = Field(default_factory=list, description="거부 상세 (앞부분 일부)")
+    elapsedMs: float
 
 
 # ============================================================================
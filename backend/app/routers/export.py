@@ -2,21 +2,108 @@
 Excel 다운로드 API 엔드포인트
 """
 from fastapi import APIRouter
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.config import settings
 from app.models.schemas import ExportRequest
-from app.services.data_generator import data_generator
+from app.services.admission import AdmissionSlot, admission
+from app.services.data_generator import PREDICTION_HOURS, data_generator
+from app.services.metrics import Counter, export_bytes, export_rows
+from app.services.singleflight import query_flight, request_key
+from app.services.arrow_stream import (
+    ARROW_STREAM_MEDIA_TYPE,
+    iter_arrow_stream,
+    prediction_batch,
+    prediction_schema,
+    sensor_data_batch,
+    sensor_data_columns,
+    sensor_data_schema,
+    wall_micros
+)
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import io
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterator, Optional, Tuple
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
+# xlsx 시트 최대 행 수에서 머리글 1행을 뺀 데이터 행 수
+XLSX_MAX_DATA_ROWS = 1048576 - 1
+
+
+def _admit(request: ExportRequest, series_count: int = 1, excel: bool = False, kind: Optional[str] = None) -> int:
+    """
+    내보내기 비용 추정 후 한도 초과 시 413 (반환값: 예상 행 수)
+    Excel은 시트 행 수 한도가 있으므로 EXCEL_MAX_ROWS(최대 XLSX_MAX_DATA_ROWS)로 제한
+    kind: Excel 내보내기 종류 (Arrow 스트리밍 내보내기 제안용)
+    """
+    max_rows = min(settings.EXCEL_MAX_ROWS, XLSX_MAX_DATA_ROWS) if excel else settings.EXPORT_MAX_ROWS
+    return admission.check_limit(
+        request.startDateTime,
+        request.endDateTime,
+        request.interval,
+        series_count,
+        max_rows,
+        kind
+    )
+
+
+def _zone_series_count(zone) -> int:
+    """지 선택에 따른 시각당 레코드 수"""
+    return data_generator.zone_count if not zone or zone == "all" else 1
+
+
+async def _run_export(name: str, request: ExportRequest, rows: int, build) -> io.BytesIO:
+    """
+    동일 요청 병합(single-flight) 후 무거운 요청 슬롯 안에서 파일 생성, 요청마다 별도 버퍼 반환
+    내보낸 행/바이트 수는 Arrow 스트림과 같이 응답마다 함께 집계 (병합된 요청도 각각 집계)
+    """
+    kind = name.split("/", 1)[1]
+
+    async def compute() -> Tuple[bytes, int]:
+        with admission.admit(rows, request.interval, kind):
+            output, row_count = await run_in_threadpool(build, request)
+        return output.getvalue(), row_count
+
+    content, row_count = await query_flight.do(name, request_key(name, request), compute)
+    export_rows.labels("xlsx", kind).inc(row_count)
+    export_bytes.labels("xlsx", kind).inc(len(content))
+    return io.BytesIO(content)
+
+
+async def _release_after(chunks: Iterator[bytes], slot: AdmissionSlot, sent: Counter) -> AsyncIterator[bytes]:
+    """스트림 전송이 끝나거나 중단되면 처리 슬롯 반환 (전송 시작 전 끊긴 경우는 background task가 반환)"""
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            sent.inc(len(chunk))
+            yield chunk
+    finally:
+        slot.release()
+
 
 @router.post("/sensor-data", summary="센서 데이터 Excel 다운로드")
 async def export_sensor_data(request: ExportRequest):
     """
     센서 데이터 Excel 다운로드
     """
+    rows = _admit(request, _zone_series_count(request.zone), excel=True, kind="sensor-data")
+    output = await _run_export("export/sensor-data", request, rows, _build_sensor_data_workbook)
+
+    # 파일명 생성
+    filename = f"sensor_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+    return StreamingResponse(
+        output,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def _build_sensor_data_workbook(request: ExportRequest) -> Tuple[io.BytesIO, int]:
+    """센서 데이터 Excel 파일 생성 (파일, 데이터 행 수)"""
     # Mock 데이터 생성
     data = data_generator.generate_historical_sensor_data(
         zone=request.zone,
@@ -48,9 +135,19 @@ async def export_sensor_data(request: ExportRequest):
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='센서 데이터')
     output.seek(0)
+    return output, len(df)
+
+
+@router.post("/predictions", summary="예측 이력 Excel 다운로드")
+async def export_predictions(request: ExportRequest):
+    """
+    예측 이력 Excel 다운로드
+    """
+    rows = _admit(request, excel=True, kind="predictions")
+    output = await _run_export("export/predictions", request, rows, _build_predictions_workbook)
 
     # 파일명 생성
-    filename = f"sensor_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    filename = f"predictions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
     return StreamingResponse(
         output,
@@ -59,11 +156,8 @@ async def export_sensor_data(request: ExportRequest):
     )
 
 
-@router.post("/predictions", summary="예측 이력 Excel 다운로드")
-async def export_predictions(request: ExportRequest):
-    """
-    예측 이력 Excel 다운로드
-    """
+def _build_predictions_workbook(request: ExportRequest) -> Tuple[io.BytesIO, int]:
+    """예측 이력 Excel 파일 생성 (파일, 데이터 행 수)"""
     # Mock 데이터 생성
     data = data_generator.generate_historical_predictions(
         zone=request.zone if request.zone else "all",
@@ -94,9 +188,19 @@ async def export_predictions(request: ExportRequest):
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='예측 이력')
     output.seek(0)
+    return output, len(df)
+
+
+@router.post("/alarms", summary="알림 이력 Excel 다운로드")
+async def export_alarms(request: ExportRequest):
+    """
+    알림 이력 Excel 다운로드
+    """
+    rows = _admit(request, excel=True)
+    output = await _run_export("export/alarms", request, rows, _build_alarms_workbook)
 
     # 파일명 생성
-    filename = f"predictions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    filename = f"alarms_{request.type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
     return StreamingResponse(
         output,
@@ -105,11 +209,8 @@ async def export_predictions(request: ExportRequest):
     )
 
 
-@router.post("/alarms", summary="알림 이력 Excel 다운로드")
-async def export_alarms(request: ExportRequest):
-    """
-    알림 이력 Excel 다운로드
-    """
+def _build_alarms_workbook(request: ExportRequest) -> Tuple[io.BytesIO, int]:
+    """알림 이력 Excel 파일 생성 (파일, 데이터 행 수)"""
     if request.type == "process":
         # 공종 알림
         data = data_generator.generate_historical_alarms_process(
@@ -177,12 +278,95 @@ async def export_alarms(request: ExportRequest):
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name=sheet_name)
     output.seek(0)
+    return output, len(df)
 
-    # 파일명 생성
-    filename = f"alarms_{request.type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+@router.post("/arrow/sensor-data", summary="센서 데이터 Arrow IPC 스트림")
+async def export_sensor_data_arrow(request: ExportRequest):
+    """
+    센서 데이터 Arrow IPC 스트림 다운로드
+    - 레코드 배치 단위로 점진적 전송 (pyarrow.ipc.open_stream으로 읽기)
+    - 센서 미설치 지점은 null
+    """
+    rows = _admit(request, _zone_series_count(request.zone))
+    slot = admission.acquire(rows, request.interval)
+
+    columns = sensor_data_columns(data_generator.topology.installed)
+    schema = sensor_data_schema(columns)
+    batches = _sensor_data_batches(request, schema, columns)
+
+    filename = f"sensor_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.arrows"
 
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        _release_after(
+            iter_arrow_stream(batches, schema, rows=export_rows.labels("arrow", "sensor-data")),
+            slot,
+            export_bytes.labels("arrow", "sensor-data")
+        ),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(slot.release)
+    )
+
+
+@router.post("/arrow/predictions", summary="예측 이력 Arrow IPC 스트림")
+async def export_predictions_arrow(request: ExportRequest):
+    """
+    예측 이력 Arrow IPC 스트림 다운로드
+    - 레코드 배치 단위로 점진적 전송 (pyarrow.ipc.open_stream으로 읽기)
+    """
+    rows = _admit(request)
+    slot = admission.acquire(rows, request.interval)
+
+    schema = prediction_schema(data_generator.forecaster.parameters)
+    batches = _prediction_batches(request, schema)
+
+    filename = f"predictions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.arrows"
+
+    return StreamingResponse(
+        _release_after(
+            iter_arrow_stream(batches, schema, rows=export_rows.labels("arrow", "predictions")),
+            slot,
+            export_bytes.labels("arrow", "predictions")
+        ),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(slot.release)
+    )
+
+
+def _step_micros(request: ExportRequest) -> Tuple[int, int]:
+    """요청 시작 시각과 조회 간격 (벽시계 마이크로초)"""
+    delta = timedelta(hours=1) if request.interval == "hour" else timedelta(minutes=1)
+    return wall_micros(request.startDateTime), delta // timedelta(microseconds=1)
+
+
+def _sensor_data_batches(request: ExportRequest, schema: pa.Schema, columns: list) -> Iterator[pa.RecordBatch]:
+    """센서 이력 블록 → 레코드 배치 (블록당 배치 1개)"""
+    zone = request.zone if request.zone else "all"
+    start, step = _step_micros(request)
+    blocks = data_generator.iter_historical_sensor_blocks(
+        zone=zone,
+        start_time=request.startDateTime,
+        end_time=request.endDateTime,
+        interval=request.interval
+    )
+    for block_start, zones, values, status in blocks:
+        times = start + (block_start + np.arange(len(values), dtype=np.int64)) * step
+        yield sensor_data_batch(schema, columns, times, zones, values, status)
+
+
+def _prediction_batches(request: ExportRequest, schema: pa.Schema) -> Iterator[pa.RecordBatch]:
+    """예측 이력 블록 → 레코드 배치 (블록당 배치 1개)"""
+    start, step = _step_micros(request)
+    horizon = PREDICTION_HOURS * 3600 * 1_000_000
+    blocks = data_generator.iter_historical_prediction_blocks(
+        zone=request.zone if request.zone else "all",
+        result="all",
+        start_time=request.startDateTime,
+        end_time=request.endDateTime,
+        interval=request.interval
     )
+    for steps, zones, abnormal, values in blocks:
+        times = start + steps.astype(np.int64) * step
+        yield prediction_batch(schema, times, times + horizon, zones, abnormal, values)
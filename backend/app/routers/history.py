@@ -1,8 +1,14 @@
 """
 이력 관리 API 엔드포인트
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.models.schemas import (
+    AggregationRequest,
+    AggregationResponse,
+    ChartSeriesRequest,
+    ChartSeriesResponse,
+    ColumnarHistoryResponse,
     SensorDataHistoryRequest,
     SensorDataHistoryResponse,
     PredictionHistoryRequest,
@@ -12,22 +18,99 @@ from app.models.schemas import (
     AlarmPredictionHistoryRequest,
     AlarmPredictionHistoryResponse
 )
-from app.services.data_generator import data_generator
+from app.config import settings
+from app.services.admission import admission
+from app.services.data_generator import data_generator, SENSOR_RANGES
+from app.services.columnar import to_columnar
+from app.services.history_cache import history_cache
+from app.services.singleflight import query_flight, request_key
+from app.services.timeseries import bucket_aggregate, is_valid_statistic, lttb
+from app.services.topology import plant_topology
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Union
 import math
+import numpy as np
 
 router = APIRouter(prefix="/api/history", tags=["History"])
 
+BUCKET_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+PAGE_FIELDS = ("page", "pageSize", "format")
 
-@router.post("/sensor-data", response_model=SensorDataHistoryResponse, summary="센서 데이터 이력 조회")
+
+def _admit(request, series_count: int = 1, kind: Optional[str] = None) -> int:
+    """요청 비용 추정 후 한도 초과 시 413 (반환값: 예상 행 수, kind: Arrow 스트리밍 내보내기 제안용 요청 종류)"""
+    return admission.check_limit(
+        request.startDateTime,
+        request.endDateTime,
+        request.interval,
+        series_count,
+        settings.HISTORY_MAX_ROWS,
+        kind
+    )
+
+
+async def _run_query(name: str, request, rows: int, fn, *args, exclude: Sequence[str] = PAGE_FIELDS, **kwargs):
+    """
+    캐시 조회 → 동일 요청 병합(single-flight) → 무거운 요청 슬롯 안에서 threadpool로 계산
+    페이지 필드는 키에서 제외하여 같은 조회의 모든 페이지가 하나의 결과를 공유 (페이지 이동은 캐시 슬라이스)
+    """
+    key = request_key(name, request, exclude)
+    cached = history_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def compute():
+        version = history_cache.data_version
+        with admission.admit(rows, request.interval, name):
+            result = await run_in_threadpool(fn, *args, **kwargs)
+        history_cache.put(key, result, request.endDateTime, version)
+        return result
+
+    return await query_flight.do(name, key, compute)
+
+
+def _zone_series_count(zone: str) -> int:
+    """지 선택에 따른 시각당 레코드 수"""
+    return data_generator.zone_count if zone == "all" else 1
+
+
+def _paginate(all_data: List[Dict], request, constant_fields: Sequence[str] = ()) -> Dict:
+    """페이지네이션 적용 후 요청 형식(rows / columnar)에 맞춰 응답 생성"""
+    total = len(all_data)
+    total_pages = math.ceil(total / request.pageSize)
+    start_idx = (request.page - 1) * request.pageSize
+    end_idx = start_idx + request.pageSize
+    paginated_data = all_data[start_idx:end_idx]
+
+    response = {
+        "total": total,
+        "page": request.page,
+        "pageSize": request.pageSize,
+        "totalPages": total_pages
+    }
+    if request.format == "columnar":
+        response["format"] = "columnar"
+        response.update(to_columnar(paginated_data, constant_fields=constant_fields))
+    else:
+        response["data"] = paginated_data
+    return response
+
+
+@router.post("/sensor-data", response_model=Union[SensorDataHistoryResponse, ColumnarHistoryResponse], summary="센서 데이터 이력 조회")
 async def get_sensor_data_history(request: SensorDataHistoryRequest):
     """
     센서 데이터 이력 조회
     - 지별 필터
     - 시간 범위 (시간 단위 / 1분 단위)
     - 페이지네이션
+    - 응답 형식 (format=columnar: 필드별 배열)
     """
+    rows = _admit(request, _zone_series_count(request.zone), "sensor-data")
+
     # Mock 데이터 생성
-    all_data = data_generator.generate_historical_sensor_data(
+    all_data = await _run_query(
+        "sensor-data", request, rows,
+        data_generator.generate_historical_sensor_data,
         zone=request.zone,
         start_time=request.startDateTime,
         end_time=request.endDateTime,
@@ -35,22 +118,10 @@ async def get_sensor_data_history(request: SensorDataHistoryRequest):
     )
 
     # 페이지네이션 적용
-    total = len(all_data)
-    total_pages = math.ceil(total / request.pageSize)
-    start_idx = (request.page - 1) * request.pageSize
-    end_idx = start_idx + request.pageSize
-    paginated_data = all_data[start_idx:end_idx]
-
-    return {
-        "total": total,
-        "page": request.page,
-        "pageSize": request.pageSize,
-        "totalPages": total_pages,
-        "data": paginated_data
-    }
+    return _paginate(all_data, request)
 
 
-@router.post("/predictions", response_model=PredictionHistoryResponse, summary="수질예측 이력 조회")
+@router.post("/predictions", response_model=Union[PredictionHistoryResponse, ColumnarHistoryResponse], summary="수질예측 이력 조회")
 async def get_prediction_history(request: PredictionHistoryRequest):
     """
     수질예측 이력 조회
@@ -58,9 +129,14 @@ async def get_prediction_history(request: PredictionHistoryRequest):
     - 예측결과 필터 (정상/비정상)
     - 시간 범위
     - 페이지네이션
+    - 응답 형식 (format=columnar: 필드별 배열)
     """
+    rows = _admit(request, kind="predictions")
+
     # Mock 데이터 생성
-    all_data = data_generator.generate_historical_predictions(
+    all_data = await _run_query(
+        "predictions", request, rows,
+        data_generator.generate_historical_predictions,
         zone=request.zone,
         result=request.result,
         start_time=request.startDateTime,
@@ -69,22 +145,142 @@ async def get_prediction_history(request: PredictionHistoryRequest):
     )
 
     # 페이지네이션 적용
-    total = len(all_data)
-    total_pages = math.ceil(total / request.pageSize)
-    start_idx = (request.page - 1) * request.pageSize
-    end_idx = start_idx + request.pageSize
-    paginated_data = all_data[start_idx:end_idx]
+    return _paginate(all_data, request, constant_fields=("thresholds",))
+
+
+def _downsample_series(zone_num: int, request: ChartSeriesRequest) -> tuple:
+    """시계열 생성 후 결측값 제외, LTTB 다운샘플링 (오프셋, 값, 선택 인덱스 반환)"""
+    offsets, values = data_generator.generate_historical_sensor_series(
+        zone_num=zone_num,
+        process_type=request.processType,
+        sensor=request.sensor,
+        start_time=request.startDateTime,
+        end_time=request.endDateTime,
+        interval=request.interval
+    )
+    valid = ~np.isnan(values)
+    offsets, values = offsets[valid], values[valid]
+    return offsets, values, lttb(offsets, values, request.points)
+
+
+@router.post("/chart-series", response_model=ChartSeriesResponse, summary="차트용 다운샘플링 시계열 조회")
+async def get_chart_series(request: ChartSeriesRequest):
+    """
+    차트용 다운샘플링 시계열 조회
+    - 지/공종/센서 단일 시계열
+    - LTTB(Largest-Triangle-Three-Buckets)로 목표 포인트 수 이하로 축소
+    """
+    try:
+        zone_num = int(request.zone)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="지 번호가 올바르지 않습니다.")
+
+    if not data_generator.is_sensor_installed(zone_num, request.processType, request.sensor):
+        raise HTTPException(status_code=404, detail="해당 지에 설치되지 않은 센서입니다.")
+
+    rows = _admit(request)
+
+    offsets, values, selected = await _run_query(
+        "chart-series", request, rows, _downsample_series, zone_num, request, exclude=()
+    )
 
     return {
-        "total": total,
-        "page": request.page,
-        "pageSize": request.pageSize,
-        "totalPages": total_pages,
-        "data": paginated_data
+        "zone": plant_topology.zone_labels[zone_num - 1],
+        "processType": request.processType,
+        "sensor": request.sensor,
+        "total": len(values),
+        "points": len(selected),
+        "timestamps": [
+            (request.startDateTime + timedelta(seconds=float(offset))).isoformat()
+            for offset in offsets[selected]
+        ],
+        "values": values[selected].tolist()
     }
 
 
-@router.post("/alarms/process", response_model=AlarmProcessHistoryResponse, summary="알림 이력 조회 (공종)")
+def _aggregate_channels(channels: List[tuple], request: AggregationRequest, bucket_seconds: int) -> List[Dict]:
+    """채널 시계열을 그룹별로 합쳐 버킷 통계 계산"""
+    grouped: Dict[tuple, List[tuple]] = {}
+    for key, zone_num, process_type, sensor in channels:
+        grouped.setdefault(key, []).append(data_generator.generate_historical_sensor_series(
+            zone_num=zone_num,
+            process_type=process_type,
+            sensor=sensor,
+            start_time=request.startDateTime,
+            end_time=request.endDateTime,
+            interval=request.interval
+        ))
+
+    groups = []
+    for (zone, process_type, sensor), series in grouped.items():
+        offsets = np.concatenate([item[0] for item in series])
+        values = np.concatenate([item[1] for item in series])
+        bucket_offsets, stats = bucket_aggregate(offsets, values, bucket_seconds, request.statistics)
+
+        groups.append({
+            "zone": zone,
+            "processType": process_type,
+            "sensor": sensor,
+            "buckets": [
+                (request.startDateTime + timedelta(seconds=float(offset))).isoformat()
+                for offset in bucket_offsets
+            ],
+            "values": {name: np.round(values, 4).tolist() for name, values in stats.items()}
+        })
+    return groups
+
+
+@router.post("/aggregate", response_model=AggregationResponse, summary="시간 버킷 집계 조회")
+async def get_aggregation(request: AggregationRequest):
+    """
+    시간 버킷 집계 조회
+    - 지/공종/센서 필터 및 그룹 기준 (groupBy)
+    - 버킷 폭 (예: 15m, 1h, 1d, startDateTime 기준 정렬)
+    - 통계: count / sum / min / max / mean / std / median / pNN
+    """
+    invalid = [name for name in request.statistics if not is_valid_statistic(name)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 통계입니다: {', '.join(invalid)}")
+
+    bucket_seconds = int(request.bucket[:-1]) * BUCKET_UNIT_SECONDS[request.bucket[-1]]
+    if bucket_seconds <= 0:
+        raise HTTPException(status_code=400, detail="버킷 폭은 0보다 커야 합니다.")
+
+    if request.zone == "all":
+        zone_nums = list(range(1, data_generator.zone_count + 1))
+    else:
+        try:
+            zone_nums = [int(request.zone)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="지 번호가 올바르지 않습니다.")
+
+    # 조회 대상 채널 목록 (그룹 키, 지, 공종, 센서)
+    channels = []
+    for zone_num in zone_nums:
+        for process_type, sensor in SENSOR_RANGES:
+            if request.processType not in ("all", process_type) or request.sensor not in ("all", sensor):
+                continue
+            if not data_generator.is_sensor_installed(zone_num, process_type, sensor):
+                continue
+
+            dims = {"zone": plant_topology.zone_labels[zone_num - 1], "reactor": process_type, "sensor": sensor}
+            key = tuple(dims[name] if name in request.groupBy else None for name in ("zone", "reactor", "sensor"))
+            channels.append((key, zone_num, process_type, sensor))
+
+    rows = _admit(request, len(channels))
+
+    groups = await _run_query(
+        "aggregate", request, rows, _aggregate_channels, channels, request, bucket_seconds, exclude=()
+    )
+
+    return {
+        "bucket": request.bucket,
+        "statistics": request.statistics,
+        "groups": groups
+    }
+
+
+@router.post("/alarms/process", response_model=Union[AlarmProcessHistoryResponse, ColumnarHistoryResponse], summary="알림 이력 조회 (공종)")
 async def get_alarm_process_history(request: AlarmProcessHistoryRequest):
     """
     알림 이력 조회 (공종)
@@ -93,9 +289,14 @@ async def get_alarm_process_history(request: AlarmProcessHistoryRequest):
     - 센서 필터 (ORP/pH/DO/MLSS)
     - 시간 범위
     - 페이지네이션
+    - 응답 형식 (format=columnar: 필드별 배열)
     """
+    rows = _admit(request)
+
     # Mock 데이터 생성
-    all_data = data_generator.generate_historical_alarms_process(
+    all_data = await _run_query(
+        "alarms/process", request, rows,
+        data_generator.generate_historical_alarms_process,
         zone=request.zone,
         process_type=request.processType,
         sensor=request.sensor,
@@ -105,31 +306,24 @@ async def get_alarm_process_history(request: AlarmProcessHistoryRequest):
     )
 
     # 페이지네이션 적용
-    total = len(all_data)
-    total_pages = math.ceil(total / request.pageSize)
-    start_idx = (request.page - 1) * request.pageSize
-    end_idx = start_idx + request.pageSize
-    paginated_data = all_data[start_idx:end_idx]
-
-    return {
-        "total": total,
-        "page": request.page,
-        "pageSize": request.pageSize,
-        "totalPages": total_pages,
-        "data": paginated_data
-    }
+    return _paginate(all_data, request)
 
 
-@router.post("/alarms/prediction", response_model=AlarmPredictionHistoryResponse, summary="알림 이력 조회 (예측)")
+@router.post("/alarms/prediction", response_model=Union[AlarmPredictionHistoryResponse, ColumnarHistoryResponse], summary="알림 이력 조회 (예측)")
 async def get_alarm_prediction_history(request: AlarmPredictionHistoryRequest):
     """
     알림 이력 조회 (예측)
     - 항목 필터 (TOC/SS/T-N/T-P)
     - 시간 범위
     - 페이지네이션
+    - 응답 형식 (format=columnar: 필드별 배열)
     """
+    rows = _admit(request)
+
     # Mock 데이터 생성
-    all_data = data_generator.generate_historical_alarms_prediction(
+    all_data = await _run_query(
+        "alarms/prediction", request, rows,
+        data_generator.generate_historical_alarms_prediction,
         item=request.item,
         start_time=request.startDateTime,
         end_time=request.endDateTime,
@@ -137,16 +331,19 @@ async def get_alarm_prediction_history(request: AlarmPredictionHistoryRequest):
     )
 
     # 페이지네이션 적용
-    total = len(all_data)
-    total_pages = math.ceil(total / request.pageSize)
-    start_idx = (request.page - 1) * request.pageSize
-    end_idx = start_idx + request.pageSize
-    paginated_data = all_data[start_idx:end_idx]
+    return _paginate(all_data, request, constant_fields=("thresholds",))
 
+
+@router.get("/stats", summary="이력 조회 처리 현황")
+async def get_history_stats():
+    """
+    이력 조회 처리 현황
+    - 결과 캐시 (항목 수, 크기, 적중/미적중, 데이터 버전)
+    - 동일 요청 병합 (경로별 요청/실행/병합 횟수)
+    - 수용 제어 (무거운 요청 처리 중 개수, 거절 횟수)
+    """
     return {
-        "total": total,
-        "page": request.page,
-        "pageSize": request.pageSize,
-        "totalPages": total_pages,
-        "data": paginated_data
+        "cache": history_cache.stats(),
+        "singleflight": query_flight.stats(),
+        "admission": admission.stats()
     }
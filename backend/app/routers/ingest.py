@@ -0,0 +1,152 @@
+"""
+센서 측정값 수집 API 엔드포인트
+"""
+import time
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.schemas import IngestResponse
+from app.services.ingest import IngestError, ingest_pipeline, parse_body, reading_validator
+from app.services.line_protocol import line_protocol_server
+from app.services.maintenance import maintenance_service
+from app.services.reading_store import reading_store
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+
+router = APIRouter(prefix="/api/ingest", tags=["Ingest"])
+
+
+def _parse_and_validate(body: bytes, content_type: str):
+    """본문 해석 + 벡터 검증 (threadpool에서 실행)"""
+    return reading_validator.validate_rows(parse_body(body, content_type))
+
+
+def _check_rows(count: int):
+    """조회 결과 행 수 한도 (초과 시 413)"""
+    if count > settings.HISTORY_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"조회 결과가 {count:,}건으로 최대 {settings.HISTORY_MAX_ROWS:,}건을 넘습니다. 기간이나 채널을 줄여 주세요."
+        )
+
+
+def _channel_columns(rows) -> dict:
+    """지(1부터)/공종/센서 열"""
+    return {
+        "zone": (rows.zone + 1).tolist(),
+        "reactor": np.array(PROCESS_TYPES)[rows.reactor].tolist(),
+        "sensor": np.array(PROCESS_SENSORS)[rows.sensor].tolist()
+    }
+
+
+@router.post("/readings", response_model=IngestResponse, summary="센서 측정값 일괄 수집")
+async def ingest_readings(request: Request):
+    """
+    센서 측정값 일괄 수집
+    - 측정값 1건: [시각(epoch 초 또는 ISO 8601, null이면 수신 시각), 지 번호, 공종, 센서, 값]
+    - application/json: 배열의 배열 (예: [[1700000000, 4, "aerobic", "do", 3.2], ...])
+    - application/x-ndjson: 줄마다 배열 또는 {"timestamp", "zone", "reactor", "sensor", "value"} 객체
+    - 잘못된 측정값만 제외하고 나머지는 저장 (거부 사유별 건수와 앞부분 상세 반환)
+    - 여러 요청의 측정값을 모아 한 번에 커밋한 뒤 응답 (그룹 커밋)
+    - 저장 후 이동 통계·알림 판정에 반영되고 WebSocket으로 전송
+    - LIVE_SOURCE=ingest가 아니면 409 (모의/재생 데이터와 통계·알림 상태가 섞이지 않도록)
+    """
+    if settings.LIVE_SOURCE != "ingest":
+        raise HTTPException(
+            status_code=409,
+            detail=f"LIVE_SOURCE={settings.LIVE_SOURCE}에서는 측정값을 수집하지 않습니다. LIVE_SOURCE=ingest로 실행해 주세요."
+        )
+    started = time.perf_counter()
+    body = await request.body()
+    if len(body) > settings.INGEST_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"본문은 최대 {settings.INGEST_MAX_BODY_BYTES:,} bytes입니다.")
+
+    try:
+        result = await run_in_threadpool(_parse_and_validate, body, request.headers.get("content-type", ""))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    stored = await ingest_pipeline.submit(result.batch, result.rejected)
+    return {
+        "accepted": stored,
+        "rejected": result.rejected,
+        "rejectedByReason": result.by_reason,
+        "errors": result.errors,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+@router.get("/stats", summary="수집 현황")
+async def get_ingest_stats():
+    """
+    수집 현황
+    - 요청/저장/거부 건수, 마지막 측정 시각, 처리 시간 히스토그램
+    - 저장소 커밋 횟수와 커밋당 측정값 수 (그룹 커밋 효과)
+    - lineProtocol: TCP 라인 프로토콜 연결/수신/일시 중지 현황
+    - maintenance: 봉인/요약/보관 기간 정리/병합/VACUUM 현황과 디스크 사용량
+    """
+    return {
+        **ingest_pipeline.summary(),
+        "lineProtocol": line_protocol_server.stats(),
+        "maintenance": maintenance_service.stats()
+    }
+
+
+@router.get("/readings", summary="수집 측정값 조회")
+async def get_readings(
+    start: datetime = Query(..., description="시작 시각 (ISO 8601)"),
+    end: datetime = Query(..., description="종료 시각 (ISO 8601, 미포함)"),
+    zone: Optional[int] = Query(None, ge=1, description="지 번호 (생략 시 전체)"),
+    reactor: Optional[str] = Query(None, description="공종 (anaerobic / anoxic / aerobic)"),
+    sensor: Optional[str] = Query(None, description="센서 (orp / ph / do / mlss)"),
+    resolution: str = Query("raw", pattern="^(raw|hour)$", description="raw: 원본 측정값, hour: 시간별 요약")
+):
+    """
+    수집 측정값 조회 (시각순, 열 단위 배열)
+    - raw: 봉인된 압축 세그먼트와 아직 봉인되지 않은 최근 측정값을 합쳐서 반환
+      (세그먼트는 파일/블록 머리말(시각·채널 범위)로 필요 없는 블록을 건너뛰고 나머지만 디코딩)
+    - hour: 채널별 시간 요약 (count/min/max/mean, ROLLUP_AFTER_DAYS가 지난 기간부터 생성,
+      원본 보관 기간(RAW_RETENTION_DAYS)이 지난 기간은 요약만 남음)
+    - 결과가 HISTORY_MAX_ROWS를 넘으면 413
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="종료 시각은 시작 시각 이후여야 합니다.")
+    if zone is not None and zone > reading_validator.zone_count:
+        raise HTTPException(status_code=404, detail="지를 찾을 수 없습니다.")
+    if reactor is not None and reactor not in PROCESS_TYPES:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 공종입니다: {reactor}")
+    if sensor is not None and sensor not in PROCESS_SENSORS:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 센서입니다: {sensor}")
+
+    channels = reading_validator.installed.copy()
+    if zone is not None:
+        channels[np.arange(channels.shape[0]) != zone - 1] = False
+    if reactor is not None:
+        channels[:, np.arange(len(PROCESS_TYPES)) != PROCESS_TYPES.index(reactor)] = False
+    if sensor is not None:
+        channels[:, :, np.arange(len(PROCESS_SENSORS)) != PROCESS_SENSORS.index(sensor)] = False
+
+    if resolution == "hour":
+        rollups = await run_in_threadpool(reading_store.query_rollups, start.timestamp(), end.timestamp(), channels)
+        _check_rows(len(rollups))
+        return {
+            "count": len(rollups),
+            "timestamp": rollups.hour.tolist(),
+            **_channel_columns(rollups),
+            "samples": rollups.count.tolist(),
+            "min": rollups.min.tolist(),
+            "max": rollups.max.tolist(),
+            "mean": rollups.mean.tolist()
+        }
+
+    rows = await run_in_threadpool(reading_store.query, start.timestamp(), end.timestamp(), channels)
+    _check_rows(len(rows))
+    return {
+        "count": len(rows),
+        "timestamp": rows.timestamp.tolist(),
+        **_channel_columns(rows),
+        "value": rows.value.tolist()
+    }
+
@@ -0,0 +1,21 @@
+"""
+런타임 계측 엔드포인트 (Prometheus 텍스트 형식)
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import metrics_registry
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", summary="런타임 계측값", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    런타임 계측값 (Prometheus 텍스트 형식, 스크레이프용)
+    - HTTP 요청 처리 시간 (라우트별), 실시간 메시지 생성 시간 (메시지 종류별)
+    - WebSocket 브로드캐스트 전송 시간, 클라이언트별 밀린 전송 수, 연결 수
+    - 내보내기 행 수/바이트 수 (초당 값은 rate()로 계산), 이벤트 루프 지연
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -1,8 +1,18 @@
 """
 실시간 모니터링 API 엔드포인트
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import datetime
+from app.services.alarm_engine import alarm_engine
+from app.config import settings
 from app.services.data_generator import data_generator
+from app.services.ingest import ingest_pipeline
+from app.services.replay import replay_producer
+from app.services.rolling_stats import rolling_stats
+from app.services.topology import plant_topology
+from app.services.trend import parse_window, trend_buffer
 
 router = APIRouter(prefix="/api/monitoring", tags=["Monitoring"])
 
@@ -17,14 +27,90 @@ async def get_process_status():
 
 
 @router.get("/zone-data", summary="5개 지별 생물반응조 실시간 데이터")
-async def get_zone_data():
+async def get_zone_data(
+    plant: Optional[str] = Query(None, description="처리장 id (여러 처리장 구성에서 한 처리장만 조회)")
+):
     """
     5개 지별 생물반응조 실시간 데이터 조회
     - 혐기조: ORP, pH
     - 무산소조: ORP, pH
     - 호기조: DO, pH, MLSS
+    - LIVE_SOURCE=ingest이면 수집된 채널별 최신 측정값
+    - LIVE_SOURCE=replay이면 마지막으로 재생된 측정값
+    - 모의 데이터는 마지막으로 전송한 값 (조회해도 이동 통계는 바뀌지 않음)
     """
-    return data_generator.generate_zone_data()
+    selected = None
+    if plant is not None:
+        selected = plant_topology.plant(plant)
+        if selected is None:
+            raise HTTPException(status_code=404, detail="처리장을 찾을 수 없습니다.")
+
+    if settings.LIVE_SOURCE == "ingest":
+        zone_data = data_generator.zone_data(ingest_pipeline.latest.copy())
+    else:
+        zone_data = data_generator.current_zone_data()
+    return zone_data if selected is None else data_generator.plant_zone_data(zone_data, selected)
+
+
+@router.get("/topology", summary="처리장 구성")
+async def get_topology():
+    """
+    처리장 구성 요약 (TOPOLOGY_PATH 또는 기본 구성)
+    - 처리장별 지 수, 전역 지 번호 시작값, 설치 센서(채널) 수
+    - 이력/수집 API의 지 번호는 전역 지 번호 (처리장 순서대로 1부터)
+    """
+    return plant_topology.describe()
+
+
+@router.get("/trend", summary="채널별 최근 추이 (스파크라인)")
+async def get_trend(
+    window: str = Query("2h", description="조회 구간 (예: 2h, 30m, 90s, 최대 TREND_MAX_SECONDS)"),
+    plant: Optional[str] = Query(None, description="처리장 id (여러 처리장 구성에서 한 처리장만 조회)")
+):
+    """
+    지/공종/센서 채널별 최근 추이
+    - 실시간 전송 스냅샷을 TREND_RESOLUTION_SECONDS 버킷마다 메모리 링 버퍼에 보관 (이력 DB 조회 없음)
+    - start: 첫 버킷 시각, step: 버킷 길이(초), 값 배열은 버킷 시각순 (측정이 없던 버킷은 null)
+    - 긴 구간이나 오래된 기간은 /api/history 사용
+    """
+    try:
+        seconds = parse_window(window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if seconds > trend_buffer.max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"조회 구간은 최대 {trend_buffer.max_seconds:g}초입니다. 긴 구간은 이력 API를 사용해 주세요."
+        )
+
+    selected = None
+    if plant is not None:
+        selected = plant_topology.plant(plant)
+        if selected is None:
+            raise HTTPException(status_code=404, detail="처리장을 찾을 수 없습니다.")
+    return trend_buffer.describe(seconds, selected)
+
+
+@router.get("/replay", summary="녹화 재생 현황")
+async def get_replay_stats():
+    """
+    녹화 재생 현황 (LIVE_SOURCE=replay)
+    - effectiveSpeed: 녹화 시간 ÷ 경과 시간 (요청 배속과 비교)
+    - coalescedFrames: 일정을 따라가지 못해 합쳐서 전송한 프레임 수
+    - lagMs: 프레임별 예정 시각 대비 전송 지연 분포
+    - keptUp: 밀린 프레임 없이 요청 배속을 유지했는지 여부
+    """
+    return replay_producer.stats()
+
+
+@router.get("/stats", summary="채널별 이동 통계 및 이상 점수")
+async def get_rolling_stats():
+    """
+    지/공종/센서 채널별 이동 통계
+    - EWMA 평균/표준편차, 이동 최소/최대, z-score
+    - anomalies: |z-score|가 기준(STATS_ZSCORE_ALERT) 이상인 채널 (점수 큰 순)
+    """
+    return rolling_stats.summary()
 
 
 @router.get("/tms", summary="방류 TMS 실시간 측정값")
@@ -32,8 +118,9 @@ async def get_tms_data():
     """
     방류 TMS 실시간 측정값 조회
     - TOC, SS, T-N, T-P
+    - 마지막으로 전송한 측정값 (모의 데이터/녹화 재생, 조회해도 예측 엔진은 바뀌지 않음)
     """
-    return data_generator.generate_tms_data()
+    return data_generator.current_tms_data()
 
 
 @router.get("/alerts", summary="실시간 알림 목록")
@@ -41,9 +128,23 @@ async def get_alerts(
     limit: int = Query(10, ge=1, le=50, description="조회할 알림 개수")
 ):
     """
-    실시간 알림 목록 조회
+    현재 발생 중인 알림 목록 (최신순)
     - 공종 센서 알림
     - 예측 알림
     - TMS 알림
     """
-    return data_generator.generate_alerts(limit=limit)
+    return alarm_engine.current_alerts(limit=limit)
+
+
+@router.get("/alarm-events", summary="알림 발생/해제 이벤트")
+async def get_alarm_events(
+    limit: int = Query(100, ge=1, le=1000, description="조회할 이벤트 개수"),
+    category: Optional[str] = Query(None, description="process / tms / prediction"),
+    since: Optional[datetime] = Query(None, description="이 시각 이후 이벤트만")
+):
+    """
+    알림 상태 전이 이벤트 (발생/해제, 최신순)
+    - 상태가 바뀐 경우에만 기록되므로 측정 주기와 무관하게 실제 이벤트 수만큼 쌓임
+    """
+    events = await run_in_threadpool(alarm_engine.query, limit, category, since)
+    return {"events": events, "stats": alarm_engine.stats()}
@@ -1,21 +1,55 @@
 """
 AI 예측 API 엔드포인트
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.config import settings
 from app.services.data_generator import data_generator
+from app.services.inference import inference_service
 
 router = APIRouter(prefix="/api/prediction", tags=["Prediction"])
 
 
-@router.get("/forecast", summary="AI 방류수질 예측 (3시간 후)")
-async def get_forecast():
+def _parse_horizons(horizons: str) -> list:
+    """쉼표로 구분된 예측 시점(시간) 파싱 (중복 제거, 오름차순)"""
+    try:
+        values = sorted({int(value) for value in horizons.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="예측 시점은 쉼표로 구분된 정수여야 합니다. (예: 1,2,3,6)")
+
+    if not values or values[0] < 1 or values[-1] > settings.FORECAST_MAX_HORIZON:
+        raise HTTPException(
+            status_code=400,
+            detail=f"예측 시점은 1~{settings.FORECAST_MAX_HORIZON}시간 범위여야 합니다."
+        )
+    return values
+
+
+def _require_forecast_state():
+    """예측 엔진에 TMS 측정값이 아직 없으면 503 (예측 엔진은 실시간 전송 루프만 갱신)"""
+    if data_generator.forecaster.observations == 0:
+        raise HTTPException(status_code=503, detail="아직 TMS 측정값이 없어 예측할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+
+
+@router.get("/forecast", summary="AI 방류수질 예측 (3시간 후 / 다중 시점)")
+async def get_forecast(
+    horizons: Optional[str] = Query(None, description="예측 시점 목록 (시간, 예: 1,2,3,6,12,24)")
+):
     """
     AI 예측 방류수질 조회 (3시간 후)
     - TOC, SS, T-N, T-P 예측값
     - 예측 신뢰도
     - 임계값 기준 상태
+    - horizons 지정 시 시점별 예측 곡선 (추론 워커에서 배치 계산)
     """
-    return data_generator.generate_prediction_data(hours=3)
+    _require_forecast_state()
+    if horizons is not None:
+        values = _parse_horizons(horizons)
+        forecast = await inference_service.forecast(values)
+        return data_generator.generate_prediction_curves(values, forecast=forecast)
+
+    forecast = await inference_service.forecast([3])
+    return data_generator.generate_prediction_data(hours=3, forecast=forecast)
 
 
 @router.get("/forecast/1hour", summary="AI 방류수질 예측 (1시간 후)")
@@ -26,4 +60,16 @@ async def get_forecast_1hour():
     - 예측 신뢰도
     - 임계값 기준 상태
     """
-    return data_generator.generate_prediction_data(hours=1)
+    _require_forecast_state()
+    forecast = await inference_service.forecast([1])
+    return data_generator.generate_prediction_data(hours=1, forecast=forecast)
+
+
+@router.get("/inference/stats", summary="예측 추론 서비스 현황")
+async def get_inference_stats():
+    """
+    추론 워커 풀 현황
+    - 요청/배치/기한 초과/대체 응답 횟수
+    - 요청 지연 시간, 추론 시간, 배치 크기 히스토그램
+    """
+    return inference_service.stats()
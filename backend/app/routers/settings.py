@@ -1,25 +1,21 @@
 """
 환경설정 API 엔드포인트
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
 from app.models.schemas import (
+    ThresholdHistoryResponse,
     ThresholdsResponse,
     ThresholdsUpdateRequest,
     ThresholdsUpdateResponse
 )
-from app.config import settings
+from app.services.history_cache import history_cache
+from app.services.threshold_store import threshold_store
+from app.websocket.connection import push_thresholds_update
 from datetime import datetime
 
 router = APIRouter(prefix="/api/settings", tags=["Settings"])
 
-# 임계값 저장소 (실제로는 DB에 저장)
-thresholds_storage = {
-    "process": settings.DEFAULT_PROCESS_THRESHOLDS.copy(),
-    "effluent": settings.DEFAULT_EFFLUENT_THRESHOLDS.copy(),
-    "lastUpdated": datetime.now(),
-    "updatedBy": "system"
-}
-
 
 @router.get("/thresholds", response_model=ThresholdsResponse, summary="임계값 조회")
 async def get_thresholds():
@@ -28,11 +24,13 @@ async def get_thresholds():
     - 공종별 임계값 (혐기조/무산소조/호기조)
     - 방류 임계값 (TOC/SS/T-N/T-P)
     """
+    snapshot = threshold_store.current
     return {
-        "process": thresholds_storage["process"],
-        "effluent": thresholds_storage["effluent"],
-        "lastUpdated": thresholds_storage["lastUpdated"],
-        "updatedBy": thresholds_storage["updatedBy"]
+        "process": snapshot.process,
+        "effluent": snapshot.effluent,
+        "lastUpdated": snapshot.lastUpdated,
+        "updatedBy": snapshot.updatedBy,
+        "version": snapshot.version
     }
 
 
@@ -40,27 +38,40 @@ async def get_thresholds():
 async def update_thresholds(request: ThresholdsUpdateRequest):
     """
     임계값 저장
-    - 공종 설정 또는 방류 설정 업데이트
+    - 공종 설정 또는 방류 설정 업데이트 (센서/항목 단위 병합)
+    - 변경 이력을 로컬 저장소에 기록한 뒤 반영 (디스크 I/O는 저장 요청에서만 발생)
+    - 저장 즉시 생성기·스트림·예측 상태 판정에 반영
+    - WebSocket으로 thresholds_update 전송 (현재 상태 재판정 결과 포함)
     """
-    if request.category == "process":
-        # 공종 임계값 업데이트
-        thresholds_storage["process"].update(request.thresholds)
-    elif request.category == "effluent":
-        # 방류 임계값 업데이트
-        thresholds_storage["effluent"].update(request.thresholds)
-    else:
+    try:
+        snapshot = await run_in_threadpool(
+            threshold_store.update, request.category, request.thresholds, request.updatedBy
+        )
+    except ValueError as e:
         return {
             "success": False,
-            "message": "잘못된 카테고리입니다.",
+            "message": str(e),
             "timestamp": datetime.now()
         }
 
-    # 업데이트 시간 기록
-    thresholds_storage["lastUpdated"] = datetime.now()
-    thresholds_storage["updatedBy"] = "admin"  # 실제로는 인증된 사용자 정보
+    # 임계값이 포함된 이력 조회 결과 무효화
+    history_cache.bump_version()
+    await push_thresholds_update(snapshot)
 
     return {
         "success": True,
         "message": f"{request.category} 임계값이 성공적으로 저장되었습니다.",
-        "timestamp": datetime.now()
+        "timestamp": snapshot.lastUpdated,
+        "version": snapshot.version
     }
+
+
+@router.get("/thresholds/history", response_model=ThresholdHistoryResponse, summary="임계값 변경 이력")
+async def get_threshold_history(
+    limit: int = Query(20, ge=1, le=500, description="조회할 이력 개수")
+):
+    """
+    임계값 변경 이력 (최신순)
+    - 버전, 변경 카테고리, 변경 내용, 변경 일시, 변경자
+    """
+    return {"history": await run_in_threadpool(threshold_store.history, limit)}
@@ -0,0 +1,147 @@
+"""
+이력/내보내기 요청 비용 추정 및 수용 제어 (admission control)
+데이터를 생성하기 전에 시간 범위·간격·지 선택으로 행 수를 계산하여
+과도한 요청은 413, 무거운 요청이 동시 처리 한도를 넘으면 429로 거절
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+INTERVAL_SECONDS = {"hour": 3600, "minute": 60}
+
+# 대용량 이력 조회/Excel 내보내기 거절 시 제안하는 Arrow 스트리밍 내보내기 (요청 종류 → 경로)
+STREAM_EXPORTS = {
+    "sensor-data": "/api/export/arrow/sensor-data",
+    "predictions": "/api/export/arrow/predictions",
+}
+
+
+def estimate_rows(start_time: datetime, end_time: datetime, interval: str, series_count: int = 1) -> int:
+    """시간 범위와 간격으로 생성될 행 수 계산 (시작/종료 시각 포함)"""
+    if end_time < start_time:
+        return 0
+    steps = int((end_time - start_time).total_seconds() // INTERVAL_SECONDS[interval]) + 1
+    return steps * max(series_count, 0)
+
+
+class AdmissionSlot:
+    """무거운 요청 처리 슬롯 (release 시 반환, 중복 반환 무시)"""
+
+    def __init__(self, controller: Optional["AdmissionController"]):
+        self._controller = controller
+
+    def release(self):
+        if self._controller is not None:
+            self._controller._release()
+            self._controller = None
+
+
+class AdmissionController:
+    """요청 비용 기반 수용 제어"""
+
+    def __init__(self, heavy_rows: int, max_heavy: int, retry_after: int):
+        self.heavy_rows = heavy_rows
+        self.max_heavy = max_heavy
+        self.retry_after = retry_after
+        self._active = 0
+        self.rejected_too_large = 0
+        self.rejected_busy = 0
+
+    def check_limit(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str,
+        series_count: int,
+        limit: int,
+        kind: Optional[str] = None
+    ) -> int:
+        """
+        예상 행 수가 한도를 넘으면 413 (더 큰 간격 또는 짧은 범위 제안), 아니면 예상 행 수 반환
+        kind: 요청 종류 (Arrow 스트리밍 내보내기가 있고 그 한도 안이면 stream으로 경로 제안)
+        """
+        rows = estimate_rows(start_time, end_time, interval, series_count)
+        if rows <= limit:
+            return rows
+
+        self.rejected_too_large += 1
+        suggestion = {}
+        if interval == "minute" and estimate_rows(start_time, end_time, "hour", series_count) <= limit:
+            suggestion["interval"] = "hour"
+        else:
+            max_steps = max(limit // max(series_count, 1) - 1, 0)
+            suggestion["maxRangeHours"] = round(max_steps * INTERVAL_SECONDS[interval] / 3600, 1)
+        suggestion.update(self._stream_suggestion(rows, kind))
+
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "message": "요청 범위가 너무 큽니다. 간격을 늘리거나 조회 기간을 줄여주세요.",
+                "estimatedRows": rows,
+                "limit": limit,
+                "suggestion": suggestion
+            }
+        )
+
+    def acquire(self, rows: int, interval: Optional[str] = None, kind: Optional[str] = None) -> AdmissionSlot:
+        """무거운 요청이면 동시 처리 슬롯 확보 (한도 초과 시 429, kind는 check_limit과 같음)"""
+        if rows < self.heavy_rows:
+            return AdmissionSlot(None)
+
+        if self._active >= self.max_heavy:
+            self.rejected_busy += 1
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "message": "대용량 조회 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하거나 간격을 늘려주세요.",
+                    "estimatedRows": rows,
+                    "suggestion": {
+                        **({"interval": "hour"} if interval == "minute" else {}),
+                        **self._stream_suggestion(rows, kind)
+                    }
+                },
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        self._active += 1
+        return AdmissionSlot(self)
+
+    def _release(self):
+        self._active -= 1
+
+    @staticmethod
+    def _stream_suggestion(rows: int, kind: Optional[str]) -> Dict:
+        """Arrow 스트리밍 내보내기 제안 (해당 내보내기가 없거나 그 한도도 넘으면 없음)"""
+        if kind not in STREAM_EXPORTS or rows > settings.EXPORT_MAX_ROWS:
+            return {}
+        return {"stream": STREAM_EXPORTS[kind]}
+
+    @contextmanager
+    def admit(self, rows: int, interval: Optional[str] = None, kind: Optional[str] = None):
+        """슬롯을 확보하고 블록 종료 시 반환"""
+        slot = self.acquire(rows, interval, kind)
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def stats(self) -> Dict:
+        """수용 제어 현황"""
+        return {
+            "activeHeavyQueries": self._active,
+            "maxHeavyQueries": self.max_heavy,
+            "rejectedTooLarge": self.rejected_too_large,
+            "rejectedBusy": self.rejected_busy
+        }
+
+
+# 전역 인스턴스
+admission = AdmissionController(
+    heavy_rows=settings.HEAVY_QUERY_ROWS,
+    max_heavy=settings.HEAVY_QUERY_CONCURRENCY,
+    retry_after=settings.HEAVY_QUERY_RETRY_AFTER
+)
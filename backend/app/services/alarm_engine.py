@@ -0,0 +1,469 @@
+"""
+알림 상태 머신
+공종 채널(지 × 공종 × 센서)과 방류 항목(TMS 측정, 3시간 후 예측)별 알림 상태를 배열로 관리
+- 발생: 임계값을 벗어난 상태가 ALARM_RAISE_SECONDS 이상 지속
+- 해제: 임계 범위 안쪽 히스테리시스 구간(ALARM_HYSTERESIS_RATIO)으로 돌아온 상태가 ALARM_CLEAR_SECONDS 이상 지속
+- 같은 상태는 다시 알리지 않음 (상태 전이만 이벤트로 발생)
+- 채널별 상태 변경 최소 간격(ALARM_MIN_INTERVAL_SECONDS)과 전체 분당 이벤트 상한으로 알림 폭주 방지
+- 상태 전이 이벤트만 전송하고 SQLite에 기록
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.database import open_sqlite, vacuum_sqlite
+from app.services.threshold_engine import (
+    PROCESS_NAMES,
+    PROCESS_SENSORS,
+    PROCESS_TYPES,
+    SENSOR_LABELS,
+    ThresholdEngine,
+    parameter_label,
+    threshold_engine
+)
+from app.services.topology import PlantTopology, plant_topology
+from app.services.threshold_store import ThresholdStore, threshold_store
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarm_events (
+    id          TEXT PRIMARY KEY,
+    timestamp   TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    zone        TEXT,
+    channel     TEXT NOT NULL,
+    event       TEXT NOT NULL
+)
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS idx_alarm_events_timestamp ON alarm_events (timestamp)"
+
+
+def sustained(mask: np.ndarray, steps: int, tail: np.ndarray) -> np.ndarray:
+    """
+    시간 축(0)으로 steps개 시점 연속 True인지 여부
+    tail: 직전 블록의 마지막 steps-1개 시점 (블록 경계에서도 연속 판정)
+    """
+    if steps <= 1:
+        return mask
+    full = np.concatenate([tail, mask]).astype(np.int32)
+    counts = np.concatenate([np.zeros((1,) + mask.shape[1:], dtype=np.int32), np.cumsum(full, axis=0)])
+    window = counts[steps:] - counts[:-steps]
+    return window[-len(mask):] == steps
+
+
+def alarm_onsets(
+    raise_mask: np.ndarray,
+    clear_mask: np.ndarray,
+    initial: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    시간 축(0) 방향 히스테리시스 상태 재생 (이력 블록용, 반복문 없음)
+    발생 조건이면 켜짐, 해제 조건이면 꺼짐, 둘 다 아니면 이전 상태 유지
+    (발생 시점 마스크, 블록 마지막 상태) 반환
+    """
+    shape = (-1,) + (1,) * (raise_mask.ndim - 1)
+    t = np.arange(len(raise_mask)).reshape(shape)
+    last_raise = np.maximum.accumulate(np.where(raise_mask, t, -1), axis=0)
+    last_clear = np.maximum.accumulate(np.where(clear_mask & ~raise_mask, t, -1), axis=0)
+
+    # 블록 이전 상태: 켜져 있었으면 -1 시점에 발생한 것으로 취급
+    last_raise = np.maximum(last_raise, np.where(initial, -1, -2))
+    last_clear = np.maximum(last_clear, np.where(initial, -2, -1))
+    state = last_raise > last_clear
+
+    previous = np.concatenate([initial[np.newaxis], state[:-1]])
+    return state & ~previous, state[-1] if len(state) else initial
+
+
+class AlarmReplay:
+    """
+    이력 블록을 시간순으로 재생하며 알림 발생 시점 계산
+    블록 경계의 상태와 최소 지속 판정용 직전 시점을 유지
+    """
+
+    def __init__(self, engine: "AlarmEngine", category: str, shape: tuple, step_seconds: float):
+        self.engine = engine
+        self.category = category
+        self.raise_steps, self.clear_steps = engine.history_steps(step_seconds)
+        self.state = np.zeros(shape, dtype=bool)
+        self._raise_tail = np.zeros((self.raise_steps - 1,) + shape, dtype=bool)
+        self._clear_tail = np.zeros((self.clear_steps - 1,) + shape, dtype=bool)
+
+    def onsets(self, values: np.ndarray) -> np.ndarray:
+        """측정/예측값 블록 (시점, ...) → 알림 발생 시점 마스크"""
+        if self.category == "process":
+            raise_mask, clear_mask = self.engine.process_conditions(values)
+        else:
+            raise_mask, clear_mask = self.engine.effluent_conditions(values)
+
+        raise_held = sustained(raise_mask, self.raise_steps, self._raise_tail)
+        clear_held = sustained(clear_mask, self.clear_steps, self._clear_tail)
+        self._raise_tail = _tail(self._raise_tail, raise_mask)
+        self._clear_tail = _tail(self._clear_tail, clear_mask)
+
+        onsets, self.state = alarm_onsets(raise_held, clear_held, self.state)
+        return onsets
+
+
+def _tail(tail: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """다음 블록 판정용 마지막 len(tail)개 시점"""
+    if not len(tail):
+        return tail
+    return np.concatenate([tail, mask])[-len(tail):]
+
+
+class _ChannelState:
+    """채널 묶음(같은 shape)의 알림 상태 배열"""
+
+    def __init__(self, shape: tuple):
+        self.active = np.zeros(shape, dtype=bool)
+        self.pending_since = np.full(shape, np.nan)
+        self.last_change = np.full(shape, -np.inf)
+
+    def due(
+        self,
+        raise_mask: np.ndarray,
+        clear_mask: np.ndarray,
+        now: float,
+        raise_seconds: float,
+        clear_seconds: float,
+        min_interval: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        상태를 바꿀 채널 마스크와 최소 간격 때문에 보류된 채널 마스크
+        조건이 끊긴 채널은 대기 시각 초기화
+        """
+        wanting = (raise_mask & ~self.active) | (clear_mask & self.active)
+        self.pending_since = np.where(wanting, np.fmin(self.pending_since, now), np.nan)
+        required = np.where(self.active, clear_seconds, raise_seconds)
+        ready = wanting & (now - self.pending_since >= required)
+        allowed = now - self.last_change >= min_interval
+        return ready & allowed, ready & ~allowed
+
+    def commit(self, mask: np.ndarray, now: float):
+        """상태 전이 확정"""
+        self.active ^= mask
+        self.pending_since[mask] = np.nan
+        self.last_change[mask] = now
+
+
+class AlarmEngine:
+    """알림 상태 머신 + 상태 전이 이벤트 기록"""
+
+    def __init__(self, engine: ThresholdEngine, store: ThresholdStore, topology: PlantTopology):
+        self.engine = engine
+        self.store = store
+        self.topology = topology
+        self.zone_count = topology.zone_count
+        self.parameters = list(engine.effluent_parameters)
+
+        self.hysteresis_ratio = settings.ALARM_HYSTERESIS_RATIO
+        self.raise_seconds = settings.ALARM_RAISE_SECONDS
+        self.clear_seconds = settings.ALARM_CLEAR_SECONDS
+        self.min_interval = settings.ALARM_MIN_INTERVAL_SECONDS
+        self.max_events_per_minute = settings.ALARM_MAX_EVENTS_PER_MINUTE
+
+        self._states = {
+            "process": _ChannelState(topology.installed.shape),
+            "tms": _ChannelState((len(self.parameters),)),
+            "prediction": _ChannelState((len(self.parameters),)),
+        }
+        self._clear_bounds: Optional[Tuple[int, Dict[str, np.ndarray]]] = None
+        self._active_events: Dict[tuple, Dict] = {}
+        self.recent: deque = deque(maxlen=settings.ALARM_RECENT_EVENTS)
+
+        # 전체 이벤트 상한 (토큰 버킷)
+        self._tokens = float(self.max_events_per_minute)
+        self._token_time = time.monotonic()
+        self._seq = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self.path: Optional[str] = None
+        self._db_lock = threading.Lock()
+
+        self.evaluations = 0
+        self.raised = 0
+        self.cleared = 0
+        self.deferred = 0
+
+    # ------------------------------------------------------------------
+    # 조건 마스크
+    # ------------------------------------------------------------------
+    def _bounds(self) -> Dict[str, np.ndarray]:
+        """해제 판정용 안쪽 경계 (임계값 컴파일 버전이 바뀔 때만 다시 계산)"""
+        compiled = self.engine.compiled
+        if self._clear_bounds is None or self._clear_bounds[0] != compiled.version:
+            bounds = {}
+            for name in ("process", "effluent"):
+                lower = getattr(compiled, f"{name}_lower")
+                upper = getattr(compiled, f"{name}_upper")
+                span = np.where(np.isnan(lower), np.abs(upper), upper - lower)
+                band = self.hysteresis_ratio * span
+                bounds[f"{name}_lower"] = lower + band
+                bounds[f"{name}_upper"] = upper - band
+            self._clear_bounds = (compiled.version, bounds)
+        return self._clear_bounds[1]
+
+    def process_conditions(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """공종 측정값 (..., 지, 공종, 센서) → (발생 조건, 해제 조건)"""
+        bounds = self._bounds()
+        raise_mask = self.engine.evaluate_process(values)
+        clear_mask = ~((values > bounds["process_upper"]) | (values < bounds["process_lower"]))
+        return raise_mask, clear_mask
+
+    def effluent_conditions(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """방류 측정/예측값 (..., 파라미터) → (발생 조건, 해제 조건)"""
+        bounds = self._bounds()
+        raise_mask = self.engine.evaluate_effluent(values)
+        clear_mask = ~((values > bounds["effluent_upper"]) | (values < bounds["effluent_lower"]))
+        return raise_mask, clear_mask
+
+    def history_steps(self, step_seconds: float) -> Tuple[int, int]:
+        """이력 간격에서 발생/해제 최소 지속 시간에 해당하는 시점 수"""
+        return (
+            max(1, int(np.ceil(self.raise_seconds / step_seconds))),
+            max(1, int(np.ceil(self.clear_seconds / step_seconds)))
+        )
+
+    def replay(self, category: str, shape: tuple, step_seconds: float) -> AlarmReplay:
+        """이력 블록 재생기 (category: process / tms / prediction)"""
+        return AlarmReplay(self, category, shape, step_seconds)
+
+    # ------------------------------------------------------------------
+    # 실시간 갱신
+    # ------------------------------------------------------------------
+    def update_process(self, values: np.ndarray, now: Optional[float] = None) -> List[Dict]:
+        """지별 센서 스냅샷 (지, 공종, 센서) 반영 → 상태 전이 이벤트"""
+        raise_mask, clear_mask = self.process_conditions(values)
+        return self._update("process", values, raise_mask, clear_mask, now)
+
+    def update_effluent(self, category: str, values: np.ndarray, now: Optional[float] = None) -> List[Dict]:
+        """방류 TMS 측정값(category=tms) 또는 3시간 후 예측값(category=prediction) 반영"""
+        raise_mask, clear_mask = self.effluent_conditions(values)
+        return self._update(category, values, raise_mask, clear_mask, now)
+
+    def _update(
+        self,
+        category: str,
+        values: np.ndarray,
+        raise_mask: np.ndarray,
+        clear_mask: np.ndarray,
+        now: Optional[float]
+    ) -> List[Dict]:
+        now = time.time() if now is None else now
+        state = self._states[category]
+        self.evaluations += 1
+
+        due, blocked = state.due(
+            raise_mask, clear_mask, now, self.raise_seconds, self.clear_seconds, self.min_interval
+        )
+        self.deferred += int(blocked.sum())
+
+        # 분당 이벤트 상한 초과분은 다음 갱신으로 보류 (대기 상태 유지)
+        indices = np.argwhere(due)
+        allowed = self._take_tokens(len(indices))
+        if allowed < len(indices):
+            self.deferred += len(indices) - allowed
+            due = np.zeros_like(due)
+            due[tuple(indices[:allowed].T)] = True
+            indices = indices[:allowed]
+
+        if not len(indices):
+            return []
+
+        raising = ~state.active[due]
+        state.commit(due, now)
+
+        timestamp = datetime.fromtimestamp(now)
+        events = []
+        for index, is_raise in zip(map(tuple, indices.tolist()), raising.tolist()):
+            event = self._make_event(category, index, float(values[index]), is_raise, timestamp)
+            if is_raise:
+                self.raised += 1
+                self._active_events[(category, index)] = event
+            else:
+                self.cleared += 1
+                self._active_events.pop((category, index), None)
+            events.append(event)
+
+        self.recent.extend(events)
+        return events
+
+    def _take_tokens(self, count: int) -> int:
+        """토큰 버킷에서 최대 count개 사용 (분당 max_events_per_minute개 충전)"""
+        if count == 0:
+            return 0
+        current = time.monotonic()
+        self._tokens = min(
+            float(self.max_events_per_minute),
+            self._tokens + (current - self._token_time) * self.max_events_per_minute / 60
+        )
+        self._token_time = current
+        allowed = min(count, int(self._tokens))
+        self._tokens -= allowed
+        return allowed
+
+    def _make_event(self, category: str, index: tuple, value: float, is_raise: bool, timestamp: datetime) -> Dict:
+        """상태 전이 이벤트 (실시간 알림 형식)"""
+        self._seq += 1
+        snapshot = self.store.current
+        state = "raised" if is_raise else "cleared"
+        event = {
+            "id": f"alarm_{timestamp.strftime('%Y%m%d_%H%M%S')}_{self._seq}",
+            "timestamp": timestamp.isoformat(),
+            "level": "abnormal" if is_raise else "normal",
+            "state": state,
+            "category": category,
+            "zone": None
+        }
+
+        if category == "process":
+            z_idx, r_idx, s_idx = index
+            zone_num = z_idx + 1
+            zone = self.topology.zone_labels[z_idx]
+            process_type, sensor = PROCESS_TYPES[r_idx], PROCESS_SENSORS[s_idx]
+            name = f"{zone} {PROCESS_NAMES[process_type]} {SENSOR_LABELS[sensor]}"
+            event["zone"] = zone
+            if self.topology.multi_plant:
+                event["plant"] = self.topology.plant_ids[self.topology.zone_plant[z_idx]]
+            event["channel"] = f"{zone_num}/{process_type}/{sensor}"
+            event["message"] = f"[비정상] {name} 이상 감지" if is_raise else f"[정상] {name} 정상 범위 복귀"
+            event["details"] = {
+                "processType": process_type,
+                "sensor": sensor,
+                "value": value,
+                "threshold": snapshot.process.get(process_type, {}).get(sensor, {})
+            }
+        else:
+            param = self.parameters[index[0]]
+            label = parameter_label(param)
+            event["channel"] = param
+            if category == "tms":
+                event["message"] = (
+                    f"[비정상] {label} 측정값 {value:g} mg/L (상한 초과)" if is_raise
+                    else f"[정상] {label} 측정값 정상 범위 복귀"
+                )
+                event["details"] = {"parameter": label, "value": value, "threshold": snapshot.effluent[param]}
+            else:
+                event["message"] = (
+                    f"[비정상] {label} 예측값 {value:g} mg/L (상한 초과 예상, 3시간 후)" if is_raise
+                    else f"[정상] {label} 예측값 정상 범위 복귀"
+                )
+                event["details"] = {"parameter": label, "predictedValue": value, "threshold": snapshot.effluent[param]}
+        return event
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def current_alerts(self, limit: int = 10) -> Dict:
+        """현재 발생 중인 알림 (최신순), 없으면 정상 메시지 1건"""
+        alerts = sorted(self._active_events.values(), key=lambda event: event["timestamp"], reverse=True)
+        if not alerts:
+            current_time = datetime.now()
+            alerts = [{
+                "id": f"alarm_{current_time.strftime('%Y%m%d_%H%M%S')}_normal",
+                "timestamp": current_time.isoformat(),
+                "level": "normal",
+                "category": "process",
+                "zone": None,
+                "message": "[정상] 모든 센서 정상 범위 유지 중",
+                "details": {}
+            }]
+        return {"alerts": alerts[:limit]}
+
+    def stats(self) -> Dict:
+        """알림 상태 현황"""
+        return {
+            "active": {category: int(state.active.sum()) for category, state in self._states.items()},
+            "evaluations": self.evaluations,
+            "raised": self.raised,
+            "cleared": self.cleared,
+            "deferred": self.deferred
+        }
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    def open(self, path: str):
+        """이벤트 기록 파일 열기 (앱 시작 시 호출)"""
+        with self._db_lock:
+            conn = open_sqlite(path)
+            conn.execute(SCHEMA)
+            conn.execute(INDEX)
+            self._conn = conn
+            self.path = path
+
+    def close(self):
+        """이벤트 기록 파일 닫기 (앱 종료 시 호출)"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def persist(self, events: List[Dict]):
+        """상태 전이 이벤트 기록 (한 트랜잭션, threadpool에서 호출)"""
+        if not events:
+            return
+        with self._db_lock:
+            if self._conn is None:
+                return
+            rows = [
+                (
+                    event["id"], event["timestamp"], event["category"], event["state"], event["zone"],
+                    event["channel"], json.dumps(event, ensure_ascii=False)
+                )
+                for event in events
+            ]
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("INSERT OR REPLACE INTO alarm_events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def prune(self, before: datetime) -> int:
+        """보관 기간이 지난 이벤트 기록 삭제 (삭제한 행 수)"""
+        with self._db_lock:
+            if self._conn is None:
+                return 0
+            with self._conn:
+                self._conn.execute("BEGIN")
+                return self._conn.execute("DELETE FROM alarm_events WHERE timestamp < ?", (before.isoformat(),)).rowcount
+
+    def vacuum(self, min_free_ratio: float) -> int:
+        """빈 페이지 비율이 기준 이상이면 기록 파일 VACUUM (정리한 바이트 수)"""
+        with self._db_lock:
+            return vacuum_sqlite(self._conn, min_free_ratio)
+
+    def query(self, limit: int = 100, category: Optional[str] = None, since: Optional[datetime] = None) -> List[Dict]:
+        """기록된 상태 전이 이벤트 (최신순)"""
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._db_lock:
+            if self._conn is None:
+                recent = [event for event in reversed(self.recent) if not category or event["category"] == category]
+                return recent[:limit]
+            rows = self._conn.execute(
+                f"SELECT event FROM alarm_events {where} ORDER BY timestamp DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [json.loads(row["event"]) for row in rows]
+
+
+# 전역 인스턴스
+alarm_engine = AlarmEngine(
+    engine=threshold_engine,
+    store=threshold_store,
+    topology=plant_topology
+)
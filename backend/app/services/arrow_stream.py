@@ -0,0 +1,155 @@
+"""
+Apache Arrow IPC 스트림 인코더
+이력 데이터 블록(NumPy 배열)을 컬럼 배열로 바로 변환하여 레코드 배치 단위로 점진적으로 전송
+- 행 단위 딕셔너리/문자열 시각 없이 블록당 컬럼마다 pa.array 한 번
+- 시각은 벽시계 기준 int64 마이크로초, 센서 미설치 지점(NaN)은 null 비트맵으로 표현
+"""
+import io
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from app.services.metrics import Counter
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# 센서 데이터 컬럼: (컬럼명, 공종 인덱스, 센서 인덱스 (None이면 공종 상태))
+SensorColumn = Tuple[str, int, Optional[int]]
+
+
+def sensor_data_columns(installed: np.ndarray) -> List[SensorColumn]:
+    """
+    처리장 구성(설치 마스크 (지, 공종, 센서))에서 센서 데이터 컬럼 도출
+    어느 지에든 설치된 (공종, 센서)만 값 컬럼으로 두고, 센서가 있는 공종마다 상태 컬럼 추가
+    """
+    columns: List[SensorColumn] = []
+    for r_idx, process_type in enumerate(PROCESS_TYPES):
+        sensors = np.flatnonzero(installed[:, r_idx].any(axis=0)).tolist()
+        if not sensors:
+            continue
+        columns += [(f"{process_type}_{PROCESS_SENSORS[s_idx]}", r_idx, s_idx) for s_idx in sensors]
+        columns.append((f"{process_type}_status", r_idx, None))
+    return columns
+
+
+def sensor_data_schema(columns: List[SensorColumn]) -> pa.Schema:
+    """센서 데이터 스키마 (시각, 지, 설치 센서 값/공종 상태)"""
+    return pa.schema(
+        [("timestamp", pa.timestamp("us")), ("zone", pa.string())]
+        + [(name, pa.float64() if s_idx is not None else pa.string()) for name, _, s_idx in columns]
+    )
+
+
+def prediction_schema(parameters: Sequence[str]) -> pa.Schema:
+    """예측 이력 스키마 (시각, 예측 대상 시각, 지, 판정 결과, 파라미터별 예측값)"""
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("us")),
+            ("forecast_time", pa.timestamp("us")),
+            ("zone", pa.string()),
+            ("result", pa.string())
+        ]
+        + [(param.lower(), pa.float64()) for param in parameters]
+    )
+
+
+def wall_micros(value: datetime) -> int:
+    """시각 → 벽시계 기준 마이크로초 (시간대가 있으면 UTC로 변환, pa.timestamp("us")와 같은 해석)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // MICROSECOND
+
+
+def sensor_data_batch(
+    schema: pa.Schema,
+    columns: List[SensorColumn],
+    times: np.ndarray,
+    zones: np.ndarray,
+    values: np.ndarray,
+    status: np.ndarray
+) -> pa.RecordBatch:
+    """
+    센서 데이터 블록 → 레코드 배치 (행 = 시점 × 지, 시각순)
+    times: 시점별 벽시계 마이크로초 (int64), zones: 지 이름
+    values: 측정값 (시점, 지, 공종, 센서), status: 공종 이상 여부 (시점, 지, 공종)
+    """
+    count, zone_count = values.shape[:2]
+    arrays = [
+        pa.array(np.repeat(times, zone_count), type=pa.timestamp("us")),
+        pa.array(np.tile(zones, count), type=pa.string())
+    ]
+    for _, r_idx, s_idx in columns:
+        if s_idx is None:
+            arrays.append(_result_array(status[:, :, r_idx].reshape(-1)))
+        else:
+            arrays.append(_float_array(values[:, :, r_idx, s_idx].reshape(-1)))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def prediction_batch(
+    schema: pa.Schema,
+    times: np.ndarray,
+    forecast_times: np.ndarray,
+    zones: np.ndarray,
+    abnormal: np.ndarray,
+    values: np.ndarray
+) -> pa.RecordBatch:
+    """예측 이력 블록 → 레코드 배치 (times/forecast_times: 벽시계 마이크로초, values: (행, 파라미터))"""
+    arrays = [
+        pa.array(times, type=pa.timestamp("us")),
+        pa.array(forecast_times, type=pa.timestamp("us")),
+        pa.array(zones, type=pa.string()),
+        _result_array(abnormal)
+    ]
+    arrays += [_float_array(values[:, p_idx]) for p_idx in range(values.shape[1])]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_arrow_stream(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    rows: Optional[Counter] = None
+) -> Iterator[bytes]:
+    """
+    레코드 배치를 Arrow IPC 스트림으로 인코딩
+    - 배치 하나를 기록할 때마다 바로 전송 (배치 크기 = 이력 블록 크기)
+    - rows를 주면 기록한 행 수를 배치마다 누적
+    """
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield _drain(sink)
+
+    for batch in batches:
+        if not batch.num_rows:
+            continue
+        writer.write_batch(batch)
+        if rows is not None:
+            rows.inc(batch.num_rows)
+        yield _drain(sink)
+
+    writer.close()
+    yield _drain(sink)
+
+
+def _float_array(values: np.ndarray) -> pa.Array:
+    """실수 배열 (NaN → null 비트맵)"""
+    return pa.array(values, mask=np.isnan(values), type=pa.float64())
+
+
+def _result_array(abnormal: np.ndarray) -> pa.Array:
+    """이상 여부 → "normal"/"abnormal" 문자열 배열"""
+    return pa.array(np.where(abnormal, "abnormal", "normal"), type=pa.string())
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """버퍼에 기록된 바이트를 꺼내고 버퍼 비우기"""
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
@@ -0,0 +1,150 @@
+"""
+예측 정확도 오프라인 백테스트
+저장된(CSV) 또는 생성한 TMS 시계열을 재생하며 각 시점에서 예측을 만들고
+파라미터·예측 시점별 MAE, RMSE, 기준 초과 적중률과 처리량(예측 수/초)을 계산
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services.forecasting import forecast_from_state, holt_step
+
+
+def load_tms_series(path: str, parameters: Sequence[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    CSV 파일에서 TMS 시계열 읽기
+    - 컬럼: timestamp, toc, ss, tn, tp (대소문자 무관)
+    - (첫 측정 기준 경과 초 배열, 파라미터 → 측정값 배열) 반환
+    """
+    df = pd.read_csv(path)
+    df.columns = [column.strip().lower().replace("-", "") for column in df.columns]
+    timestamps = pd.to_datetime(df["timestamp"])
+    df = df.assign(timestamp=timestamps).sort_values("timestamp")
+
+    seconds = (df["timestamp"] - df["timestamp"].iloc[0]).dt.total_seconds().to_numpy(dtype=np.float64)
+    return seconds, {param: df[param].to_numpy(dtype=np.float64) for param in parameters}
+
+
+def run_states(offsets: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """시계열을 순서대로 재생하여 각 시점 갱신 직후의 (수준, 추세, 오차분산) 배열 반환"""
+    count = len(values)
+    level = np.empty(count)
+    trend = np.empty(count)
+    residual_var = np.empty(count)
+    if count == 0:
+        return level, trend, residual_var
+
+    state = (values[0], 0.0, 0.0)
+    level[0], trend[0], residual_var[0] = state
+    for idx in range(1, count):
+        state = holt_step(
+            *state, values[idx], offsets[idx] - offsets[idx - 1],
+            settings.FORECAST_LEVEL_SECONDS, settings.FORECAST_TREND_SECONDS
+        )
+        level[idx], trend[idx], residual_var[idx] = state
+    return level, trend, residual_var
+
+
+def backtest_parameter(
+    param: str,
+    offsets: np.ndarray,
+    values: np.ndarray,
+    horizons: Sequence[int],
+    upper: float
+) -> Dict:
+    """
+    단일 파라미터 백테스트
+    상태 재생(순차) 후 모든 시점 × 예측 시점의 예측/실측 비교는 한 번의 배열 연산으로 처리
+    """
+    started = time.perf_counter()
+    level, trend, residual_var = run_states(offsets, values)
+    horizons_seconds = np.asarray(horizons, dtype=np.float64) * 3600
+    predicted, _ = forecast_from_state(
+        level, trend, residual_var, horizons_seconds, settings.FORECAST_DAMPING_SECONDS
+    )
+
+    # 각 시점 + 예측 시간에 해당하는 실측 인덱스 (허용 오차: 측정 간격의 절반)
+    targets = offsets[:, np.newaxis] + horizons_seconds[np.newaxis, :]
+    actual_idx = np.clip(np.searchsorted(offsets, targets), 0, len(offsets) - 1)
+    step = np.median(np.diff(offsets)) if len(offsets) > 1 else 0.0
+    valid = np.abs(offsets[actual_idx] - targets) <= step / 2
+    actual = values[actual_idx]
+    persistence = np.broadcast_to(values[:, np.newaxis], actual.shape)
+    elapsed = time.perf_counter() - started
+
+    metrics = []
+    for h_idx, hours in enumerate(horizons):
+        mask = valid[:, h_idx]
+        pred, act, naive = predicted[mask, h_idx], actual[mask, h_idx], persistence[mask, h_idx]
+        errors = pred - act
+        exceeded = act > upper
+        alarmed = pred > upper
+
+        metrics.append({
+            "horizon": hours,
+            "samples": int(mask.sum()),
+            "mae": _round(np.mean(np.abs(errors))) if len(errors) else None,
+            "rmse": _round(np.sqrt(np.mean(errors ** 2))) if len(errors) else None,
+            "persistenceMae": _round(np.mean(np.abs(naive - act))) if len(errors) else None,
+            "exceedances": int(exceeded.sum()),
+            "hitRate": _round(np.mean(alarmed[exceeded])) if exceeded.any() else None,
+            "falseAlarmRate": _round(np.mean(~exceeded[alarmed])) if alarmed.any() else None
+        })
+
+    forecasts = int(valid.sum())
+    return {
+        "parameter": param,
+        "forecasts": forecasts,
+        "seconds": round(elapsed, 4),
+        "forecastsPerSecond": round(forecasts / elapsed, 1) if elapsed > 0 else None,
+        "horizons": metrics
+    }
+
+
+def _backtest_task(args: tuple) -> Dict:
+    """프로세스 풀 작업 단위 (pickle 가능한 최상위 함수)"""
+    return backtest_parameter(*args)
+
+
+def run_backtest(
+    offsets: np.ndarray,
+    series: Dict[str, np.ndarray],
+    thresholds: Dict[str, Dict],
+    horizons: Sequence[int],
+    workers: int = 0
+) -> Dict:
+    """
+    전체 파라미터 백테스트
+    workers > 0이면 파라미터별로 프로세스 풀에서 병렬 실행
+    """
+    tasks = [
+        (param, offsets, values, list(horizons), thresholds[param]["upper"])
+        for param, values in series.items()
+    ]
+
+    started = time.perf_counter()
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results: List[Dict] = list(pool.map(_backtest_task, tasks))
+    else:
+        results = [_backtest_task(task) for task in tasks]
+    elapsed = time.perf_counter() - started
+
+    forecasts = sum(result["forecasts"] for result in results)
+    return {
+        "steps": len(offsets),
+        "horizons": list(horizons),
+        "workers": workers,
+        "forecasts": forecasts,
+        "seconds": round(elapsed, 4),
+        "forecastsPerSecond": round(forecasts / elapsed, 1) if elapsed > 0 else None,
+        "parameters": results
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(float(value), 4)
@@ -0,0 +1,94 @@
+"""
+이력 데이터 컬럼형(columnar) 변환
+행(row) 단위 레코드를 필드별 배열로 변환하여 응답 크기와 파싱 비용을 줄임
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+
+def to_columnar(records: List[Dict], constant_fields: Sequence[str] = ()) -> Dict:
+    """
+    레코드 목록을 컬럼형 구조로 변환
+    - timestamps: 일정 간격이면 {start, step, repeat, offset, count}, 아니면 {values, count}
+    - columns: 필드별 배열 (중첩 dict는 "anaerobic.orp" 형태로 평탄화)
+    - constants: 모든 레코드에서 동일한 고정 필드 (예: thresholds)
+    """
+    constants = {}
+    for field in constant_fields:
+        values = [record.get(field) for record in records]
+        if values and all(value == values[0] for value in values):
+            constants[field] = values[0]
+
+    columns: Dict[str, list] = {}
+    for idx, record in enumerate(records):
+        for key, value in record.items():
+            if key == "timestamp" or key in constants:
+                continue
+            _append_value(columns, key, value, idx)
+
+    # 일부 레코드에만 있는 필드는 None으로 길이를 맞춤
+    for values in columns.values():
+        values.extend([None] * (len(records) - len(values)))
+
+    return {
+        "timestamps": _encode_timestamps([record.get("timestamp") for record in records]),
+        "columns": columns,
+        "constants": constants
+    }
+
+
+def _append_value(columns: Dict[str, list], key: str, value, idx: int):
+    """값을 컬럼에 추가 (dict는 재귀적으로 평탄화)"""
+    if isinstance(value, dict):
+        for sub_key, sub_value in value.items():
+            _append_value(columns, f"{key}.{sub_key}", sub_value, idx)
+        return
+
+    column = columns.setdefault(key, [])
+    if len(column) < idx:
+        column.extend([None] * (idx - len(column)))
+    column.append(value)
+
+
+def _encode_timestamps(timestamps: List[Optional[str]]) -> Dict:
+    """
+    타임스탬프 인코딩
+    - 같은 시각이 일정 횟수(repeat)만큼 반복되고 고유 시각이 고정 간격(step)이면 base + step으로 압축
+    - 그 외에는 원본 문자열 배열 반환
+    """
+    count = len(timestamps)
+    if count == 0 or any(ts is None for ts in timestamps):
+        return {"values": timestamps, "count": count}
+
+    # 연속된 동일 시각 묶기 (전체 지 조회 시 시각당 지 개수만큼 반복)
+    distinct = [timestamps[0]]
+    runs = [1]
+    for ts in timestamps[1:]:
+        if ts == distinct[-1]:
+            runs[-1] += 1
+        else:
+            distinct.append(ts)
+            runs.append(1)
+
+    # 페이지 경계에서 잘린 첫/마지막 묶음은 repeat보다 짧을 수 있음
+    repeat = max(runs)
+    regular = all(run == repeat for run in runs[1:-1]) and runs[0] <= repeat and runs[-1] <= repeat
+    step = 0.0
+    if regular and len(distinct) > 1:
+        parsed = [datetime.fromisoformat(ts) for ts in distinct]
+        step = (parsed[1] - parsed[0]).total_seconds()
+        regular = step > 0 and all(
+            (parsed[i + 1] - parsed[i]).total_seconds() == step for i in range(len(parsed) - 1)
+        )
+
+    if not regular:
+        return {"values": timestamps, "count": count}
+
+    # i번째 레코드 시각 = start + ((i + offset) // repeat) * step
+    return {
+        "start": distinct[0],
+        "step": step,
+        "repeat": repeat,
+        "offset": repeat - runs[0],
+        "count": count
+    }
@@ -2,257 +2,462 @@
 Mock data generator for wastewater monitoring system
 실제 센서가 없으므로 실시간 데이터를 시뮬레이션
 """
-import random
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from app.config import settings
+from app.services.alarm_engine import alarm_engine
+from app.services.forecasting import ForecastResult, forecast_engine
+from app.services.reading_store import reading_store
+from app.services.rolling_stats import rolling_stats
+from app.services.simulation import EPOCH as SIMULATION_EPOCH, STREAM_FORECAST, STREAM_ZONE, simulation_engine
+from app.services.threshold_engine import PROCESS_NAMES, PROCESS_SENSORS, PROCESS_TYPES, parameter_label, threshold_engine
+from app.services.threshold_store import threshold_store
+from app.services.topology import SUPPORTED_SENSORS, Plant, plant_topology
+import numpy as np
+
+
+# 공종별 센서 측정 범위 (하한, 상한, 소수 자릿수), 범위 ≈ 평균 ± 3σ
+SENSOR_RANGES = {
+    ("anaerobic", "orp"): (-320, -290, 1),
+    ("anaerobic", "ph"): (6.8, 7.2, 2),
+    ("anoxic", "orp"): (-330, -300, 1),
+    ("anoxic", "ph"): (6.5, 7.0, 2),
+    ("aerobic", "ph"): (6.3, 6.8, 2),
+    ("aerobic", "do"): (4.0, 6.0, 2),
+    ("aerobic", "mlss"): (5500, 7500, 1),
+}
+
+# 방류 TMS 측정 범위 (하한, 상한), 범위 ≈ 평균 ± 3σ
+TMS_RANGES = {
+    "toc": (14, 18),
+    "ss": (4, 7),
+    "tn": (16, 19),
+    "tp": (0.7, 1.2),
+}
+
+# 센서별 시뮬레이션 동특성 (AR(1) 시정수 초, 일 주기 부하 반응, 부하 충격 반응, 측정 잡음), 반응/잡음은 σ 단위
+SENSOR_DYNAMICS = {
+    "orp": (1800, 0.5, 3.0, 0.15),
+    "ph": (3600, -0.5, -4.0, 0.15),
+    "do": (900, -1.5, -6.0, 0.15),     # 부하가 높으면 DO 저하
+    "mlss": (21600, 0.5, 4.0, 0.05),
+}
+SENSOR_LAG_SECONDS = 1800     # 유입 부하 → 반응조 반응 지연
+SENSOR_ZONE_OFFSET = 0.3      # 지별 기준값 차이 (σ 단위)
+
+# 방류 TMS 시뮬레이션 동특성 (충격 반응은 충격 크기에 따라 일부만 방류 기준을 넘도록 설정)
+TMS_DYNAMICS = {
+    "toc": (7200, 1.0, 15.0, 0.1),
+    "ss": (7200, 1.0, 10.0, 0.1),
+    "tn": (7200, 1.0, 6.0, 0.1),
+    "tp": (7200, 1.0, 14.4, 0.1),
+}
+TMS_LAG_SECONDS = 10800       # 유입 부하 → 방류 수질 반응 지연 (체류 시간)
+
+# 처리장 유량 (일 평균 유량 m³/일, 기준 시각 적산값, 유입 대비 지연 초)
+PROCESS_FLOWS = {
+    "inflow": (13500, 8000000, 0),
+    "biologicalInflow": (10000, 15000000, 3600),
+    "effluent": (13500, 6000000, 21600),
+}
+FLOW_DIURNAL_AMPLITUDE = 0.15   # 일 주기 부하 1당 유량 변동 비율
+
+# 과거 예측 시점 (시간) 및 예측 오차 (TMS σ 단위)
+PREDICTION_HOURS = 3
+PREDICTION_ERROR = 0.5
+
+# 이력 생성 시 한 번에 만드는 시점 수 (메모리 상한)
+HISTORY_BLOCK_STEPS = 1024
+
+# 지별 데이터 응답에 포함하는 공종별 센서 (설치되지 않은 센서는 None)
+ZONE_FIELDS = {
+    "anaerobic": ("orp", "ph"),
+    "anoxic": ("orp", "ph"),
+    "aerobic": ("orp", "ph", "do", "mlss"),
+}
+
+# 알림 이력 sensorData 필드 → (공종, 센서)
+SENSOR_DATA_FIELDS = {
+    "anaerobicOrp": ("anaerobic", "orp"),
+    "anaerobicPh": ("anaerobic", "ph"),
+    "anoxicOrp": ("anoxic", "orp"),
+    "anoxicPh": ("anoxic", "ph"),
+    "aerobicDo": ("aerobic", "do"),
+    "aerobicPh": ("aerobic", "ph"),
+    "aerobicMlss": ("aerobic", "mlss"),
+}
+
+
+def _optional(value: float) -> Optional[float]:
+    """NaN(센서 미설치)을 None으로 변환"""
+    return None if value != value else value
 
 
 class DataGenerator:
     """Mock 데이터 생성기"""
 
     def __init__(self):
-        self.zone_count = settings.ZONE_COUNT
-        self.process_thresholds = settings.DEFAULT_PROCESS_THRESHOLDS
-        self.effluent_thresholds = settings.DEFAULT_EFFLUENT_THRESHOLDS
+        self.topology = plant_topology
+        self.zone_count = plant_topology.zone_count
+        self.threshold_store = threshold_store
+        self.forecaster = forecast_engine
+        self.stats = rolling_stats
+        self.readings = reading_store
+        self.thresholds = threshold_engine
+        self.simulation = simulation_engine
+
+        # 임계값 변경 시 재평가용 마지막 측정값
+        self.last_zone_block: Optional[np.ndarray] = None
+        self.last_tms_values: Optional[np.ndarray] = None
+        self.last_tms_time: Optional[float] = None
+
+        # 센서 배열 (지, 공종, 센서) 레이아웃: 설치 여부, 측정 범위, 반올림 배율
+        shape = (len(PROCESS_TYPES), len(PROCESS_SENSORS))
+        self._sensor_low = np.zeros(shape)
+        self._sensor_high = np.zeros(shape)
+        self._sensor_scale = np.ones(shape)
+        for (process_type, sensor), (low, high, digits) in SENSOR_RANGES.items():
+            index = (PROCESS_TYPES.index(process_type), PROCESS_SENSORS.index(sensor))
+            self._sensor_low[index], self._sensor_high[index] = low, high
+            self._sensor_scale[index] = 10 ** digits
+        # 설치 센서는 처리장 구성에서 (설치 가능 센서는 구성 컴파일 시 SUPPORTED_SENSORS로 검증)
+        supported = {(process_type, sensor) for process_type, sensors in SUPPORTED_SENSORS.items() for sensor in sensors}
+        if supported != set(SENSOR_RANGES):
+            raise ValueError("설치 가능 센서(SUPPORTED_SENSORS)와 측정 범위(SENSOR_RANGES) 구성이 다릅니다.")
+        self.installed = self.topology.installed
+
+        # 지별 응답 고정 부분 (지 이름, 처리장) 및 공종별 필드 위치
+        self._zone_heads = [
+            {"zone": label, "plant": self.topology.plant_ids[p_idx]} if self.topology.multi_plant else {"zone": label}
+            for label, p_idx in zip(self.topology.zone_labels, self.topology.zone_plant.tolist())
+        ]
+        self._zone_fields = [
+            (process_type, r_idx, [(sensor, PROCESS_SENSORS.index(sensor)) for sensor in ZONE_FIELDS[process_type]])
+            for r_idx, process_type in enumerate(PROCESS_TYPES)
+        ]
+
+        self._sensor_channels = self._build_sensor_channels()
+        self._tms_channels = self._build_tms_channels()
+
+    def _build_sensor_channels(self):
+        """설치된 센서의 시뮬레이션 채널 (채널 번호는 처리장 구성에서)"""
+        dynamics = np.array([[SENSOR_DYNAMICS[sensor] for sensor in PROCESS_SENSORS]] * len(PROCESS_TYPES))
+
+        def column(value) -> np.ndarray:
+            return np.broadcast_to(value, self.installed.shape)[self.installed]
+
+        return self.simulation.channels(
+            ids=self.topology.channel_ids[self.installed],
+            mean=column((self._sensor_low + self._sensor_high) / 2),
+            spread=column((self._sensor_high - self._sensor_low) / 6),
+            tau=column(dynamics[..., 0]),
+            diurnal=column(dynamics[..., 1]),
+            shock=column(dynamics[..., 2]),
+            noise=column(dynamics[..., 3]),
+            lag=SENSOR_LAG_SECONDS,
+            offset=SENSOR_ZONE_OFFSET
+        )
+
+    def _build_tms_channels(self):
+        """방류 TMS 시뮬레이션 채널 (예측 엔진 파라미터 순서, 채널 번호는 센서 채널과 겹치지 않는 대역)"""
+        params = self.forecaster.parameters
+        low = np.array([TMS_RANGES[param][0] for param in params], dtype=np.float64)
+        high = np.array([TMS_RANGES[param][1] for param in params], dtype=np.float64)
+        dynamics = np.array([TMS_DYNAMICS[param] for param in params])
+        return self.simulation.channels(
+            ids=np.arange(len(params)) + (1 << 48),
+            mean=(low + high) / 2,
+            spread=(high - low) / 6,
+            tau=dynamics[:, 0],
+            diurnal=dynamics[:, 1],
+            shock=dynamics[:, 2],
+            noise=dynamics[:, 3],
+            lag=TMS_LAG_SECONDS
+        )
+
+    @property
+    def process_thresholds(self) -> Dict:
+        """현재 공종 임계값 (저장소 스냅샷, 읽기 전용)"""
+        return self.threshold_store.current.process
+
+    @property
+    def effluent_thresholds(self) -> Dict:
+        """현재 방류 임계값 (저장소 스냅샷, 읽기 전용)"""
+        return self.threshold_store.current.effluent
+
+    def generate_process_status(self, timestamp: Optional[float] = None) -> Dict:
+        """
+        처리장 공종 현황 생성 (timestamp: 기준 Unix 초, 없으면 현재 시각)
+        유량은 일 주기 부하를 따르고, 적산값은 기준 시각부터 유량을 적분한 값 (시각에 대해 단조 증가)
+        """
+        now = time.time() if timestamp is None else timestamp
+        status = {"timestamp": datetime.fromtimestamp(now).isoformat()}
+        for name, (daily, base, lag) in PROCESS_FLOWS.items():
+            lagged = now - lag
+            total = daily * (1 + FLOW_DIURNAL_AMPLITUDE * float(self.simulation.load(lagged)))
+            elapsed = lagged - SIMULATION_EPOCH
+            accumulated = base + daily / 86400 * (elapsed + FLOW_DIURNAL_AMPLITUDE * float(self.simulation.load_integral(lagged)))
+            status[name] = {"total": round(total), "accumulated": round(accumulated)}
+        return status
+
+    def generate_zone_data(self) -> Dict:
+        """
+        5개 지별 센서 데이터 생성 (공종 상태는 임계값 엔진으로 일괄 판정)
+        모의 데이터 전송 루프 전용 (이동 통계 갱신), REST 조회는 current_zone_data
+        """
+        block = self._generate_sensor_block(np.array([time.time()]))[0]
+        self.stats.update(block)
+        return self.publish_zone_data(block)
+
+    def publish_zone_data(self, block: np.ndarray, timestamp: Optional[float] = None) -> Dict:
+        """전송할 센서 스냅샷 기록 (REST 조회, 임계값 재판정, 연결 직후 스냅샷용) 후 응답 생성"""
+        self.last_zone_block = block
+        return self.zone_data(block, timestamp)
+
+    def current_zone_data(self) -> Dict:
+        """
+        REST 조회용 지별 센서 데이터: 마지막으로 전송한 스냅샷 (상태를 바꾸지 않음, 조회 횟수와 통계 무관)
+        첫 전송 전이면 모의 데이터는 현재 시각 값, 녹화 재생은 빈 값
+        """
+        block = self.last_zone_block
+        if block is None:
+            if settings.LIVE_SOURCE == "mock":
+                block = self._generate_sensor_block(np.array([time.time()]))[0]
+            else:
+                block = np.full(self.installed.shape, np.nan)
+        return self.zone_data(block)
+
+    def zone_data(self, block: np.ndarray, timestamp: Optional[float] = None) -> Dict:
+        """
+        센서 스냅샷 (지, 공종, 센서) → 지별 센서 데이터 응답 (상태를 바꾸지 않음)
+        모의 데이터, 수집 데이터(ingest), 녹화 재생(replay) 모두 이 형식으로 전송
+        """
+        values = block.tolist()
+        status = self.thresholds.process_status(block).tolist()
+
+        stats = self.stats.snapshot()
+        zone_stats = self.stats.zone_stats(stats)
+
+        zones = [
+            {**head, **self._zone_sections(zone_values, zone_status), "stats": stats_item}
+            for head, zone_values, zone_status, stats_item in zip(self._zone_heads, values, status, zone_stats)
+        ]
 
-    def generate_process_status(self) -> Dict:
-        """처리장 공종 현황 생성"""
         return {
-            "timestamp": datetime.now().isoformat(),
-            "inflow": {
-                "total": random.randint(12000, 15000),
-                "accumulated": random.randint(8000000, 10000000)
-            },
-            "biologicalInflow": {
-                "total": random.randint(9000, 11000),
-                "accumulated": random.randint(15000000, 18000000)
-            },
-            "effluent": {
-                "total": random.randint(12000, 15000),
-                "accumulated": random.randint(6000000, 7000000)
-            }
+            "timestamp": (datetime.now() if timestamp is None else datetime.fromtimestamp(timestamp)).isoformat(),
+            "zones": zones,
+            "anomalies": self.stats.anomalies(stats)
         }
 
-    def generate_zone_data(self) -> Dict:
-        """5개 지별 센서 데이터 생성"""
-        zones = []
-        for i in range(1, self.zone_count + 1):
-            # 혐기조 ORP: 1지, 4지만 센서 있음
-            has_anaerobic_orp = i in [1, 4]
-            # 혐기조 pH: 4지만 센서 있음
-            has_anaerobic_ph = i in [4]
-            # MLSS 센서는 1지와 4지에만 설치됨
-            has_mlss = i in [1, 4]
-
-            zone_data = {
-                "zone": f"{i}지",
-                "anaerobic": {
-                    "orp": round(random.uniform(-320, -290), 1) if has_anaerobic_orp else None,
-                    "ph": round(random.uniform(6.8, 7.2), 2) if has_anaerobic_ph else None,
-                    "status": self._get_status("anaerobic", "orp", random.uniform(-320, -290))
-                },
-                "anoxic": {
-                    "orp": round(random.uniform(-330, -300), 1),
-                    "ph": round(random.uniform(6.5, 7.0), 2),
-                    "status": "normal"
-                },
-                "aerobic": {
-                    "orp": None,
-                    "ph": round(random.uniform(6.3, 6.8), 2),
-                    "do": round(random.uniform(4.0, 6.0), 2),
-                    "mlss": round(random.uniform(5500, 7500), 1) if has_mlss else None,
-                    "status": "normal"
-                }
-            }
-            zones.append(zone_data)
-
+    def plant_zone_data(self, zone_data: Dict, plant: Plant) -> Dict:
+        """지별 센서 데이터 중 한 처리장 부분 (지 목록은 처리장 구간 슬라이스)"""
         return {
-            "timestamp": datetime.now().isoformat(),
-            "zones": zones
+            **zone_data,
+            "plant": plant.id,
+            "zones": zone_data["zones"][plant.zones],
+            "anomalies": [item for item in zone_data["anomalies"] if item.get("plant", plant.id) == plant.id]
         }
 
-    def generate_tms_data(self) -> Dict:
-        """방류 TMS 데이터 생성"""
-        parameters = {}
-        for param, threshold in self.effluent_thresholds.items():
-            if param == "toc":
-                value = round(random.uniform(14, 18), 1)
-            elif param == "ss":
-                value = round(random.uniform(4, 7), 1)
-            elif param == "tn":
-                value = round(random.uniform(16, 19), 1)
-            elif param == "tp":
-                value = round(random.uniform(0.7, 1.2), 1)
-            else:
-                value = 0
+    def evaluate_current_status(self) -> Dict:
+        """마지막으로 전송한 지별 센서값/TMS 측정값을 현재 임계값으로 다시 판정"""
+        zones = []
+        if self.last_zone_block is not None:
+            status = self.thresholds.process_status(self.last_zone_block).tolist()
+            for head, zone_status in zip(self._zone_heads, status):
+                zones.append({
+                    **head,
+                    **{
+                        process_type: "abnormal" if zone_status[r_idx] else "normal"
+                        for r_idx, process_type in enumerate(PROCESS_TYPES)
+                    }
+                })
+
+        tms = {}
+        if self.last_tms_values is not None:
+            abnormal = self.thresholds.evaluate_effluent(self.last_tms_values).tolist()
+            tms = {
+                param.upper(): "abnormal" if abnormal[idx] else "normal"
+                for idx, param in enumerate(self.forecaster.parameters)
+            }
 
-            # 가끔 비정상 값 생성 (10% 확률)
-            if random.random() < 0.1:
-                value = threshold["upper"] + random.uniform(0.5, 2)
+        return {"zones": zones, "tms": tms}
+
+    def _generate_sensor_block(self, times: np.ndarray) -> np.ndarray:
+        """
+        시각 배열 (Unix 초) → 센서 측정값 블록 (시점, 지, 공종, 센서)
+        같은 시각이면 실시간/이력 어디서 조회해도 같은 값, 설치되지 않은 센서는 NaN
+        """
+        values = np.full((len(times),) + self.installed.shape, np.nan)
+        sampled = self.simulation.sample(self._sensor_channels, times)
+        scale = self._sensor_scale[self.installed.nonzero()[1:]]
+        values[:, self.installed] = np.round(sampled * scale) / scale
+        return values
+
+    def _history_sensor_block(self, times: np.ndarray, step: float) -> np.ndarray:
+        """
+        이력 조회/내보내기용 센서 블록 (시점, 지, 공종, 센서)
+        LIVE_SOURCE=ingest이면 수집 측정값(시점마다 직전 step 구간의 채널별 마지막 값), 그 외에는 모의 데이터
+        """
+        if settings.LIVE_SOURCE != "ingest":
+            return self._generate_sensor_block(times)
+        values = np.full((len(times),) + self.installed.shape, np.nan)
+        values[:, self.installed] = self.readings.sample(times, step, self.installed, self._rollup_before())
+        return values
+
+    @staticmethod
+    def _rollup_before() -> float:
+        """시간 요약 대상 시각 (ROLLUP_AFTER_DAYS 이전, 시간 간격 이력은 이 이전 시점을 요약에서 조회)"""
+        return time.time() - settings.ROLLUP_AFTER_DAYS * 86400
+
+    @staticmethod
+    def _block_times(start_time: datetime, block_start: int, count: int, delta: timedelta) -> np.ndarray:
+        """이력 블록의 시점별 Unix 초"""
+        return start_time.timestamp() + (block_start + np.arange(count)) * delta.total_seconds()
+
+    def _zone_sections(self, values: List[List[float]], status: List[bool]) -> Dict:
+        """한 지의 (공종, 센서) 측정값/상태 → 공종별 응답 딕셔너리"""
+        sections = {}
+        for process_type, r_idx, fields in self._zone_fields:
+            row = values[r_idx]
+            section = {sensor: _optional(row[s_idx]) for sensor, s_idx in fields}
+            section["status"] = "abnormal" if status[r_idx] else "normal"
+            sections[process_type] = section
+        return sections
+
+    def _sample_tms(self, now: float) -> np.ndarray:
+        """현재 시각 모의 TMS 측정값 (파라미터,)"""
+        return np.round(self.simulation.sample(self._tms_channels, [now])[0], 1)
 
-            status = "abnormal" if value > threshold["upper"] else "normal"
+    def generate_tms_data(self) -> Dict:
+        """
+        방류 TMS 데이터 생성 (부하 충격 구간에는 방류 기준 초과 가능)
+        모의 데이터 전송 루프 전용 (예측 엔진 갱신), REST 조회는 current_tms_data
+        """
+        now = time.time()
+        return self.tms_data(self._sample_tms(now), now)
+
+    def tms_data(self, tms_values: np.ndarray, timestamp: Optional[float] = None) -> Dict:
+        """
+        전송할 TMS 측정값 (파라미터,) 기록 및 예측 엔진 갱신 후 방류 TMS 데이터 응답 (timestamp: 측정 Unix 초)
+        모의 데이터와 녹화 재생(replay) 전송 루프에서만 호출 (예측 엔진은 측정값 1건당 O(1) 갱신)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.last_tms_values = tms_values
+        self.last_tms_time = timestamp
+        self.forecaster.update(dict(zip(self.forecaster.parameters, tms_values.tolist())), timestamp)
+        return self._tms_response(tms_values, timestamp)
+
+    def current_tms_data(self) -> Dict:
+        """
+        REST 조회용 방류 TMS 데이터: 마지막으로 전송한 측정값 (예측 엔진을 바꾸지 않음)
+        첫 전송 전이면 모의 데이터는 현재 시각 값, 녹화 재생은 빈 값
+        """
+        if self.last_tms_values is not None:
+            return self._tms_response(self.last_tms_values, self.last_tms_time)
+        now = time.time()
+        if settings.LIVE_SOURCE == "replay":
+            return self._tms_response(np.full(len(self.forecaster.parameters), np.nan), now)
+        return self._tms_response(self._sample_tms(now), now)
+
+    def _tms_response(self, tms_values: np.ndarray, timestamp: float) -> Dict:
+        """TMS 측정값 (파라미터,) → 방류 TMS 데이터 응답 (측정값이 없는 항목은 null)"""
+        values = tms_values.tolist()
+        abnormal = self.thresholds.evaluate_effluent(tms_values).tolist()
 
+        parameters = {}
+        for idx, param in enumerate(self.forecaster.parameters):
             parameters[param.upper()] = {
-                "value": value,
+                "value": _optional(values[idx]),
                 "unit": "mg/L",
-                "status": status,
-                "threshold": threshold
+                "status": "abnormal" if abnormal[idx] else "normal",
+                "threshold": self.effluent_thresholds[param]
             }
 
         return {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
             "parameters": parameters
         }
 
-    def generate_prediction_data(self, hours: int = 3) -> Dict:
-        """AI 예측 데이터 생성 (1시간 또는 3시간 후)"""
+    def ensure_forecast_state(self):
+        """
+        측정값이 아직 없으면 모의 TMS 측정 1회로 예측 엔진 초기화
+        실시간 전송 루프 시작 시에만 호출 (녹화 재생은 첫 TMS 프레임부터 예측)
+        """
+        if self.forecaster.observations == 0:
+            self.generate_tms_data()
+
+    def generate_prediction_data(self, hours: int = 3, forecast: Optional[ForecastResult] = None) -> Dict:
+        """
+        AI 예측 데이터 생성 (1시간 또는 3시간 후)
+        forecast가 주어지면 추론 서비스 결과를 사용, 없으면 예측 엔진 상태에서 조회
+        """
+        if forecast is None:
+            predicted, std = self.forecaster.forecast(hours * 3600)
+            current = self.forecaster.last_values
+        else:
+            predicted, std, current = forecast.predicted[:, 0], forecast.std[:, 0], forecast.current
+        confidence = self.forecaster.confidence(predicted, std)
+        predicted = np.round(predicted, 1)
+        abnormal = self.thresholds.evaluate_effluent(predicted).tolist()
+
         current_time = datetime.now()
         forecast_time = current_time + timedelta(hours=hours)
 
         predictions = []
-        for param, threshold in self.effluent_thresholds.items():
-            if param == "toc":
-                current_val = round(random.uniform(15, 17), 1)
-                predicted_val = round(current_val + random.uniform(-1, 1.5), 1)
-            elif param == "ss":
-                current_val = round(random.uniform(4.5, 6), 1)
-                predicted_val = round(current_val + random.uniform(-0.5, 1), 1)
-            elif param == "tn":
-                current_val = round(random.uniform(17, 19), 1)
-                predicted_val = round(current_val + random.uniform(-0.5, 1.5), 1)
-            elif param == "tp":
-                current_val = round(random.uniform(0.8, 1.1), 1)
-                predicted_val = round(current_val + random.uniform(-0.1, 0.3), 1)
-            else:
-                current_val = 0
-                predicted_val = 0
-
-            # 가끔 비정상 예측 (15% 확률)
-            if random.random() < 0.15:
-                predicted_val = threshold["upper"] + random.uniform(0.5, 2)
-
-            status = "abnormal" if predicted_val > threshold["upper"] else "normal"
-
+        for idx, param in enumerate(self.forecaster.parameters):
             predictions.append({
-                "parameter": param.upper().replace("N", "-N").replace("P", "-P"),
-                "current": current_val,
-                "predicted": predicted_val,
+                "parameter": parameter_label(param),
+                "current": round(float(current[idx]), 1),
+                "predicted": float(predicted[idx]),
                 "unit": "mg/L",
-                "confidence": round(random.uniform(0.85, 0.95), 2),
-                "status": status,
-                "threshold": threshold
+                "confidence": round(float(confidence[idx]), 2),
+                "status": "abnormal" if abnormal[idx] else "normal",
+                "threshold": self.effluent_thresholds[param]
             })
 
-        return {
+        result = {
             "timestamp": current_time.isoformat(),
             "forecastTime": forecast_time.isoformat(),
             "predictions": predictions
         }
+        if forecast is not None:
+            result["source"] = forecast.source
+        return result
 
-    def generate_alerts(self, limit: int = 10) -> Dict:
-        """실시간 알림 생성"""
-        alerts = []
-        current_time = datetime.now()
-
-        # 공종 알림
-        if random.random() < 0.3:
-            zone_num = random.randint(1, 5)
-            zone = f"{zone_num}지"
-            process_types = ["anaerobic", "anoxic", "aerobic"]
-            process_type = random.choice(process_types)
-            process_names = {"anaerobic": "혐기조", "anoxic": "무산소조", "aerobic": "호기조"}
-
-            # 센서 설치 여부에 따라 사용 가능한 센서 결정
-            available_sensors = []
-            if process_type == "anaerobic":
-                # 혐기조 ORP: 1지, 4지만 / 혐기조 pH: 4지만
-                if zone_num in [1, 4]:
-                    available_sensors.append("ORP")
-                if zone_num in [4]:
-                    available_sensors.append("pH")
-            elif process_type == "anoxic":
-                available_sensors = ["ORP", "pH"]
-            elif process_type == "aerobic":
-                available_sensors = ["DO", "pH"]
-                # MLSS: 1지, 4지만
-                if zone_num in [1, 4]:
-                    available_sensors.append("MLSS")
-
-            # 사용 가능한 센서가 없으면 알림 생성 안 함
-            if not available_sensors:
-                return self.generate_alerts(limit)
-
-            sensor = random.choice(available_sensors)
-
-            alert_time = current_time - timedelta(minutes=random.randint(1, 30))
-            alerts.append({
-                "id": f"alarm_{alert_time.strftime('%Y%m%d_%H%M%S')}_{len(alerts)+1}",
-                "timestamp": alert_time.isoformat(),
-                "level": "abnormal",
-                "category": "process",
-                "zone": zone,
-                "message": f"[비정상] {zone} {process_names[process_type]} {sensor} 이상 감지",
-                "details": {
-                    "processType": process_type,
-                    "sensor": sensor.lower(),
-                    "value": random.uniform(-450, -180) if sensor == "ORP" else random.uniform(5.5, 8.0),
-                    "threshold": self.process_thresholds[process_type].get(sensor.lower(), {})
-                }
-            })
+    def generate_prediction_curves(self, horizons: List[int], forecast: ForecastResult) -> Dict:
+        """
+        여러 예측 시점(시간 단위)의 예측 곡선 응답 (추론 서비스 결과 변환)
+        같은 예측 엔진 상태의 추론 결과는 추론 서비스가 전체 시점으로 한 번 계산해 REST와 WebSocket이 공유
+        """
+        predicted, std, current = forecast.predicted, forecast.std, forecast.current
 
-        # 예측 알림
-        if random.random() < 0.2:
-            param = random.choice(["TOC", "SS", "T-N", "T-P"])
-            alert_time = current_time - timedelta(minutes=random.randint(5, 60))
-            predicted_val = round(random.uniform(22, 28), 1)
-
-            alerts.append({
-                "id": f"alarm_{alert_time.strftime('%Y%m%d_%H%M%S')}_{len(alerts)+1}",
-                "timestamp": alert_time.isoformat(),
-                "level": "abnormal",
-                "category": "prediction",
-                "zone": None,
-                "message": f"[비정상] {param} 예측값 {predicted_val} mg/L (상한 초과 예상, 3시간 후)",
-                "details": {
-                    "parameter": param,
-                    "predictedValue": predicted_val,
-                    "threshold": {"upper": 25},
-                    "forecastTime": (alert_time + timedelta(hours=3)).isoformat()
-                }
-            })
+        current_time = datetime.now()
+        confidence = self.forecaster.confidence(predicted, std)
+        predicted = np.round(predicted, 1)
+        # (파라미터, 예측 시점) → 마지막 축이 파라미터가 되도록 전치하여 평가
+        status = np.where(self.thresholds.evaluate_effluent(predicted.T).T, "abnormal", "normal")
 
-        # 정상 알림 (알림이 없으면)
-        if len(alerts) == 0:
-            alerts.append({
-                "id": f"alarm_{current_time.strftime('%Y%m%d_%H%M%S')}_normal",
-                "timestamp": current_time.isoformat(),
-                "level": "normal",
-                "category": "process",
-                "zone": None,
-                "message": "[정상] 모든 센서 정상 범위 유지 중",
-                "details": {}
+        predictions = []
+        for idx, param in enumerate(self.forecaster.parameters):
+            predictions.append({
+                "parameter": parameter_label(param),
+                "current": round(float(current[idx]), 1),
+                "predicted": predicted[idx].tolist(),
+                "unit": "mg/L",
+                "confidence": np.round(confidence[idx], 2).tolist(),
+                "status": status[idx].tolist(),
+                "threshold": self.effluent_thresholds[param]
             })
 
-        return {"alerts": alerts[:limit]}
-
-    def _get_status(self, process_type: str, sensor: str, value: Optional[float]) -> str:
-        """임계값 기준으로 상태 판단"""
-        if value is None:
-            return "normal"
-
-        threshold = self.process_thresholds.get(process_type, {}).get(sensor, {})
-        if not threshold:
-            return "normal"
-
-        upper = threshold.get("upper")
-        lower = threshold.get("lower")
-
-        if upper and lower:
-            if value > upper or value < lower:
-                return "abnormal"
-
-        return "normal"
+        result = {
+            "timestamp": current_time.isoformat(),
+            "horizons": list(horizons),
+            "forecastTimes": [(current_time + timedelta(hours=hours)).isoformat() for hours in horizons],
+            "predictions": predictions,
+            "source": forecast.source
+        }
+        return result
 
     def generate_historical_sensor_data(
         self,
@@ -262,57 +467,123 @@ class DataGenerator:
         interval: str = "hour"
     ) -> List[Dict]:
         """과거 센서 데이터 생성 (이력 조회용)"""
-        data = []
-        current = start_time
+        return list(self.iter_historical_sensor_data(zone, start_time, end_time, interval))
 
-        # 시간 간격 설정
+    def iter_historical_sensor_data(
+        self,
+        zone: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str = "hour"
+    ) -> Iterator[Dict]:
+        """
+        과거 센서 데이터를 시간순으로 하나씩 생성 (대용량 스트리밍용)
+        HISTORY_BLOCK_STEPS 시점씩 배열로 생성·평가하여 메모리 사용량은 블록 크기로 제한
+        """
         delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
-
-        while current <= end_time:
-            if zone == "all":
-                # 전체 지 데이터 생성
-                for i in range(1, self.zone_count + 1):
-                    record = self._generate_single_sensor_record(f"{i}지", current)
-                    data.append(record)
-            else:
-                # 특정 지 데이터만 생성
-                record = self._generate_single_sensor_record(f"{zone}지", current)
-                data.append(record)
-
-            current += delta
-
-        return data
-
-    def _generate_single_sensor_record(self, zone: str, timestamp: datetime) -> Dict:
-        """단일 센서 레코드 생성"""
-        # 혐기조 ORP: 1지, 4지만 센서 있음
-        has_anaerobic_orp = zone in ["1지", "4지"]
-        # 혐기조 pH: 4지만 센서 있음
-        has_anaerobic_ph = zone in ["4지"]
-        # MLSS 센서는 1지와 4지에만 설치됨
-        has_mlss = zone in ["1지", "4지"]
-
-        return {
-            "timestamp": timestamp.isoformat(),
-            "zone": zone,
-            "anaerobic": {
-                "orp": round(random.uniform(-320, -290), 1) if has_anaerobic_orp else None,
-                "ph": round(random.uniform(6.8, 7.2), 2) if has_anaerobic_ph else None,
-                "status": "normal"
-            },
-            "anoxic": {
-                "orp": round(random.uniform(-330, -300), 1),
-                "ph": round(random.uniform(6.5, 7.0), 2),
-                "status": "normal"
-            },
-            "aerobic": {
-                "orp": None,
-                "ph": round(random.uniform(6.3, 6.8), 2),
-                "do": round(random.uniform(4.0, 6.0), 2),
-                "mlss": round(random.uniform(5500, 7500), 1) if has_mlss else None,
-                "status": "normal"
-            }
-        }
+        heads = [self._zone_heads[z_idx] for z_idx in self._zone_indices(zone)]
+
+        for block_start, _, block, status in self.iter_historical_sensor_blocks(zone, start_time, end_time, interval):
+            values = block.tolist()
+            status = status.tolist()
+            for t_idx in range(len(values)):
+                timestamp = (start_time + (block_start + t_idx) * delta).isoformat()
+                for idx, head in enumerate(heads):
+                    yield {
+                        "timestamp": timestamp,
+                        **head,
+                        **self._zone_sections(values[t_idx][idx], status[t_idx][idx])
+                    }
+
+    def iter_historical_sensor_blocks(
+        self,
+        zone: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str = "hour"
+    ) -> Iterator[tuple]:
+        """
+        과거 센서 데이터 블록 (컬럼형 내보내기용, 행 단위 딕셔너리 없음)
+        (블록 첫 시점 번호, 선택 지 이름, 측정값 (시점, 선택 지, 공종, 센서), 공종 이상 여부 (시점, 선택 지, 공종)) 반환
+        """
+        delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
+        zone_indices = self._zone_indices(zone)
+        labels = np.array(self.topology.zone_labels)[zone_indices]
+        total = self._step_count(start_time, end_time, delta)
+
+        for block_start in range(0, total, HISTORY_BLOCK_STEPS):
+            count = min(HISTORY_BLOCK_STEPS, total - block_start)
+            block = self._history_sensor_block(
+                self._block_times(start_time, block_start, count, delta), delta.total_seconds()
+            )[:, zone_indices]
+            yield block_start, labels, block, self.thresholds.process_status(block)
+
+    def _zone_indices(self, zone: str) -> List[int]:
+        """지 필터("all" 또는 지 번호) → 지 인덱스 목록"""
+        return self.topology.zone_indices(zone)
+
+    @staticmethod
+    def _step_count(start_time: datetime, end_time: datetime, delta: timedelta) -> int:
+        """시작~종료(포함) 구간의 시점 수"""
+        if end_time < start_time:
+            return 0
+        return int((end_time - start_time) // delta) + 1
+
+    def is_sensor_installed(self, zone_num: int, process_type: str, sensor: str) -> bool:
+        """지/공종/센서 설치 여부 (처리장 구성 기준)"""
+        return self.topology.is_installed(zone_num, process_type, sensor)
+
+    def generate_historical_sensor_series(
+        self,
+        zone_num: int,
+        process_type: str,
+        sensor: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str = "hour"
+    ) -> tuple:
+        """
+        단일 센서 시계열 생성 (차트/집계용)
+        (시작 시각 기준 경과 초 배열, 측정값 배열) 반환, 센서 미설치 시 빈 배열
+        """
+        step = 3600 if interval == "hour" else 60
+        count = int((end_time - start_time).total_seconds() // step) + 1 if end_time >= start_time else 0
+        if not self.is_sensor_installed(zone_num, process_type, sensor):
+            count = 0
+
+        offsets = np.arange(count, dtype=np.float64) * step
+        if not count:
+            return offsets, np.zeros(0)
+
+        index = (zone_num - 1, PROCESS_TYPES.index(process_type), PROCESS_SENSORS.index(sensor))
+        if settings.LIVE_SOURCE == "ingest":
+            selected = np.zeros_like(self.installed)
+            selected[index] = True
+            return offsets, self.readings.sample(
+                start_time.timestamp() + offsets, step, selected, self._rollup_before()
+            )[:, 0]
+
+        # 해당 채널만 시뮬레이션 (지별 전체 블록과 같은 값)
+        channel = self._sensor_channels.take(self._sensor_channels.ids == self.topology.channel_ids[index])
+        values = self.simulation.sample(channel, start_time.timestamp() + offsets)[:, 0]
+        return offsets, np.round(values, SENSOR_RANGES[(process_type, sensor)][2])
+
+    def generate_historical_tms_series(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        step_seconds: float = 600
+    ) -> tuple:
+        """
+        방류 TMS 시계열 생성 (백테스트용)
+        (시작 시각 기준 경과 초 배열, 파라미터 → 측정값 배열) 반환
+        """
+        count = int((end_time - start_time).total_seconds() // step_seconds) + 1 if end_time >= start_time else 0
+        offsets = np.arange(count, dtype=np.float64) * step_seconds
+
+        values = np.round(self.simulation.sample(self._tms_channels, start_time.timestamp() + offsets), 1)
+        series = {param: values[:, idx] for idx, param in enumerate(self.forecaster.parameters)}
+        return offsets, series
 
     def generate_historical_predictions(
         self,
@@ -323,50 +594,78 @@ class DataGenerator:
         interval: str = "hour"
     ) -> List[Dict]:
         """과거 예측 데이터 생성 (이력 조회용)"""
-        data = []
-        current = start_time
+        return list(self.iter_historical_predictions(zone, result, start_time, end_time, interval))
 
-        # 시간 간격 설정
+    def iter_historical_predictions(
+        self,
+        zone: str,
+        result: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str = "hour"
+    ) -> Iterator[Dict]:
+        """과거 예측 데이터를 시간순으로 하나씩 생성 (대용량 스트리밍용, 결과는 임계값 엔진으로 판정)"""
         delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
+        thresholds = {k.upper(): v for k, v in self.effluent_thresholds.items()}
+        keys = [param.upper() for param in self.forecaster.parameters]
+
+        blocks = self.iter_historical_prediction_blocks(zone, result, start_time, end_time, interval)
+        for steps, zones, abnormal, values in blocks:
+            for step, zone_label, is_abnormal, row in zip(steps.tolist(), zones.tolist(), abnormal.tolist(), values.tolist()):
+                current = start_time + step * delta
+                yield {
+                    "timestamp": current.isoformat(),
+                    "forecastTime": (current + timedelta(hours=PREDICTION_HOURS)).isoformat(),
+                    "zone": zone_label,
+                    "result": "abnormal" if is_abnormal else "normal",
+                    "predictions": dict(zip(keys, row)),
+                    "thresholds": thresholds
+                }
 
-        while current <= end_time:
-            # 결과 필터 적용 (20% 확률로 비정상)
-            is_abnormal = random.random() < 0.2
-            record_result = "abnormal" if is_abnormal else "normal"
+    def iter_historical_prediction_blocks(
+        self,
+        zone: str,
+        result: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: str = "hour"
+    ) -> Iterator[tuple]:
+        """
+        과거 예측 데이터 블록 (컬럼형 내보내기용, result 필터 적용 후)
+        (시점 번호, 지 이름, 이상 여부, 예측값 (시점, 파라미터)) 배열 반환
+        """
+        delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
+        total = self._step_count(start_time, end_time, delta)
+        labels = np.array(self.topology.zone_labels)
+        fixed_zone = None
+        if zone != "all":
+            indices = self._zone_indices(zone)
+            fixed_zone = labels[indices[0]] if indices else f"{zone}지"
+
+        for block_start in range(0, total, HISTORY_BLOCK_STEPS):
+            count = min(HISTORY_BLOCK_STEPS, total - block_start)
+            times = self._block_times(start_time, block_start, count, delta)
+            block = self._generate_prediction_block(times)
+            abnormal = self.thresholds.evaluate_effluent(block).any(axis=1)
+            if fixed_zone is None:
+                zones = labels[(self.simulation.uniform(STREAM_ZONE, 0, times) * self.zone_count).astype(int)]
+            else:
+                zones = np.full(count, fixed_zone)
 
             # result 필터가 있으면 적용
-            if result != "all" and record_result != result:
-                current += delta
-                continue
-
-            zone_num = zone if zone != "all" else f"{random.randint(1, 5)}"
-            forecast_time = current + timedelta(hours=3)
-
-            predictions = {
-                "TOC": round(random.uniform(15, 20), 1),
-                "SS": round(random.uniform(5, 8), 1),
-                "TN": round(random.uniform(17, 19), 1),
-                "TP": round(random.uniform(0.8, 1.2), 1)
-            }
-
-            # 비정상일 경우 하나의 값을 임계값 초과시킴
-            if is_abnormal:
-                abnormal_param = random.choice(["TOC", "SS", "TN", "TP"])
-                threshold = self.effluent_thresholds[abnormal_param.lower().replace("-", "")]
-                predictions[abnormal_param] = round(threshold["upper"] + random.uniform(0.5, 3), 1)
-
-            data.append({
-                "timestamp": current.isoformat(),
-                "forecastTime": forecast_time.isoformat(),
-                "zone": f"{zone_num}지",
-                "result": record_result,
-                "predictions": predictions,
-                "thresholds": {k.upper(): v for k, v in self.effluent_thresholds.items()}
-            })
-
-            current += delta
-
-        return data
+            keep = slice(None) if result == "all" else abnormal == (result == "abnormal")
+            steps = block_start + np.arange(count)
+            yield steps[keep], zones[keep], abnormal[keep], block[keep]
+
+    def _generate_prediction_block(self, times: np.ndarray) -> np.ndarray:
+        """
+        예측 시각 배열 → 과거 예측값 블록 (시점, 파라미터)
+        PREDICTION_HOURS 뒤의 TMS 시뮬레이션 값에 예측 오차를 더한 값 (부하 충격 구간에는 기준 초과 예측)
+        """
+        channels = self._tms_channels
+        actual = self.simulation.sample(channels, times + PREDICTION_HOURS * 3600)
+        error = self.simulation.normal(STREAM_FORECAST, channels.ids[None, :], times[:, None])
+        return np.round(actual + PREDICTION_ERROR * channels.spread * error, 1)
 
     def generate_historical_alarms_process(
         self,
@@ -377,64 +676,57 @@ class DataGenerator:
         end_time: datetime,
         interval: str = "hour"
     ) -> List[Dict]:
-        """과거 공종 알림 데이터 생성"""
+        """
+        과거 공종 알림 데이터 생성
+        센서 이력 블록을 알림 상태 머신(히스테리시스, 최소 지속)으로 재생하여 알림이 발생한 시점마다 1건
+        """
         data = []
-        current = start_time
-
-        # 시간 간격 설정
         delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
-
-        # 알림은 가끔 발생 (30% 확률)
-        while current <= end_time:
-            if random.random() > 0.3:
-                current += delta
+        total = self._step_count(start_time, end_time, delta)
+
+        # 필터 적용 (지 × 공종 × 센서 선택 마스크)
+        selected = np.zeros_like(self.installed)
+        selected[self._zone_indices(zone)] = True
+        if process_type != "all":
+            selected[:, [r for r, name in enumerate(PROCESS_TYPES) if name != process_type]] = False
+        if sensor != "all":
+            selected[:, :, [s for s, name in enumerate(PROCESS_SENSORS) if name != sensor]] = False
+        selected &= self.installed
+
+        field_indices = [
+            (field, PROCESS_TYPES.index(process), PROCESS_SENSORS.index(name))
+            for field, (process, name) in SENSOR_DATA_FIELDS.items()
+        ]
+
+        replay = alarm_engine.replay("process", self.installed.shape, delta.total_seconds())
+
+        for block_start in range(0, total, HISTORY_BLOCK_STEPS):
+            count = min(HISTORY_BLOCK_STEPS, total - block_start)
+            block = self._history_sensor_block(
+                self._block_times(start_time, block_start, count, delta), delta.total_seconds()
+            )
+            hits = np.nonzero(replay.onsets(block) & selected)
+            if not len(hits[0]):
                 continue
-
-            process_names = {"anaerobic": "혐기조", "anoxic": "무산소조", "aerobic": "호기조"}
-            sensors_map = {
-                "anaerobic": ["orp", "ph"],
-                "anoxic": ["orp", "ph"],
-                "aerobic": ["do", "ph", "mlss"]
-            }
-
-            # 필터 적용
-            selected_process = process_type if process_type != "all" else random.choice(list(process_names.keys()))
-            available_sensors = sensors_map[selected_process]
-            selected_sensor = sensor if sensor != "all" and sensor in available_sensors else random.choice(available_sensors)
-
-            zone_num = zone if zone != "all" else f"{random.randint(1, 5)}"
-            # 혐기조 ORP: 1지, 4지만 센서 있음
-            has_anaerobic_orp = zone_num in ["1", "4"]
-            # 혐기조 pH: 4지만 센서 있음
-            has_anaerobic_ph = zone_num in ["4"]
-            # MLSS 센서는 1지와 4지에만 설치됨
-            has_mlss = zone_num in ["1", "4"]
-
-            sensor_data = {
-                "anaerobicOrp": round(random.uniform(-320, -290), 1) if has_anaerobic_orp else None,
-                "anaerobicPh": round(random.uniform(6.8, 7.2), 2) if has_anaerobic_ph else None,
-                "anoxicOrp": round(random.uniform(-330, -300), 1),
-                "anoxicPh": round(random.uniform(6.5, 7.0), 2),
-                "aerobicDo": round(random.uniform(4.0, 6.0), 2),
-                "aerobicPh": round(random.uniform(6.3, 6.8), 2),
-                "aerobicMlss": round(random.uniform(5500, 7500), 1) if has_mlss else None
-            }
-
-            threshold = self.process_thresholds.get(selected_process, {}).get(selected_sensor, {})
-
-            data.append({
-                "id": f"alarm_{current.strftime('%Y%m%d_%H%M%S')}_{len(data)+1}",
-                "timestamp": current.isoformat(),
-                "zone": f"{zone_num}지",
-                "result": "abnormal",
-                "processType": process_names[selected_process],
-                "sensor": selected_sensor.upper(),
-                "sensorData": sensor_data,
-                "threshold": threshold,
-                "message": f"{process_names[selected_process]} {selected_sensor.upper()} 센서 이상 감지"
-            })
-
-            current += delta
+            values = block.tolist()
+
+            for t_idx, z_idx, r_idx, s_idx in zip(*(axis.tolist() for axis in hits)):
+                current = start_time + (block_start + t_idx) * delta
+                zone_values = values[t_idx][z_idx]
+                process = PROCESS_TYPES[r_idx]
+                name = PROCESS_SENSORS[s_idx]
+
+                data.append({
+                    "id": f"alarm_{current.strftime('%Y%m%d_%H%M%S')}_{len(data)+1}",
+                    "timestamp": current.isoformat(),
+                    "zone": self.topology.zone_labels[z_idx],
+                    "result": "abnormal",
+                    "processType": PROCESS_NAMES[process],
+                    "sensor": name.upper(),
+                    "sensorData": {field: _optional(zone_values[r][s]) for field, r, s in field_indices},
+                    "threshold": self.process_thresholds.get(process, {}).get(name, {}),
+                    "message": f"{PROCESS_NAMES[process]} {name.upper()} 센서 이상 감지"
+                })
 
         return data
 
@@ -445,45 +737,36 @@ class DataGenerator:
         end_time: datetime,
         interval: str = "hour"
     ) -> List[Dict]:
-        """과거 예측 알림 데이터 생성"""
+        """과거 예측 알림 데이터 생성 (예측 이력 블록을 알림 상태 머신으로 재생하여 발생 시점마다 1건)"""
         data = []
-        current = start_time
-
-        # 시간 간격 설정
         delta = timedelta(hours=1) if interval == "hour" else timedelta(minutes=1)
-
-        # 알림은 가끔 발생 (20% 확률)
-        while current <= end_time:
-            if random.random() > 0.2:
-                current += delta
-                continue
-
-            items = ["TOC", "SS", "T-N", "T-P"]
-            selected_item = item.upper() if item != "all" else random.choice(items)
-
-            predictions = {
-                "TOC": round(random.uniform(15, 20), 1),
-                "SS": round(random.uniform(5, 8), 1),
-                "T-N": round(random.uniform(17, 19), 1),
-                "T-P": round(random.uniform(0.8, 1.2), 1)
-            }
-
-            # 선택된 항목의 값을 임계값 초과시킴
-            threshold_key = selected_item.lower().replace("-", "")
-            threshold = self.effluent_thresholds[threshold_key]
-            predictions[selected_item] = round(threshold["upper"] + random.uniform(0.5, 3), 1)
-
-            data.append({
-                "id": f"alarm_pred_{current.strftime('%Y%m%d_%H%M%S')}_{len(data)+1}",
-                "timestamp": current.isoformat(),
-                "result": "abnormal",
-                "item": selected_item,
-                "predictions": predictions,
-                "thresholds": {k.upper(): v for k, v in self.effluent_thresholds.items()},
-                "message": f"{selected_item} 수치 기준치 초과 예측"
-            })
-
-            current += delta
+        total = self._step_count(start_time, end_time, delta)
+
+        labels = [parameter_label(param) for param in self.forecaster.parameters]
+        thresholds = {k.upper(): v for k, v in self.effluent_thresholds.items()}
+        selected = np.ones(len(labels), dtype=bool)
+        if item != "all":
+            selected = np.array([param == item.lower().replace("-", "") for param in self.forecaster.parameters])
+
+        replay = alarm_engine.replay("prediction", selected.shape, delta.total_seconds())
+
+        for block_start in range(0, total, HISTORY_BLOCK_STEPS):
+            count = min(HISTORY_BLOCK_STEPS, total - block_start)
+            block = self._generate_prediction_block(self._block_times(start_time, block_start, count, delta))
+            hits = np.nonzero(replay.onsets(block) & selected)
+            values = block.tolist()
+
+            for t_idx, p_idx in zip(*(axis.tolist() for axis in hits)):
+                current = start_time + (block_start + t_idx) * delta
+                data.append({
+                    "id": f"alarm_pred_{current.strftime('%Y%m%d_%H%M%S')}_{len(data)+1}",
+                    "timestamp": current.isoformat(),
+                    "result": "abnormal",
+                    "item": labels[p_idx],
+                    "predictions": dict(zip(labels, values[t_idx])),
+                    "thresholds": thresholds,
+                    "message": f"{labels[p_idx]} 수치 기준치 초과 예측"
+                })
 
         return data
 
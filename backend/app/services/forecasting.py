@@ -0,0 +1,154 @@
+"""
+방류수질 증분 예측 엔진
+파라미터(TOC/SS/T-N/T-P)별 감쇠 추세 Holt 지수평활 상태를 NumPy 배열로 유지
+- TMS 측정값이 들어올 때마다 O(1) 상태 갱신 (모델 재학습 없음)
+- 예측은 현재 상태에서 바로 계산하는 상수 시간 조회
+"""
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+class ForecastResult(NamedTuple):
+    """예측 결과 (파라미터 × 예측 시점 배열)"""
+    predicted: np.ndarray
+    std: np.ndarray
+    current: np.ndarray
+    source: str = "engine"   # engine: 엔진 직접 계산, model: 추론 워커, fallback: 마지막 정상 예측
+
+
+def holt_step(
+    level: np.ndarray,
+    trend: np.ndarray,
+    residual_var: np.ndarray,
+    observed: np.ndarray,
+    dt: float,
+    level_seconds: float,
+    trend_seconds: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """측정값 하나로 (수준, 추세, 오차분산) 갱신 (실시간 엔진과 백테스트 공용)"""
+    dt = max(dt, 1e-3)
+    level_gain = -np.expm1(-dt / level_seconds)
+    trend_gain = -np.expm1(-dt / trend_seconds)
+
+    predicted = level + trend * dt
+    error = observed - predicted
+    new_level = predicted + level_gain * error
+    new_trend = trend + trend_gain * (level_gain * error / dt)
+    new_var = residual_var + level_gain * (error ** 2 - residual_var)
+    return new_level, new_trend, new_var
+
+
+def forecast_from_state(
+    level: np.ndarray,
+    trend: np.ndarray,
+    residual_var: np.ndarray,
+    horizons_seconds: np.ndarray,
+    damping_seconds: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    상태 배열(마지막 축 앞까지)과 예측 시점 배열을 브로드캐스트하여 예측값/표준편차 계산
+    반환 배열 shape = 상태 shape + (예측 시점 수,)
+    """
+    tau = damping_seconds
+    horizons = np.asarray(horizons_seconds, dtype=np.float64)
+    level = np.asarray(level)[..., np.newaxis]
+    trend = np.asarray(trend)[..., np.newaxis]
+    residual_var = np.asarray(residual_var)[..., np.newaxis]
+
+    predicted = level + trend * tau * (1 - np.exp(-horizons / tau))
+    std = np.sqrt(residual_var * (1 + horizons / tau))
+    return predicted, std
+
+
+class ForecastEngine:
+    """
+    감쇠 추세 Holt 지수평활 예측기 (연속 시간형)
+    - level: 평활 수준, trend: 초당 추세, residual_var: 1단계 예측오차 분산
+    - 평활 계수는 측정 간격 dt에 따라 1 - exp(-dt / 시정수)로 계산하여
+      측정 주기가 불규칙해도 (REST 조회 등) 상태가 발산하지 않음
+    - h초 후 예측 = level + trend * tau * (1 - exp(-h / tau))  (tau: 추세 감쇠 시간)
+    """
+
+    def __init__(
+        self,
+        parameters: Sequence[str],
+        level_seconds: float,
+        trend_seconds: float,
+        damping_seconds: float
+    ):
+        self.parameters = list(parameters)
+        self.level_seconds = level_seconds
+        self.trend_seconds = trend_seconds
+        self.damping_seconds = damping_seconds
+
+        size = len(self.parameters)
+        self.level = np.zeros(size)
+        self.trend = np.zeros(size)
+        self.residual_var = np.zeros(size)
+        self.last_values = np.zeros(size)
+        self.last_time: Optional[float] = None
+        self.observations = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def update(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """TMS 측정값 하나로 상태 갱신 (파라미터 이름 → 값)"""
+        observed = np.array([values[name] for name in self.parameters], dtype=np.float64)
+        now = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            if self.last_time is None:
+                self.level = observed.copy()
+                self.trend = np.zeros_like(observed)
+            else:
+                self.level, self.trend, self.residual_var = holt_step(
+                    self.level, self.trend, self.residual_var, observed,
+                    now - self.last_time, self.level_seconds, self.trend_seconds
+                )
+
+            self.last_values = observed
+            self.last_time = now
+            self.observations += 1
+            self.version += 1
+
+    def forecast(self, horizon_seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """h초 후 예측값과 예측 표준편차 (파라미터 순서 배열)"""
+        predicted, std = self.forecast_curves(np.array([horizon_seconds], dtype=np.float64))
+        return predicted[:, 0], std[:, 0]
+
+    def forecast_curves(self, horizons_seconds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 예측 시점을 한 번에 계산 (파라미터 × 예측 시점 배열)"""
+        with self._lock:
+            level, trend, residual_var = self.level, self.trend, self.residual_var
+
+        return forecast_from_state(level, trend, residual_var, horizons_seconds, self.damping_seconds)
+
+    def snapshot(self) -> Tuple[int, Dict[str, np.ndarray]]:
+        """추론 서비스 입력용 상태 복사본 (버전, 상태 배열)"""
+        with self._lock:
+            return self.version, {
+                "level": self.level.copy(),
+                "trend": self.trend.copy(),
+                "residual_var": self.residual_var.copy(),
+                "last_values": self.last_values.copy()
+            }
+
+    @staticmethod
+    def confidence(predicted: np.ndarray, std: np.ndarray) -> np.ndarray:
+        """예측 신뢰도 = 1 - 상대 예측오차 (표준편차 / 예측값), 0~1 범위"""
+        relative = std / np.maximum(np.abs(predicted), 1e-6)
+        return np.clip(1 - relative, 0.0, 1.0)
+
+
+# 전역 인스턴스 (방류 TMS 파라미터)
+forecast_engine = ForecastEngine(
+    parameters=list(settings.DEFAULT_EFFLUENT_THRESHOLDS.keys()),
+    level_seconds=settings.FORECAST_LEVEL_SECONDS,
+    trend_seconds=settings.FORECAST_TREND_SECONDS,
+    damping_seconds=settings.FORECAST_DAMPING_SECONDS
+)
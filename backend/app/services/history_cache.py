@@ -0,0 +1,130 @@
+"""
+이력 조회 결과 LRU 캐시
+- 페이지 필드를 제외한 정규화 요청을 키로 사용하여 같은 조회의 모든 페이지가 하나의 결과를 공유
+- 전체 크기(byte) 예산 초과 시 가장 오래 사용하지 않은 항목부터 제거
+- 현재 시각을 포함하는 범위는 TTL 적용, 닫힌 범위는 데이터 버전이 바뀔 때까지 유지
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def estimate_size(value: Any) -> int:
+    """캐시 항목 크기 추정 (레코드 목록은 앞부분 표본의 JSON 크기로 추정)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, list):
+        if not value:
+            return 64
+        sample = value[:10]
+        sample_size = len(json.dumps(sample, default=str, ensure_ascii=False))
+        return sample_size * len(value) // len(sample)
+    return len(json.dumps(value, default=str, ensure_ascii=False))
+
+
+class _Entry:
+    __slots__ = ("value", "size", "version", "expires_at")
+
+    def __init__(self, value: Any, size: int, version: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.version = version
+        self.expires_at = expires_at
+
+
+class HistoryCache:
+    """크기 예산 기반 LRU 캐시 (데이터 버전 변경 시 무효화)"""
+
+    def __init__(self, max_bytes: int, live_ttl: float):
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        self.data_version = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def bump_version(self):
+        """데이터 적재 시 호출 (이전 버전 항목은 다음 조회 시 제거)"""
+        with self._lock:
+            self.data_version += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시 조회 (없거나 만료/무효화된 경우 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.version != self.data_version or (
+                    entry.expires_at is not None and entry.expires_at <= time.monotonic()
+                ):
+                    self._remove(key)
+                    self.invalidations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any, end_time: datetime, version: Optional[int] = None):
+        """
+        캐시 저장
+        - end_time이 현재 시각 이후면 live_ttl 후 만료
+        - version은 계산 시작 시점의 데이터 버전 (계산 중 데이터가 바뀌었으면 저장하지 않음)
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        now = datetime.now(end_time.tzinfo) if end_time.tzinfo else datetime.now()
+        expires_at = time.monotonic() + self.live_ttl if end_time >= now else None
+
+        with self._lock:
+            if version is not None and version != self.data_version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, self.data_version, expires_at)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self) -> Dict:
+        """캐시 현황"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "dataVersion": self.data_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+# 전역 인스턴스
+history_cache = HistoryCache(
+    max_bytes=settings.HISTORY_CACHE_MAX_BYTES,
+    live_ttl=settings.HISTORY_CACHE_LIVE_TTL
+)
@@ -0,0 +1,314 @@
+"""
+예측 모델 추론 서비스
+- 플러그형 모델 인터페이스 (FORECAST_MODEL 설정: "모듈:클래스")
+- 시작 시 미리 띄워 워밍업한 워커 프로세스 풀에서 실행 (이벤트 루프 블로킹 없음)
+- 예측 엔진 상태 1개당 전체 예측 시점(1~FORECAST_MAX_HORIZON시간)을 한 번만 추론하고, 요청 시점은 잘라서 반환
+- 짧은 시간 창 동안 들어온 요청을 하나의 배치로 묶어 한 번에 추론
+- 응답 기한 초과 또는 오류 시 마지막 정상 예측으로 대체
+- 요청 지연 시간/배치 크기/추론 시간 히스토그램
+"""
+import asyncio
+import importlib
+from abc import ABC, abstractmethod
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.forecasting import ForecastEngine, ForecastResult, forecast_engine, forecast_from_state
+from app.services.metrics import LATENCY_MS_BUCKETS, Histogram
+
+class ForecastModel(ABC):
+    """
+    예측 모델 인터페이스 (predict를 구현하지 않은 하위 클래스는 생성 시 TypeError)
+    - state: 예측 엔진 상태 배열 (level, trend, residual_var, last_values), 각 shape = (배치, 파라미터)
+    - 반환: (예측값, 표준편차), 각 shape = (배치, 파라미터, 예측 시점)
+    """
+
+    name = "base"
+
+    def warm_up(self):
+        """워커 시작 시 1회 호출 (가중치 로드, 첫 호출 지연 제거 등)"""
+
+    @abstractmethod
+    def predict(self, state: Dict[str, np.ndarray], horizons_seconds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """상태 배치 → (예측값, 표준편차)"""
+
+
+class HoltForecastModel(ForecastModel):
+    """기본 모델: 감쇠 추세 Holt 상태에서 바로 예측"""
+
+    name = "holt"
+
+    def __init__(self):
+        self.damping_seconds = settings.FORECAST_DAMPING_SECONDS
+
+    def warm_up(self):
+        size = len(settings.DEFAULT_EFFLUENT_THRESHOLDS)
+        dummy = {field: np.zeros((1, size)) for field in ("level", "trend", "residual_var", "last_values")}
+        self.predict(dummy, np.array([3600.0]))
+
+    def predict(self, state: Dict[str, np.ndarray], horizons_seconds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return forecast_from_state(
+            state["level"], state["trend"], state["residual_var"], horizons_seconds, self.damping_seconds
+        )
+
+
+def load_model(path: str) -> ForecastModel:
+    """"모듈:클래스" 경로로 모델 생성"""
+    module_name, _, class_name = path.partition(":")
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    return model_class()
+
+
+# 워커 프로세스별 모델 인스턴스 (초기화 함수에서 생성)
+_worker_model: Optional[ForecastModel] = None
+
+
+def _init_worker(model_path: str):
+    """워커 초기화: 모델 로드 및 워밍업"""
+    global _worker_model
+    _worker_model = load_model(model_path)
+    _worker_model.warm_up()
+
+
+def _ping() -> bool:
+    """워커 기동 확인용 작업"""
+    return _worker_model is not None
+
+
+def _predict_batch(state: Dict[str, np.ndarray], horizons_seconds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """워커에서 배치 추론 실행 (추론 소요 시간(ms) 함께 반환)"""
+    started = time.perf_counter()
+    predicted, std = _worker_model.predict(state, horizons_seconds)
+    return predicted, std, (time.perf_counter() - started) * 1000
+
+
+class _Request:
+    __slots__ = ("state", "horizons_seconds", "future")
+
+    def __init__(self, state: Dict[str, np.ndarray], horizons_seconds: np.ndarray, future: asyncio.Future):
+        self.state = state
+        self.horizons_seconds = horizons_seconds
+        self.future = future
+
+
+class InferenceService:
+    """예측 추론 워커 풀 + 마이크로 배치 + 응답 기한"""
+
+    def __init__(
+        self,
+        engine: ForecastEngine,
+        model_path: str,
+        max_horizon_hours: int,
+        workers: int,
+        batch_window_ms: float,
+        max_batch: int,
+        deadline_ms: float
+    ):
+        self.engine = engine
+        self.model_path = model_path
+        self.max_horizon = max_horizon_hours
+        self.horizons_seconds = np.arange(1, max_horizon_hours + 1, dtype=np.float64) * 3600
+        self.workers = workers
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.deadline = deadline_ms / 1000
+
+        self._executor: Optional[Executor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._last_good: Optional[Tuple[int, ForecastResult]] = None        # (엔진 버전, 전체 시점 예측)
+        self._inflight: Optional[Tuple[int, asyncio.Future]] = None         # 진행 중인 추론 (엔진 버전, 결과)
+
+        self.requests = 0
+        self.reused = 0
+        self.batches = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.latency = Histogram(LATENCY_MS_BUCKETS)
+        self.inference_time = Histogram(LATENCY_MS_BUCKETS)
+        self.batch_size = Histogram((1, 2, 4, 8, 16, 32, 64))
+
+    @property
+    def running(self) -> bool:
+        return self._batcher is not None
+
+    async def start(self):
+        """워커 풀 생성 및 워밍업 (앱 시작 시 호출)"""
+        if self.running:
+            return
+
+        loop = asyncio.get_running_loop()
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.model_path,)
+            )
+            # 워커 수만큼 작업을 넣어 모든 프로세스를 미리 기동 (첫 요청에서 모델 로드 지연 방지)
+            await asyncio.gather(*[loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)])
+        else:
+            _init_worker(self.model_path)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(self.workers, 1))
+        self._batcher = asyncio.create_task(self._batch_loop())
+        print(f"[INFERENCE] model={self.model_path} workers={self.workers}")
+
+    async def stop(self):
+        """배치 루프 중지 및 워커 풀 종료 (앱 종료 시 호출)"""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._queue = None
+
+    async def forecast(self, horizons_hours: Sequence[int]) -> ForecastResult:
+        """
+        예측 시점(시간)별 예측값 (파라미터 × 예측 시점)
+        - 예측 엔진 상태(버전)마다 전체 시점을 한 번만 추론하고 요청 시점만 잘라서 반환
+          (REST의 임의 시점 조합과 브로드캐스트가 같은 결과를 공유, 같은 상태의 추론이 진행 중이면 그 결과를 기다림)
+        - 서비스가 시작되지 않았으면 예측 엔진에서 직접 계산
+        """
+        started = time.perf_counter()
+        columns = np.asarray(horizons_hours, dtype=np.int64) - 1
+        if not len(columns) or columns.min() < 0 or columns.max() >= self.max_horizon:
+            raise ValueError(f"예측 시점은 1~{self.max_horizon}시간 범위여야 합니다.")
+        self.requests += 1
+
+        if not self.running:
+            result = self._engine_forecast()
+        else:
+            result = await self._full_forecast()
+
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return result._replace(predicted=result.predicted[:, columns], std=result.std[:, columns])
+
+    async def _full_forecast(self) -> ForecastResult:
+        """현재 예측 엔진 상태의 전체 시점 예측 (버전당 추론 1회)"""
+        version = self.engine.version
+        if self._last_good is not None and self._last_good[0] == version:
+            self.reused += 1
+            return self._last_good[1]
+        if self._inflight is not None and self._inflight[0] == version:
+            self.reused += 1
+            return await asyncio.shield(self._inflight[1])
+
+        version, state = self.engine.snapshot()
+        task = asyncio.ensure_future(self._infer(version, state))
+        self._inflight = (version, task)
+        return await asyncio.shield(task)
+
+    async def _infer(self, version: int, state: Dict[str, np.ndarray]) -> ForecastResult:
+        """워커 추론 (기한 초과/오류 시 마지막 정상 예측으로 대체)"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(state, self.horizons_seconds, future))
+        try:
+            result = await asyncio.wait_for(future, self.deadline)
+            if self._last_good is None or version >= self._last_good[0]:
+                self._last_good = (version, result)
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return self._fallback()
+        except Exception as e:
+            self.errors += 1
+            print(f"[INFERENCE] 추론 오류: {e}")
+            return self._fallback()
+        finally:
+            if self._inflight is not None and self._inflight[0] == version:
+                self._inflight = None
+
+    def _engine_forecast(self) -> ForecastResult:
+        predicted, std = self.engine.forecast_curves(self.horizons_seconds)
+        return ForecastResult(predicted, std, self.engine.last_values.copy(), "engine")
+
+    def _fallback(self) -> ForecastResult:
+        """마지막 정상 예측 (없으면 예측 엔진 직접 계산)"""
+        self.fallbacks += 1
+        if self._last_good is not None:
+            return self._last_good[1]._replace(source="fallback")
+        return self._engine_forecast()
+
+    async def _batch_loop(self):
+        """첫 요청 이후 배치 창 동안 쌓인 요청을 묶어 워커로 전달"""
+        while True:
+            batch: List[_Request] = [await self._queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # 기한 초과로 이미 포기된 요청 제외
+            batch = [request for request in batch if not request.future.done()]
+            if batch:
+                await self._slots.acquire()
+                asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[_Request]):
+        """배치 추론: 상태는 배치 축으로 쌓고, 예측 시점은 합집합으로 한 번에 계산"""
+        try:
+            state = {
+                field: np.stack([request.state[field] for request in batch])
+                for field in batch[0].state
+            }
+            horizons = np.unique(np.concatenate([request.horizons_seconds for request in batch]))
+
+            loop = asyncio.get_running_loop()
+            predicted, std, elapsed_ms = await loop.run_in_executor(
+                self._executor, _predict_batch, state, horizons
+            )
+            self.batches += 1
+            self.batch_size.observe(len(batch))
+            self.inference_time.observe(elapsed_ms)
+
+            for idx, request in enumerate(batch):
+                if request.future.done():
+                    continue
+                columns = np.searchsorted(horizons, request.horizons_seconds)
+                request.future.set_result(ForecastResult(
+                    predicted[idx][:, columns], std[idx][:, columns], request.state["last_values"], "model"
+                ))
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """추론 서비스 현황 및 히스토그램"""
+        return {
+            "model": self.model_path,
+            "workers": self.workers,
+            "maxHorizonHours": self.max_horizon,
+            "running": self.running,
+            "deadlineMs": self.deadline * 1000,
+            "batchWindowMs": self.batch_window * 1000,
+            "requests": self.requests,
+            "reused": self.reused,
+            "batches": self.batches,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "latencyMs": self.latency.snapshot(),
+            "inferenceMs": self.inference_time.snapshot(),
+            "batchSize": self.batch_size.snapshot()
+        }
+
+
+# 전역 인스턴스
+inference_service = InferenceService(
+    engine=forecast_engine,
+    model_path=settings.FORECAST_MODEL,
+    max_horizon_hours=settings.FORECAST_MAX_HORIZON,
+    workers=settings.INFERENCE_WORKERS,
+    batch_window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+    max_batch=settings.INFERENCE_MAX_BATCH,
+    deadline_ms=settings.INFERENCE_DEADLINE_MS
+)
@@ -0,0 +1,338 @@
+"""
+외부 센서 측정값 수집
+요청 본문(NDJSON 또는 배열의 배열)을 열 배열로 바꿔 배치 단위 벡터 검증 후
+저장소(그룹 커밋) → 이동 통계 → 알림 상태 머신 → 실시간 전송 순으로 반영
+- 측정값 1건 = [시각, 지, 공종, 센서, 값]
+  시각: epoch 초(숫자) 또는 ISO 8601 문자열, null이면 수신 시각
+  지: 1부터 시작하는 번호, 공종: anaerobic / anoxic / aerobic, 센서: orp / ph / do / mlss
+- 검증은 측정값별 모델 생성 없이 열 배열 비교로 한 번에 수행, 잘못된 측정값만 제외
+"""
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.alarm_engine import AlarmEngine, alarm_engine
+from app.services.data_generator import data_generator
+from app.services.metrics import LATENCY_MS_BUCKETS, Histogram
+from app.services.reading_store import ReadingBatch, ReadingStore, reading_store
+from app.services.rolling_stats import RollingStats, rolling_stats
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+
+
+# 센서별 물리적으로 가능한 측정 범위 (벗어나면 센서 오류로 보고 거부)
+VALUE_LIMITS = {
+    "orp": (-1000, 1000),
+    "ph": (0, 14),
+    "do": (0, 20),
+    "mlss": (0, 30000),
+}
+
+# 거부 사유 (코드 순서 = 판정 우선순위)
+REJECT_REASONS = (
+    None,
+    "형식 오류 (5개 항목 배열이 아님)",
+    "시각 형식 오류",
+    "시각 범위 초과",
+    "알 수 없는 지",
+    "알 수 없는 공종",
+    "알 수 없는 센서",
+    "설치되지 않은 센서",
+    "값이 숫자가 아님",
+    "측정 범위 초과",
+)
+
+ROW_FIELDS = ("timestamp", "zone", "reactor", "sensor", "value")
+
+
+class IngestError(ValueError):
+    """요청 본문 전체를 처리할 수 없는 경우 (형식 오류, 크기 초과)"""
+
+
+class ValidationResult:
+    """배치 검증 결과 (통과한 측정값 배치 + 거부 내역)"""
+
+    def __init__(self, batch: ReadingBatch, reasons: np.ndarray, max_errors: int):
+        self.batch = batch
+        rejected = np.flatnonzero(reasons)
+        self.rejected = len(rejected)
+        counts = np.bincount(reasons[rejected], minlength=len(REJECT_REASONS))
+        self.by_reason = {
+            REJECT_REASONS[code]: int(count) for code, count in enumerate(counts) if code and count
+        }
+        self.errors = [
+            {"row": int(row), "reason": REJECT_REASONS[reasons[row]]}
+            for row in rejected[:max_errors]
+        ]
+
+
+def parse_body(body: bytes, content_type: str) -> List[list]:
+    """
+    요청 본문 → 행 목록
+    - application/x-ndjson: 줄마다 배열 또는 {"timestamp", "zone", "reactor", "sensor", "value"} 객체
+      (해석할 수 없는 줄은 형식 오류 측정값 1건으로 거부하고 나머지는 처리)
+    - application/json: 배열의 배열 (또는 {"readings": 배열의 배열})
+    """
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            rows = [_parse_line(line) for line in body.splitlines() if line.strip()]
+        else:
+            rows = json.loads(body)
+            if isinstance(rows, dict):
+                rows = rows.get("readings")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise IngestError(f"본문을 해석할 수 없습니다: {e}")
+
+    if not isinstance(rows, list):
+        raise IngestError("측정값 배열이 필요합니다.")
+    if len(rows) > settings.INGEST_MAX_ROWS:
+        raise IngestError(f"요청당 측정값은 최대 {settings.INGEST_MAX_ROWS:,}건입니다.")
+    return [[row.get(field) for field in ROW_FIELDS] if isinstance(row, dict) else row for row in rows]
+
+
+def _parse_line(line: bytes):
+    """NDJSON 한 줄 (해석 실패 시 None → 형식 오류 행)"""
+    try:
+        return json.loads(line)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def rows_to_columns(rows: List[list]) -> Tuple[Tuple[Sequence, ...], np.ndarray]:
+    """행 목록 → 5개 열, 항목 수가 맞지 않는 행은 빈 행으로 바꾸고 형식 오류 마스크 반환"""
+    malformed = np.fromiter(
+        (not isinstance(row, (list, tuple)) or len(row) != len(ROW_FIELDS) for row in rows),
+        dtype=bool, count=len(rows)
+    )
+    if malformed.any():
+        blank = (None,) * len(ROW_FIELDS)
+        rows = [blank if bad else row for row, bad in zip(rows, malformed.tolist())]
+    columns = tuple(zip(*rows)) if rows else ((),) * len(ROW_FIELDS)
+    return columns, malformed
+
+
+class ReadingValidator:
+    """측정값 열 배열 벡터 검증"""
+
+    def __init__(self, zone_count: int, installed: np.ndarray):
+        self.zone_count = zone_count
+        self.installed = installed
+        self.low = np.array([VALUE_LIMITS[sensor][0] for sensor in PROCESS_SENSORS], dtype=np.float64)
+        self.high = np.array([VALUE_LIMITS[sensor][1] for sensor in PROCESS_SENSORS], dtype=np.float64)
+
+    def validate(
+        self,
+        timestamp: Sequence,
+        zone: Sequence,
+        reactor: Sequence,
+        sensor: Sequence,
+        value: Sequence,
+        malformed: Optional[np.ndarray] = None,
+        now: Optional[float] = None
+    ) -> ValidationResult:
+        """열 배열 검증 → 통과한 측정값 배치와 행별 거부 사유"""
+        now = time.time() if now is None else now
+        count = len(value)
+        malformed = np.zeros(count, dtype=bool) if malformed is None else malformed
+
+        ts, bad_ts = _numeric(timestamp, parse_time=True)
+        ts = np.where(np.isnan(ts) & ~bad_ts, now, ts)
+        zone_num, bad_zone = _numeric(zone)
+        values, bad_value = _numeric(value)
+        r_idx = _lookup(reactor, PROCESS_TYPES)
+        s_idx = _lookup(sensor, PROCESS_SENSORS)
+
+        with np.errstate(invalid="ignore"):
+            zone_ok = ~bad_zone & (zone_num >= 1) & (zone_num <= self.zone_count) & (zone_num % 1 == 0)
+        z_idx = np.where(zone_ok, zone_num - 1, 0).astype(np.int64)
+        channel_ok = zone_ok & (r_idx >= 0) & (s_idx >= 0)
+        installed = channel_ok & self.installed[z_idx, np.maximum(r_idx, 0), np.maximum(s_idx, 0)]
+        low, high = self.low[np.maximum(s_idx, 0)], self.high[np.maximum(s_idx, 0)]
+
+        # 우선순위가 높은 사유부터 채움 (이미 사유가 있는 행은 유지)
+        checks = (
+            malformed,
+            bad_ts,
+            (ts < now - settings.INGEST_MAX_AGE_SECONDS) | (ts > now + settings.INGEST_MAX_SKEW_SECONDS),
+            ~zone_ok,
+            r_idx < 0,
+            s_idx < 0,
+            ~installed,
+            bad_value | ~np.isfinite(values),
+            (values < low) | (values > high),
+        )
+        reasons = np.zeros(count, dtype=np.int64)
+        for code, failed in enumerate(checks, start=1):
+            reasons = np.where((reasons == 0) & failed, code, reasons)
+
+        ok = reasons == 0
+        batch = ReadingBatch(ts[ok], z_idx[ok], r_idx[ok], s_idx[ok], values[ok])
+        return ValidationResult(batch, reasons, settings.INGEST_MAX_ERRORS)
+
+    def validate_rows(self, rows: List[list], now: Optional[float] = None) -> ValidationResult:
+        """행 목록 검증"""
+        columns, malformed = rows_to_columns(rows)
+        return self.validate(*columns, malformed=malformed, now=now)
+
+
+def _numeric(column: Sequence, parse_time: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    열 → float64 배열과 변환 실패 마스크 (None은 NaN, 실패 아님)
+    전부 숫자이면 한 번에 변환하고, 섞여 있을 때만 항목별로 변환
+    """
+    try:
+        return np.array(column, dtype=np.float64), np.zeros(len(column), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+
+    result = np.full(len(column), np.nan)
+    failed = np.zeros(len(column), dtype=bool)
+    for idx, item in enumerate(column):
+        if item is None:
+            continue
+        try:
+            if parse_time and isinstance(item, str):
+                result[idx] = datetime.fromisoformat(item).timestamp()
+            else:
+                result[idx] = float(item)
+        except (TypeError, ValueError, OverflowError):
+            failed[idx] = True
+    return result, failed
+
+
+def _lookup(column: Sequence, names: Sequence[str]) -> np.ndarray:
+    """이름 열 → 인덱스 배열 (모르는 이름은 -1), 고유값만 사전 조회 (bytes 열은 디코딩)"""
+    if not len(column):
+        return np.zeros(0, dtype=np.int64)
+    names_array = np.asarray(column)
+    if names_array.dtype.kind == "S":
+        try:
+            names_array = names_array.astype(str)
+        except UnicodeDecodeError:
+            names_array = np.array([name.decode(errors="replace") for name in column])
+    elif names_array.dtype.kind != "U":
+        names_array = np.asarray(column, dtype=str)
+    unique, inverse = np.unique(names_array, return_inverse=True)
+    codes = np.array([names.index(name.lower()) if name.lower() in names else -1 for name in unique.tolist()])
+    return codes[inverse]
+
+
+class IngestPipeline:
+    """검증된 배치 반영: 저장 → 이동 통계(threadpool) → 최신값 → 알림 → 실시간 전송 대기"""
+
+    def __init__(self, store: ReadingStore, stats: RollingStats, alarms: AlarmEngine, validator: ReadingValidator):
+        self.store = store
+        self.stats = stats
+        self.alarms = alarms
+        self.validator = validator
+
+        shape = validator.installed.shape
+        self.latest = np.full(shape, np.nan)
+        self.latest_time = np.full(shape, -np.inf)
+        self._dirty = False
+        self._events: List[Dict] = []
+
+        self.requests = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.last_reading: Optional[float] = None
+        self.latency = Histogram(LATENCY_MS_BUCKETS)
+
+    async def submit(self, batch: ReadingBatch, rejected: int = 0) -> int:
+        """검증된 배치 반영 (저장소 커밋 후 반환, 저장한 측정값 수)"""
+        started = time.perf_counter()
+        self.requests += 1
+        self.rejected += rejected
+
+        stored = await self.store.append(batch)
+        if stored:
+            # 이동 통계는 배치 크기에 비례하므로 threadpool에서 (RollingStats가 잠금으로 직렬화)
+            await run_in_threadpool(self.update_stats, batch)
+            self.apply(batch)
+            self.accepted += stored
+
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return stored
+
+    def _channels(self, batch: ReadingBatch) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """시각순 정렬한 (평탄화 채널 인덱스, 시각, 값)"""
+        order = np.argsort(batch.timestamp, kind="stable")
+        channels = np.ravel_multi_index(
+            (batch.zone[order], batch.reactor[order], batch.sensor[order]), self.latest.shape
+        )
+        return channels, batch.timestamp[order], batch.value[order]
+
+    def update_stats(self, batch: ReadingBatch):
+        """
+        커밋된 배치를 이동 통계에 반영 (threadpool에서 실행)
+        채널별 k번째 측정값끼리 묶어 채널별 시각으로 갱신 → 갱신 횟수 = 채널당 최대 측정값 수 (서로 다른 시각 수와 무관)
+        """
+        channels, ts, values = self._channels(batch)
+        # 채널별 시각순 순번 (시각순 정렬 후 채널로 안정 정렬)
+        order = np.argsort(channels, kind="stable")
+        channels, ts, values = channels[order], ts[order], values[order]
+        starts = np.flatnonzero(np.r_[True, channels[1:] != channels[:-1]])
+        rank = np.arange(len(channels)) - np.repeat(starts, np.diff(np.r_[starts, len(channels)]))
+
+        by_rank = np.argsort(rank, kind="stable")
+        bounds = np.searchsorted(rank[by_rank], np.arange(int(rank.max()) + 2))
+        snapshot = np.empty(self.latest.size)
+        times = np.zeros(self.latest.size)
+        for idx in range(len(bounds) - 1):
+            selected = by_rank[bounds[idx]:bounds[idx + 1]]
+            snapshot.fill(np.nan)
+            snapshot[channels[selected]] = values[selected]
+            times[channels[selected]] = ts[selected]
+            self.stats.update(snapshot.reshape(self.latest.shape), timestamp=times.reshape(self.latest.shape))
+
+    def apply(self, batch: ReadingBatch):
+        """커밋된 배치를 최신값, 알림 상태에 반영 (이동 통계는 update_stats)"""
+        channels, ts, values = self._channels(batch)
+
+        # 최신값: 채널별 마지막 측정값 (기존 값보다 오래된 측정값은 무시)
+        last = len(channels) - 1 - np.unique(channels[::-1], return_index=True)[1]
+        channels, ts, values = channels[last], ts[last], values[last]
+        newer = ts >= self.latest_time.flat[channels]
+        self.latest.flat[channels[newer]] = values[newer]
+        self.latest_time.flat[channels[newer]] = ts[newer]
+
+        now = float(ts.max())
+        self.last_reading = max(now, self.last_reading or now)
+        self._events.extend(self.alarms.update_process(self.latest, now=self.last_reading))
+        self._dirty = True
+
+    def drain(self) -> Tuple[Optional[np.ndarray], List[Dict]]:
+        """마지막 전송 이후 바뀐 최신값 스냅샷(없으면 None)과 알림 이벤트"""
+        latest = self.latest.copy() if self._dirty else None
+        events, self._events, self._dirty = self._events, [], False
+        return latest, events
+
+    def summary(self) -> Dict:
+        """수집 현황"""
+        return {
+            "source": settings.LIVE_SOURCE,
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "lastReading": datetime.fromtimestamp(self.last_reading).isoformat() if self.last_reading else None,
+            "channels": int(np.isfinite(self.latest_time).sum()),
+            "latencyMs": self.latency.snapshot(),
+            "store": self.store.stats()
+        }
+
+
+# 전역 인스턴스
+reading_validator = ReadingValidator(
+    zone_count=data_generator.zone_count,
+    installed=data_generator.installed
+)
+ingest_pipeline = IngestPipeline(
+    store=reading_store,
+    stats=rolling_stats,
+    alarms=alarm_engine,
+    validator=reading_validator
+)
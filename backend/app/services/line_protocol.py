@@ -0,0 +1,231 @@
+"""
+TCP 라인 프로토콜 수집 서버 (현장 게이트웨이용)
+한 줄 = 측정값 1건: `지,공종,센서 값 시각`
+    4,aerobic,do 3.21 1700000000.5
+    1,aerobic,mlss 6120.5            (시각 생략 시 수신 시각)
+- 연결마다 미리 할당한 수신 버퍼에 소켓 데이터를 직접 받음 (BufferedProtocol, 수신 청크 복사 없음)
+- 버퍼의 완성된 줄 구간에서 정규식 한 번으로 필드만 추출 (줄 단위 분할/디코딩 없음),
+  남은 미완성 줄만 버퍼 앞으로 옮김
+- 분리한 열은 HTTP 수집과 같은 벡터 검증 → 같은 저장/통계/알림/전송 파이프라인으로 전달
+- 처리 대기 배치가 INGEST_QUEUE_BATCHES개 이상 쌓이면 모든 연결의 읽기를 멈추고 (TCP 흐름 제어로 게이트웨이 송신 지연),
+  절반 이하로 줄면 다시 읽음
+"""
+import asyncio
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.ingest import IngestPipeline, ReadingValidator, ingest_pipeline, reading_validator
+from app.services.reading_store import ReadingBatch
+
+
+# 지,공종,센서 값 [시각]
+LINE_PATTERN = re.compile(rb"(?m)^([^,\s]+),([^,\s]+),([^,\s]+) ([^\s]+)(?: ([^\s]+))?[ \t\r]*$\n")
+
+
+def parse_lines(buffer, end: int) -> Tuple[Tuple[tuple, ...], int]:
+    """
+    버퍼 [0, end) 구간의 완성된 줄 → (시각, 지, 공종, 센서, 값) 열과 형식이 맞지 않는 줄 수
+    end는 줄바꿈 바로 다음 위치여야 함
+    """
+    matches = LINE_PATTERN.findall(buffer, 0, end)
+    malformed = buffer.count(b"\n", 0, end) - len(matches)
+    if not matches:
+        return ((),) * 5, malformed
+
+    zone, reactor, sensor, value, timestamp = zip(*matches)
+    timestamp = tuple(item or None for item in timestamp)
+    return (timestamp, zone, reactor, sensor, value), malformed
+
+
+class _GatewayConnection(asyncio.BufferedProtocol):
+    """게이트웨이 연결 1개 (고정 크기 수신 버퍼)"""
+
+    def __init__(self, server: "LineProtocolServer"):
+        self.server = server
+        self.buffer = bytearray(server.buffer_bytes)
+        self.view = memoryview(self.buffer)
+        self.end = 0
+        self.transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        self.server.connected(self)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.server.disconnected(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.end == len(self.buffer):
+            # 버퍼보다 긴 줄: 버리고 다음 줄부터 다시 읽음
+            self.server.oversized += 1
+            self.end = 0
+        return self.view[self.end:]
+
+    def buffer_updated(self, nbytes: int):
+        start = self.end
+        self.end += nbytes
+        self.server.bytes_received += nbytes
+
+        last_newline = self.buffer.rfind(b"\n", start, self.end)
+        if last_newline < 0:
+            return
+        complete = last_newline + 1
+        self.server.feed(self.buffer, complete)
+
+        # 미완성 줄만 버퍼 앞으로 이동
+        remaining = self.end - complete
+        if remaining:
+            self.view[:remaining] = self.view[complete:self.end]
+        self.end = remaining
+
+    def eof_received(self) -> bool:
+        return False
+
+
+class LineProtocolServer:
+    """라인 프로토콜 TCP 수집 서버"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        validator: ReadingValidator,
+        pipeline: IngestPipeline,
+        buffer_bytes: int,
+        queue_batches: int
+    ):
+        self.host = host
+        self.port = port
+        self.validator = validator
+        self.pipeline = pipeline
+        self.buffer_bytes = buffer_bytes
+        self.queue_batches = queue_batches
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._connections: Set[_GatewayConnection] = set()
+        self._paused = False
+
+        self.connections_total = 0
+        self.bytes_received = 0
+        self.lines = 0
+        self.malformed = 0
+        self.rejected = 0
+        self.oversized = 0
+        self.pauses = 0
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self):
+        """수신 시작 (앱 시작 시 호출, 포트 0이면 사용 안 함)"""
+        if self.running or not self.port:
+            return
+        self._queue = asyncio.Queue()
+        self._consumer = asyncio.create_task(self._consume())
+        self._server = await asyncio.get_running_loop().create_server(
+            lambda: _GatewayConnection(self), self.host, self.port
+        )
+        print(f"[INGEST] line protocol tcp://{self.host}:{self.port}")
+
+    async def stop(self):
+        """수신 중지 및 연결 종료 (대기 중인 배치는 반영 후 종료)"""
+        if self._server is None:
+            return
+        self._server.close()
+        for connection in list(self._connections):
+            connection.transport.close()
+        await self._server.wait_closed()
+        self._server = None
+
+        self._consumer.cancel()
+        self._consumer = None
+        batches = self._drain()
+        if batches:
+            await self._submit(batches)
+
+    def connected(self, connection: _GatewayConnection):
+        self._connections.add(connection)
+        self.connections_total += 1
+        if self._paused:
+            connection.transport.pause_reading()
+
+    def disconnected(self, connection: _GatewayConnection):
+        self._connections.discard(connection)
+
+    def feed(self, buffer, end: int):
+        """완성된 줄 구간 검증 후 처리 대기열에 추가 (대기열이 차면 읽기 중지)"""
+        columns, malformed = parse_lines(buffer, end)
+        result = self.validator.validate(*columns)
+        self.lines += len(columns[0]) + malformed
+        self.malformed += malformed
+        self.rejected += result.rejected
+
+        self._queue.put_nowait((result.batch, result.rejected + malformed))
+        if not self._paused and self._queue.qsize() >= self.queue_batches:
+            self._set_paused(True)
+
+    def _set_paused(self, paused: bool):
+        self._paused = paused
+        if paused:
+            self.pauses += 1
+        for connection in self._connections:
+            if paused:
+                connection.transport.pause_reading()
+            else:
+                connection.transport.resume_reading()
+
+    async def _consume(self):
+        """대기 중인 배치를 모두 합쳐 파이프라인에 전달 (저장소 커밋 동안 들어온 배치는 다음 회차에)"""
+        while True:
+            batches = [await self._queue.get()]
+            batches += self._drain()
+            if self._paused and self._queue.qsize() <= self.queue_batches // 2:
+                self._set_paused(False)
+            await self._submit(batches)
+
+    def _drain(self) -> List[Tuple[ReadingBatch, int]]:
+        batches = []
+        while self._queue is not None and not self._queue.empty():
+            batches.append(self._queue.get_nowait())
+        return batches
+
+    async def _submit(self, batches: List[Tuple[ReadingBatch, int]]):
+        try:
+            await self.pipeline.submit(
+                ReadingBatch.concat([batch for batch, _ in batches]),
+                sum(rejected for _, rejected in batches)
+            )
+        except Exception as e:
+            print(f"[INGEST] line protocol 저장 오류: {e}")
+
+    def stats(self) -> Dict:
+        """수신 현황"""
+        return {
+            "running": self.running,
+            "port": self.port,
+            "connections": len(self._connections),
+            "connectionsTotal": self.connections_total,
+            "bytesReceived": self.bytes_received,
+            "lines": self.lines,
+            "malformed": self.malformed,
+            "rejected": self.rejected,
+            "oversized": self.oversized,
+            "queueBatches": self._queue.qsize() if self._queue is not None else 0,
+            "paused": self._paused,
+            "pauses": self.pauses
+        }
+
+
+# 전역 인스턴스
+line_protocol_server = LineProtocolServer(
+    host=settings.LINE_PROTOCOL_HOST,
+    port=settings.LINE_PROTOCOL_PORT,
+    validator=reading_validator,
+    pipeline=ingest_pipeline,
+    buffer_bytes=settings.LINE_PROTOCOL_BUFFER_BYTES,
+    queue_batches=settings.INGEST_QUEUE_BATCHES
+)
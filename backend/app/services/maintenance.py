@@ -0,0 +1,260 @@
+"""
+이력 데이터 백그라운드 정리 (앱 수명주기 동안 주기 실행)
+수년 운영해도 디스크 사용량과 조회 시간이 늘지 않도록 오래된 데이터를 단계적으로 줄임
+- 봉인: 수집 허용 지연이 지난 기간의 측정값 → 압축 세그먼트
+- 요약: ROLLUP_AFTER_DAYS가 지난 세그먼트 → 채널별 시간 요약 (개수/최소/최대/평균)
+- 보관 기간: RAW_RETENTION_DAYS가 지난 원본 세그먼트 삭제 (요약은 유지),
+  ROLLUP_RETENTION_DAYS / ALARM_RETENTION_DAYS가 지난 요약/알림 이벤트 삭제
+- 한가한 시간대(MAINTENANCE_QUIET_HOURS)에만: 요약이 끝난 세그먼트를 MERGE_SEGMENT_DAYS 단위로 병합, SQLite VACUUM
+- 작업은 threadpool에서 실행하고, 파일/채널 블록을 읽고 쓸 때마다 처리한 바이트만큼 작업 스레드에서 쉬어
+  디스크 처리량을 MAINTENANCE_IO_BYTES_PER_SECOND 이하로 제한 (긴 병합/요약 중에도 실시간 수집/전송 지연 방지)
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.alarm_engine import AlarmEngine, alarm_engine
+from app.services.reading_store import ReadingStore, reading_store
+
+DAY_SECONDS = 86400
+
+
+def parse_quiet_hours(text: str) -> Tuple[int, int]:
+    """"시작-끝" (로컬 시, 끝 미포함, 자정을 넘길 수 있음) → (시작, 끝)"""
+    try:
+        start, end = (int(part) for part in text.split("-"))
+    except ValueError:
+        raise ValueError(f"MAINTENANCE_QUIET_HOURS 형식이 올바르지 않습니다: {text} (예: 2-5)")
+    if not (0 <= start < 24 and 0 <= end <= 24):
+        raise ValueError(f"MAINTENANCE_QUIET_HOURS 범위가 올바르지 않습니다: {text}")
+    return start, end
+
+
+class MaintenanceService:
+    """봉인/요약/보관 기간 정리/병합/VACUUM 주기 실행기"""
+
+    def __init__(
+        self,
+        readings: ReadingStore,
+        alarms: AlarmEngine,
+        interval_seconds: float,
+        rollup_after_days: float,
+        raw_retention_days: float,
+        rollup_retention_days: float,
+        alarm_retention_days: float,
+        quiet_hours: str,
+        merge_days: int,
+        vacuum_min_free_ratio: float,
+        io_bytes_per_second: float
+    ):
+        self.readings = readings
+        self.alarms = alarms
+        self.interval = interval_seconds
+        self.rollup_after = rollup_after_days * DAY_SECONDS
+        self.raw_retention = raw_retention_days * DAY_SECONDS
+        self.rollup_retention = rollup_retention_days * DAY_SECONDS
+        self.alarm_retention = alarm_retention_days * DAY_SECONDS
+        self.quiet_hours = parse_quiet_hours(quiet_hours)
+        self.merge_seconds = merge_days * DAY_SECONDS
+        self.vacuum_min_free_ratio = vacuum_min_free_ratio
+        self.io_rate = io_bytes_per_second
+        if self.raw_retention and self.raw_retention <= self.rollup_after:
+            raise ValueError("RAW_RETENTION_DAYS는 ROLLUP_AFTER_DAYS보다 길어야 합니다.")
+
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.last_duration = 0.0
+        self.last_error: Optional[str] = None
+        self.counts = {
+            "sealedReadings": 0,
+            "rolledUpSegments": 0,
+            "rollupRows": 0,
+            "droppedSegments": 0,
+            "prunedRollups": 0,
+            "prunedAlarmEvents": 0,
+            "mergedSegments": 0,
+            "vacuumedBytes": 0
+        }
+        self.io_bytes = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"[MAINTENANCE] {self.last_error}")
+            await asyncio.sleep(self.interval)
+
+    def in_quiet_hours(self, now: float) -> bool:
+        start, end = self.quiet_hours
+        hour = datetime.fromtimestamp(now).hour
+        return start <= hour < end if start <= end else (hour >= start or hour < end)
+
+    async def _io(self, fn, *args):
+        """작업 1단위를 threadpool에서 실행 (처리량 제한은 작업 안에서 _pace로)"""
+        return await run_in_threadpool(fn, *args)
+
+    def _pace(self, size: int):
+        """처리한 바이트만큼 작업 스레드에서 쉼 (threadpool에서 호출, 이벤트 루프는 막지 않음)"""
+        self.io_bytes += size
+        if size and self.io_rate > 0:
+            pause = size / self.io_rate
+            self.throttled_seconds += pause
+            time.sleep(pause)
+
+    async def run_once(self, now: Optional[float] = None, force_quiet: bool = False):
+        """정리 작업 1회 (봉인 → 요약 → 보관 기간 정리 → 한가한 시간대 병합/VACUUM)"""
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        segments = self.readings.segments
+
+        # 봉인
+        while True:
+            sealed = await self._io(self._seal, now)
+            if sealed is None:
+                break
+            self.counts["sealedReadings"] += sealed
+
+        # 시간 요약
+        for start in self.readings.rollup_pending(now - self.rollup_after):
+            self.counts["rollupRows"] += await self._io(self._rollup, start)
+            self.counts["rolledUpSegments"] += 1
+
+        # 보관 기간 (원본은 요약이 끝난 세그먼트만 삭제)
+        if self.raw_retention:
+            pending = set(self.readings.rollup_pending(now))
+            for segment in segments.list():
+                if segment.t_max < (now - self.raw_retention) * 1000 and segment.start not in pending:
+                    await self._io(self._drop, segment.start)
+                    self.counts["droppedSegments"] += 1
+        if self.rollup_retention:
+            self.counts["prunedRollups"] += await run_in_threadpool(
+                self.readings.prune_rollups, now - self.rollup_retention
+            )
+        if self.alarm_retention:
+            self.counts["prunedAlarmEvents"] += await run_in_threadpool(
+                self.alarms.prune, datetime.fromtimestamp(now - self.alarm_retention)
+            )
+
+        # 병합/VACUUM (파일 전체를 다시 쓰므로 한가한 시간대에만)
+        if force_quiet or self.in_quiet_hours(now):
+            if self.merge_seconds:
+                for group_start, starts in self._merge_groups(now):
+                    await self._io(self._merge, starts, group_start)
+                    self.counts["mergedSegments"] += len(starts)
+            self.counts["vacuumedBytes"] += await self._io(self._vacuum, self.readings)
+            self.counts["vacuumedBytes"] += await self._io(self._vacuum, self.alarms)
+
+        self.runs += 1
+        self.last_run = now
+        self.last_duration = time.perf_counter() - started
+        self.last_error = None
+
+    def _merge_groups(self, now: float) -> List[Tuple[int, List[int]]]:
+        """병합 대상: 요약이 끝나고 같은 병합 기간에 속하는 세그먼트가 2개 이상인 그룹 (마지막 기간은 다 찰 때까지 대기)"""
+        pending = set(self.readings.rollup_pending(now))
+        groups: Dict[int, List[int]] = {}
+        for segment in self.readings.segments.list():
+            group_start = int(segment.start // self.merge_seconds * self.merge_seconds)
+            if group_start + self.merge_seconds > now - self.rollup_after:
+                continue
+            groups.setdefault(group_start, []).append(segment.start)
+        return [
+            (group_start, starts) for group_start, starts in sorted(groups.items())
+            if len(starts) > 1 and not pending.intersection(starts)
+        ]
+
+    # 작업 단위 (threadpool에서 실행)
+    def _seal(self, now: float):
+        # 처리 바이트는 측정값당 16바이트(시각 + 값)로 추정
+        sealed = self.readings.seal_next(now)
+        self._pace(sealed * 16 if sealed else 0)
+        return sealed
+
+    def _rollup(self, start: int):
+        # 채널 블록 단위로 읽을 때마다 쉼
+        return self.readings.rollup_segment(start, pace=self._pace)
+
+    def _drop(self, start: int):
+        self._pace(self.readings.drop_segment(start))
+
+    def _merge(self, starts: List[int], group_start: int):
+        # 원본 파일 1개 읽기 / 병합 파일 쓰기마다 쉼
+        self.readings.segments.merge(starts, group_start, self.merge_seconds, pace=self._pace)
+        self.readings.replace_rollup_marks(starts, group_start)
+
+    def _vacuum(self, store):
+        # VACUUM은 파일 전체를 다시 씀 (한 번에 끝나므로 끝난 뒤 쉼)
+        before = _file_size(store.path)
+        reclaimed = store.vacuum(self.vacuum_min_free_ratio)
+        self._pace(before if reclaimed else 0)
+        return reclaimed
+
+    def disk_usage(self) -> Dict:
+        """이력 데이터 디스크 사용량 (바이트)"""
+        segments = self.readings.segments.stats()["bytes"]
+        readings = _file_size(self.readings.path)
+        alarms = _file_size(self.alarms.path)
+        return {"segments": segments, "readingsDb": readings, "monitoringDb": alarms, "total": segments + readings + alarms}
+
+    def stats(self) -> Dict:
+        """정리 작업 현황"""
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "lastRun": datetime.fromtimestamp(self.last_run).isoformat() if self.last_run else None,
+            "lastDurationSeconds": round(self.last_duration, 3),
+            "lastError": self.last_error,
+            "quietHours": "{}-{}".format(*self.quiet_hours),
+            "ioBytes": self.io_bytes,
+            "throttledSeconds": round(self.throttled_seconds, 3),
+            **self.counts,
+            "diskUsage": self.disk_usage()
+        }
+
+
+def _file_size(path: Optional[str]) -> int:
+    """SQLite 파일 + WAL 크기 (없으면 0)"""
+    if not path:
+        return 0
+    return sum(os.path.getsize(item) for item in (path, path + "-wal") if os.path.exists(item))
+
+
+# 전역 인스턴스
+maintenance_service = MaintenanceService(
+    readings=reading_store,
+    alarms=alarm_engine,
+    interval_seconds=settings.MAINTENANCE_INTERVAL_SECONDS,
+    rollup_after_days=settings.ROLLUP_AFTER_DAYS,
+    raw_retention_days=settings.RAW_RETENTION_DAYS,
+    rollup_retention_days=settings.ROLLUP_RETENTION_DAYS,
+    alarm_retention_days=settings.ALARM_RETENTION_DAYS,
+    quiet_hours=settings.MAINTENANCE_QUIET_HOURS,
+    merge_days=settings.MERGE_SEGMENT_DAYS,
+    vacuum_min_free_ratio=settings.VACUUM_MIN_FREE_RATIO,
+    io_bytes_per_second=settings.MAINTENANCE_IO_BYTES_PER_SECOND
+)
@@ -0,0 +1,239 @@
+"""
+런타임 계측 도구
+사전 할당된 버킷 배열에 관측값을 누적하는 히스토그램 (잠금 없음, 이벤트 루프 단일 스레드 기준)
+- 카운터/히스토그램 묶음(라벨 조합별 자식)을 레지스트리에 등록하고 /metrics에서 Prometheus 텍스트 형식으로 출력
+- 자식은 라벨 조합을 처음 쓸 때 한 번 만들고, 이후 관측은 정수 덧셈 몇 번 (운영 중 상시 사용 가능)
+- threadpool에서 증가시키는 값은 드물게 동시 증가가 유실될 수 있음 (계측 용도로 허용, 잠금 대신)
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷 상한 이하 누적 개수는 조회 시 계산)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # 마지막 칸: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict:
+        """버킷별 누적 개수, 전체 개수, 합계"""
+        cumulative = []
+        total = 0
+        for upper, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append({"le": "+Inf" if upper == float("inf") else upper, "count": total})
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 6)}
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Family:
+    """이름/도움말/라벨 이름이 같은 계측값 묶음 (라벨 값 조합별 자식)"""
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Sequence[str], factory: Callable):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.factory = factory
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """라벨 값 조합의 자식 (없으면 생성, 자주 쓰는 조합은 미리 꺼내 두고 사용)"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} 라벨은 {self.label_names}입니다.")
+            child = self.children[values] = self.factory()
+        return child
+
+
+class MetricsRegistry:
+    """계측값 등록 및 Prometheus 텍스트 형식 출력"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.families: List[Family] = []
+        self.gauges: List[Tuple[str, str, Sequence[str], Callable]] = []
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Family:
+        return self._register(Family(self.prefix + name, help, "counter", label_names, Counter))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> Family:
+        return self._register(Family(self.prefix + name, help, "histogram", label_names, lambda: Histogram(buckets)))
+
+    def gauge(self, name: str, help: str, read: Callable, label_names: Sequence[str] = ()):
+        """조회 시 read() 값 출력 (라벨이 있으면 read()는 {라벨 값 튜플: 값})"""
+        self.gauges.append((self.prefix + name, help, tuple(label_names), read))
+
+    def _register(self, family: Family) -> Family:
+        self.families.append(family)
+        return family
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        lines: List[str] = []
+        for family in self.families:
+            lines += (f"# HELP {family.name} {family.help}", f"# TYPE {family.name} {family.kind}")
+            for values, child in list(family.children.items()):
+                labels = list(zip(family.label_names, values))
+                if family.kind == "counter":
+                    lines.append(f"{family.name}{_labels(labels)} {_number(child.value)}")
+                    continue
+                total = 0
+                for upper, count in zip(child.buckets + (float("inf"),), child.counts):
+                    total += count
+                    lines.append(f"{family.name}_bucket{_labels(labels + [('le', _number(upper))])} {total}")
+                lines.append(f"{family.name}_sum{_labels(labels)} {_number(child.sum)}")
+                lines.append(f"{family.name}_count{_labels(labels)} {child.count}")
+
+        for name, help, label_names, read in self.gauges:
+            lines += (f"# HELP {name} {help}", f"# TYPE {name} gauge")
+            value = read()
+            items = value.items() if label_names else [((), value)]
+            for values, item in items:
+                lines.append(f"{name}{_labels(list(zip(label_names, values)))} {_number(item)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    """{key="value",...} (값의 역슬래시/따옴표/줄바꿈은 이스케이프)"""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 처리 시간 (ASGI 미들웨어, 라우트 경로 템플릿별)
+    라벨은 실제 경로가 아니라 라우트 템플릿(/api/history/{id} 등)이라 라벨 조합 수가 라우트 수로 제한됨
+    """
+
+    def __init__(self, app, histogram: Family):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or _endpoint_paths(scope).get(scope.get("endpoint"), "unmatched")
+            self.histogram.labels(scope["method"], route).observe(time.perf_counter() - started)
+
+
+def _endpoint_paths(scope) -> Dict:
+    """엔드포인트 → 라우트 경로 (라우팅 결과에 라우트가 없는 Starlette 버전용, 앱당 한 번 생성)"""
+    app = scope.get("app")
+    paths = getattr(app, "_metrics_endpoint_paths", None)
+    if paths is None:
+        paths = {route.endpoint: route.path for route in getattr(app, "routes", []) if hasattr(route, "endpoint")}
+        if app is not None:
+            app._metrics_endpoint_paths = paths
+    return paths
+
+
+class LoopLagMonitor:
+    """이벤트 루프 지연 (interval마다 깨어나 예정 시각보다 늦은 시간을 기록)"""
+
+    def __init__(self, histogram: Histogram, interval_seconds: float):
+        self.histogram = histogram
+        self.interval = interval_seconds
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(loop.time() - expected, 0.0)
+            self.histogram.observe(self.last_lag)
+
+
+# 지연 시간(ms) 기본 버킷
+LATENCY_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# 처리 시간(초) 버킷 (/metrics, Prometheus 관례상 초 단위)
+DURATION_SECONDS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+
+# 전역 인스턴스
+metrics_registry = MetricsRegistry(prefix="wastewater_")
+http_request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (라우트 템플릿별)",
+    DURATION_SECONDS_BUCKETS, ("method", "route")
+)
+generator_seconds = metrics_registry.histogram(
+    "generator_duration_seconds", "실시간 전송 메시지 생성 시간 (메시지 종류별)",
+    DURATION_SECONDS_BUCKETS, ("type",)
+)
+broadcast_seconds = metrics_registry.histogram(
+    "broadcast_duration_seconds", "WebSocket 브로드캐스트 전체 전송 시간 (메시지 종류별)",
+    DURATION_SECONDS_BUCKETS, ("type",)
+)
+client_queue_depth = metrics_registry.histogram(
+    "websocket_client_queue_depth", "전송 시작 시 같은 클라이언트에 밀려 있던 전송 수",
+    (0, 1, 2, 4, 8, 16, 32)
+).labels()
+export_rows = metrics_registry.counter("export_rows_total", "내보내기로 기록한 행 수", ("format", "kind"))
+export_bytes = metrics_registry.counter("export_bytes_total", "내보내기로 전송한 바이트 수", ("format", "kind"))
+loop_lag_seconds = metrics_registry.histogram(
+    "event_loop_lag_seconds", "이벤트 루프 지연 (예정 시각 대비 늦게 깨어난 시간)",
+    DURATION_SECONDS_BUCKETS
+).labels()
+loop_lag_monitor = LoopLagMonitor(loop_lag_seconds, settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
+metrics_registry.gauge(
+    "event_loop_lag_last_seconds", "마지막 측정한 이벤트 루프 지연", lambda: loop_lag_monitor.last_lag
+)
@@ -0,0 +1,489 @@
+"""
+수집 측정값 저장소 (그룹 커밋)
+여러 수집 요청의 측정값 배치를 메모리에 모았다가 한 트랜잭션(fsync 1회)으로 기록
+- 크기 조건: 모인 측정값이 INGEST_COMMIT_ROWS 이상이면 즉시 커밋
+- 시간 조건: 그 외에는 INGEST_COMMIT_INTERVAL_MS 주기로 커밋 (배치 대기 시간 상한)
+- 각 요청은 자신의 배치가 디스크에 기록된 뒤에 응답 (커밋 실패 시 요청도 실패)
+- 커밋 루프가 시작되지 않았으면(앱 수명주기 밖) 요청마다 바로 기록
+- 수집 허용 지연(INGEST_MAX_AGE_SECONDS)이 지나 더 이상 측정값이 들어올 수 없는 기간은
+  압축 세그먼트로 봉인하고 SQLite에서 삭제 (조회는 세그먼트 + SQLite를 합쳐서)
+- 봉인된 세그먼트의 시간별 요약(rollup)도 같은 파일에 보관
+  (봉인/요약/보관 기간 정리는 maintenance 서비스가 주기적으로 실행)
+- 커밋/봉인/세그먼트 삭제마다 이력 조회 캐시의 데이터 버전을 올려 캐시된 이력 응답을 무효화
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import open_sqlite, vacuum_sqlite
+from app.services.history_cache import HistoryCache, history_cache
+from app.services.metrics import Histogram
+from app.services.segments import SegmentRows, SegmentStore, segment_store
+from app.services.timeseries import bucket_aggregate
+
+
+class ReadingBatch(NamedTuple):
+    """검증된 측정값 배치 (열 단위 배열, 같은 길이)"""
+    timestamp: np.ndarray   # float64, epoch 초
+    zone: np.ndarray        # int, 0부터 시작하는 지 인덱스
+    reactor: np.ndarray     # int, PROCESS_TYPES 인덱스
+    sensor: np.ndarray      # int, PROCESS_SENSORS 인덱스
+    value: np.ndarray       # float64
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @classmethod
+    def concat(cls, batches: List["ReadingBatch"]) -> "ReadingBatch":
+        """여러 배치를 하나로 합침"""
+        if len(batches) == 1:
+            return batches[0]
+        return cls(*(np.concatenate(column) for column in zip(*batches)))
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_readings (
+    timestamp   REAL NOT NULL,
+    zone        INTEGER NOT NULL,
+    reactor     INTEGER NOT NULL,
+    sensor      INTEGER NOT NULL,
+    value       REAL NOT NULL
+)
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS idx_sensor_readings_timestamp ON sensor_readings (timestamp)"
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_rollups (
+    hour        INTEGER NOT NULL,
+    zone        INTEGER NOT NULL,
+    reactor     INTEGER NOT NULL,
+    sensor      INTEGER NOT NULL,
+    count       INTEGER NOT NULL,
+    min         REAL NOT NULL,
+    max         REAL NOT NULL,
+    mean        REAL NOT NULL,
+    PRIMARY KEY (hour, zone, reactor, sensor)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_segments (
+    start       INTEGER PRIMARY KEY
+);
+"""
+
+ROLLUP_SECONDS = 3600
+ROLLUP_STATISTICS = ["count", "min", "max", "mean"]
+
+
+class Rollups(NamedTuple):
+    """시간별 요약 (열 단위 배열, 같은 길이)"""
+    hour: np.ndarray        # 시간 시작 epoch 초
+    zone: np.ndarray
+    reactor: np.ndarray
+    sensor: np.ndarray
+    count: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.hour)
+
+
+class ReadingStore:
+    """측정값 그룹 커밋 저장소"""
+
+    def __init__(
+        self,
+        commit_rows: int,
+        commit_interval_ms: float,
+        segments: SegmentStore,
+        max_age_seconds: float,
+        history: HistoryCache
+    ):
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval_ms / 1000
+        self.segments = segments
+        self.max_age = max_age_seconds
+        self.history = history
+        self.path: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self._pending: List[Tuple[ReadingBatch, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._committer: Optional[asyncio.Task] = None
+
+        self.rows = 0
+        self.commits = 0
+        self.sealed_rows = 0
+        self.seal_ms = Histogram((10, 50, 100, 500, 1000, 5000, 10000, 60000))
+        self.commit_size = Histogram((1, 10, 100, 500, 1000, 2000, 5000, 10000, 50000))
+        self.commit_ms = Histogram((1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+
+    @property
+    def running(self) -> bool:
+        return self._committer is not None
+
+    def open(self, path: str):
+        """저장소 파일 열기 (앱 시작 시 호출, 봉인된 세그먼트도 매핑)"""
+        with self._db_lock:
+            conn = open_sqlite(path)
+            conn.execute(SCHEMA)
+            conn.execute(INDEX)
+            conn.executescript(ROLLUP_SCHEMA)
+            self._conn = conn
+            self.path = path
+        self.segments.open()
+
+    def close(self):
+        """저장소 파일 닫기 (앱 종료 시 호출, stop 이후)"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self.segments.close()
+
+    async def start(self):
+        """그룹 커밋 루프 시작"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._committer = asyncio.create_task(self._commit_loop())
+
+    async def stop(self):
+        """커밋 루프 중지 (대기 중인 배치는 마지막으로 기록)"""
+        if self._committer is not None:
+            self._committer.cancel()
+            self._committer = None
+        await self._flush()
+
+    async def append(self, batch: ReadingBatch) -> int:
+        """배치 추가 후 커밋될 때까지 대기 (기록한 측정값 수 반환)"""
+        if not len(batch):
+            return 0
+        if not self.running:
+            await run_in_threadpool(self._write, [batch])
+            return len(batch)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((batch, future))
+        self._pending_rows += len(batch)
+        if self._pending_rows >= self.commit_rows:
+            self._wake.set()
+        return await future
+
+    async def _commit_loop(self):
+        """크기 조건(즉시) 또는 시간 조건(주기)마다 모인 배치를 한 번에 커밋"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.commit_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        try:
+            await run_in_threadpool(self._write, [batch for batch, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for batch, future in pending:
+            if not future.done():
+                future.set_result(len(batch))
+
+    def _write(self, batches: List[ReadingBatch]):
+        """배치 묶음을 한 트랜잭션으로 기록 (threadpool에서 호출)"""
+        started = time.perf_counter()
+        rows = [
+            row
+            for batch in batches
+            for row in zip(
+                batch.timestamp.tolist(), batch.zone.tolist(), batch.reactor.tolist(),
+                batch.sensor.tolist(), batch.value.tolist()
+            )
+        ]
+        with self._db_lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany("INSERT INTO sensor_readings VALUES (?, ?, ?, ?, ?)", rows)
+        self.history.bump_version()
+
+        self.rows += len(rows)
+        self.commits += 1
+        self.commit_size.observe(len(rows))
+        self.commit_ms.observe((time.perf_counter() - started) * 1000)
+
+    def seal_due(self, now: Optional[float] = None) -> int:
+        """봉인할 수 있는 기간을 모두 봉인 (봉인한 측정값 수 반환)"""
+        sealed = 0
+        while True:
+            result = self.seal_next(now)
+            if result is None:
+                return sealed
+            sealed += result
+
+    def seal_next(self, now: Optional[float] = None) -> Optional[int]:
+        """
+        수집 허용 지연이 지난 가장 오래된 기간 하나를 세그먼트로 봉인 후 SQLite에서 삭제
+        (봉인한 측정값 수 반환, 봉인할 기간이 없으면 None)
+        봉인 후 삭제 전에 중단되면 다음 봉인 시 같은 기간 세그먼트와 합치면서 중복 제거
+        조회~삭제 사이에 커밋된 측정값은 rowid가 더 크므로, 조회 시점의 최대 rowid 이하만 봉인/삭제
+        (나머지는 다음 봉인 때 같은 기간 세그먼트에 합쳐짐)
+        """
+        now = time.time() if now is None else now
+        boundary = self.segments.span_start(now - self.max_age)
+        with self._db_lock:
+            if self._conn is None:
+                return None
+            oldest = self._conn.execute(
+                "SELECT MIN(timestamp) FROM sensor_readings WHERE timestamp < ?", (boundary,)
+            ).fetchone()[0]
+        if oldest is None:
+            return None
+
+        started = time.perf_counter()
+        start = self.segments.span_start(oldest)
+        end = start + self.segments.span
+        with self._db_lock:
+            max_rowid = self._conn.execute(
+                "SELECT MAX(rowid) FROM sensor_readings WHERE timestamp >= ? AND timestamp < ?", (start, end)
+            ).fetchone()[0]
+        rows = self._select(start, end, max_rowid)
+        self.segments.seal(start, rows)
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "DELETE FROM sensor_readings WHERE timestamp >= ? AND timestamp < ? AND rowid <= ?",
+                    (start, end, max_rowid)
+                )
+        self.history.bump_version()
+        self.sealed_rows += len(rows)
+        self.seal_ms.observe((time.perf_counter() - started) * 1000)
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # 시간별 요약 (rollup)
+    # ------------------------------------------------------------------
+    def rollup_pending(self, before: float) -> List[int]:
+        """before 이전에 끝난 세그먼트 중 아직 요약하지 않은 세그먼트 시작 목록"""
+        with self._db_lock:
+            if self._conn is None:
+                return []
+            done = {row[0] for row in self._conn.execute("SELECT start FROM rollup_segments")}
+        return [
+            segment.start for segment in self.segments.list()
+            if segment.start not in done and segment.t_max < before * 1000
+        ]
+
+    def rollup_segment(self, start: int, pace: Optional[Callable[[int], None]] = None) -> int:
+        """
+        세그먼트 1개를 채널별 시간 요약으로 기록 (기록한 요약 행 수, 재실행해도 같은 결과)
+        채널 블록 단위로 디코딩하고, pace를 주면 채널마다 읽은 블록 바이트 수로 호출 (처리량 제한)
+        """
+        segment = self.segments.get(start)
+        if segment is None:
+            return 0
+        blocks = segment.blocks
+        keys, channel = np.unique(
+            np.column_stack([blocks["zone"], blocks["reactor"], blocks["sensor"]]).astype(np.int64),
+            axis=0, return_inverse=True
+        )
+        channel = channel.reshape(-1)
+        parts = []
+        for idx, (zone, reactor, sensor) in enumerate(keys.tolist()):
+            indices = np.flatnonzero(channel == idx)
+            rows = segment.read(indices, segment.t_min, segment.t_max + 1)
+            if pace is not None:
+                pace(int(blocks["t_bytes"][indices].sum() + blocks["v_bytes"][indices].sum()))
+            hours, stats = bucket_aggregate(rows.timestamp, rows.value, ROLLUP_SECONDS, ROLLUP_STATISTICS)
+            parts += zip(
+                hours.astype(np.int64).tolist(), [zone] * len(hours), [reactor] * len(hours), [sensor] * len(hours),
+                stats["count"].astype(np.int64).tolist(), stats["min"].tolist(), stats["max"].tolist(), stats["mean"].tolist()
+            )
+        with self._db_lock:
+            if self._conn is None:
+                return 0
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("INSERT OR REPLACE INTO sensor_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)", parts)
+                self._conn.execute("INSERT OR IGNORE INTO rollup_segments VALUES (?)", (start,))
+        return len(parts)
+
+    def replace_rollup_marks(self, starts: List[int], start: int):
+        """병합한 세그먼트들의 요약 완료 표시를 병합 결과 세그먼트 하나로 교체"""
+        with self._db_lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany("DELETE FROM rollup_segments WHERE start = ?", [(item,) for item in starts])
+                    self._conn.execute("INSERT OR IGNORE INTO rollup_segments VALUES (?)", (start,))
+
+    def drop_segment(self, start: int) -> int:
+        """보관 기간이 지난 원본 세그먼트 삭제 (시간 요약은 유지, 삭제한 바이트 수 반환)"""
+        size = self.segments.drop(start)
+        self.history.bump_version()
+        with self._db_lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM rollup_segments WHERE start = ?", (start,))
+        return size
+
+    def prune_rollups(self, before: float) -> int:
+        """보관 기간이 지난 시간 요약 삭제 (삭제한 행 수)"""
+        with self._db_lock:
+            if self._conn is None:
+                return 0
+            with self._conn:
+                self._conn.execute("BEGIN")
+                return self._conn.execute("DELETE FROM sensor_rollups WHERE hour < ?", (int(before),)).rowcount
+
+    def query_rollups(self, start: float, end: float, channels: Optional[np.ndarray] = None) -> Rollups:
+        """[start, end) 구간 시간 요약 (시각순)"""
+        with self._db_lock:
+            rows = [] if self._conn is None else self._conn.execute(
+                "SELECT hour, zone, reactor, sensor, count, min, max, mean FROM sensor_rollups "
+                "WHERE hour >= ? AND hour < ? ORDER BY hour, zone, reactor, sensor",
+                (int(start // ROLLUP_SECONDS) * ROLLUP_SECONDS, end)
+            ).fetchall()
+        table = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 8)
+        result = Rollups(*(table[:, col].astype(np.int64) for col in range(5)), *(table[:, col] for col in (5, 6, 7)))
+        if channels is not None and len(result):
+            known = result.zone < channels.shape[0]
+            keep = known & channels[np.where(known, result.zone, 0), result.reactor, result.sensor]
+            result = Rollups(*(column[keep] for column in result))
+        return result
+
+    def vacuum(self, min_free_ratio: float) -> int:
+        """빈 페이지 비율이 기준 이상이면 VACUUM (정리한 바이트 수, 수행 중에는 커밋 대기)"""
+        with self._db_lock:
+            return vacuum_sqlite(self._conn, min_free_ratio)
+
+    def _select(self, start: float, end: float, max_rowid: Optional[int] = None) -> SegmentRows:
+        """SQLite의 [start, end) 측정값 (열 단위 배열, max_rowid를 주면 그 rowid 이하만)"""
+        with self._db_lock:
+            if self._conn is None:
+                return SegmentRows.concat([])
+            rows = self._conn.execute(
+                "SELECT timestamp, zone, reactor, sensor, value FROM sensor_readings "
+                "WHERE timestamp >= ? AND timestamp < ? AND rowid <= ?",
+                (start, end, max_rowid if max_rowid is not None else 2 ** 63 - 1)
+            ).fetchall()
+        if not rows:
+            return SegmentRows.concat([])
+        table = np.array([tuple(row) for row in rows], dtype=np.float64)
+        return SegmentRows(table[:, 0], *(table[:, col].astype(np.int64) for col in (1, 2, 3)), table[:, 4])
+
+    def query(self, start: float, end: float, channels: Optional[np.ndarray] = None) -> SegmentRows:
+        """
+        [start, end) 측정값 (시각순): 봉인된 세그먼트 + 아직 봉인되지 않은 SQLite 측정값
+        channels: (지, 공종, 센서) bool 마스크 (세그먼트는 블록 머리말로 건너뜀)
+        """
+        sealed = self.segments.query(start, end, channels)
+        recent = self._select(start, end)
+        if channels is not None and len(recent):
+            keep = channels[recent.zone, recent.reactor, recent.sensor]
+            recent = SegmentRows(*(column[keep] for column in recent))
+        rows = SegmentRows.concat([sealed, recent])
+        order = np.argsort(rows.timestamp, kind="stable")
+        return SegmentRows(*(column[order] for column in rows))
+
+    def sample(
+        self,
+        times: np.ndarray,
+        step: float,
+        channels: np.ndarray,
+        rollup_before: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        시각 격자 → (시점, 선택 채널) 측정값 (이력 조회/내보내기용, 채널 순서는 channels.nonzero() 순서)
+        - 시점 t의 값은 (t - step, t] 구간에서 채널별 마지막 측정값, 측정이 없으면 NaN
+        - times는 step 간격의 등간격 격자
+        - rollup_before를 주고 step이 요약 간격 이상이면 그 이전 시점은 시간 요약에서 조회
+          (구간 안 마지막 시간의 평균, 원본 세그먼트가 삭제된 기간도 조회 가능)
+          요약이 아직 생성되지 않은 마지막 요약 시점 이후는 원본에서 조회
+        """
+        values = np.full((len(times), int(channels.sum())), np.nan)
+        if not len(times):
+            return values
+
+        raw_from = 0
+        if rollup_before is not None and step >= ROLLUP_SECONDS:
+            old = int(np.searchsorted(times, rollup_before, side="right"))
+            if old:
+                rollups = self.query_rollups(float(times[0]) - step, float(times[old - 1]), channels)
+                self._fill(values[:old], times[0], step, rollups.hour + ROLLUP_SECONDS, channels, rollups, rollups.mean)
+                rolled = np.flatnonzero(~np.isnan(values[:old]).all(axis=1))
+                raw_from = int(rolled[-1]) + 1 if len(rolled) else 0
+        if raw_from >= len(times):
+            return values
+
+        first, last = float(times[raw_from]), float(times[-1])
+        rows = self.query(first - step, np.nextafter(last, np.inf), channels)
+        recent = values[raw_from:]
+        if raw_from:
+            # 요약으로 채운 시점은 유지 (원본 값이 없는 칸만 채움)
+            recent = np.full_like(recent, np.nan)
+        self._fill(recent, first, step, rows.timestamp, channels, rows, rows.value)
+        if raw_from:
+            np.copyto(values[raw_from:], recent, where=np.isnan(values[raw_from:]))
+        return values
+
+    @staticmethod
+    def _fill(
+        values: np.ndarray,
+        first: float,
+        step: float,
+        timestamp: np.ndarray,
+        channels: np.ndarray,
+        rows,
+        column_values: np.ndarray
+    ):
+        """시각순 행을 격자 칸 (first + k·step - step, first + k·step]에 배치 (같은 칸이면 마지막 행)"""
+        slot = np.ceil((timestamp - first) / step).astype(np.int64)
+        keep = (slot >= 0) & (slot < len(values))
+        column = np.full(channels.shape, -1, dtype=np.int64)
+        column[channels] = np.arange(values.shape[1])
+        cells = slot[keep] * values.shape[1] + column[rows.zone[keep], rows.reactor[keep], rows.sensor[keep]]
+
+        last_idx = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        values.flat[cells[last_idx]] = column_values[keep][last_idx]
+
+    def stats(self) -> Dict:
+        """저장 현황"""
+        return {
+            "running": self.running,
+            "rows": self.rows,
+            "commits": self.commits,
+            "pendingRows": self._pending_rows,
+            "commitRows": self.commit_rows,
+            "commitIntervalMs": self.commit_interval * 1000,
+            "commitSize": self.commit_size.snapshot(),
+            "commitMs": self.commit_ms.snapshot(),
+            "sealedRows": self.sealed_rows,
+            "sealMs": self.seal_ms.snapshot(),
+            "segments": self.segments.stats()
+        }
+
+
+# 전역 인스턴스
+reading_store = ReadingStore(
+    commit_rows=settings.INGEST_COMMIT_ROWS,
+    commit_interval_ms=settings.INGEST_COMMIT_INTERVAL_MS,
+    segments=segment_store,
+    max_age_seconds=settings.INGEST_MAX_AGE_SECONDS,
+    history=history_cache
+)
@@ -0,0 +1,340 @@
+"""
+녹화 데이터 재생 (부하 시험 / 사고 분석)
+녹화 파일의 측정값을 녹화 시각 간격 ÷ 배속으로 실시간 파이프라인(통계/알림/전송)에 다시 흘려보냄
+- 녹화 형식: 측정값 1건 = 1행 (timestamp, zone, reactor, sensor, value)
+  반응조 센서: reactor = anaerobic / anoxic / aerobic, sensor = orp / ph / do / mlss
+  방류 TMS: reactor = "tms", sensor = toc / ss / tn / tp, zone 비움
+  timestamp: epoch 초 또는 ISO 8601 (시간대 없으면 로컬 시각)
+- CSV / NDJSON(줄마다 객체)은 파일을 메모리 매핑하여 Arrow로 읽고, Parquet은 메모리 매핑 읽기
+- 같은 시각의 행 묶음 = 프레임 1개, 프레임마다 변경된 채널만 최신값 스냅샷에 반영
+- 예정 시각보다 늦으면 밀린 프레임을 한 번에 합쳐 전송 (따라가지 못한 프레임 수/지연을 기록)
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.config import settings
+from app.services.history_cache import HistoryCache, history_cache
+from app.services.ingest import ROW_FIELDS
+from app.services.metrics import LATENCY_MS_BUCKETS, Histogram
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES, threshold_engine
+from app.services.topology import PlantTopology, plant_topology
+
+
+# 방류 TMS 행의 reactor 값
+TMS_REACTOR = "tms"
+
+# 녹화 시각 기준 처리장 공종 현황/예측 전송 주기 (초, 실시간 스트리밍과 같은 주기)
+PROCESS_STATUS_SECONDS = 15
+PREDICTION_SECONDS = 30
+
+# 배속을 따라간 것으로 보는 실효 배속 비율
+KEPT_UP_RATIO = 0.95
+
+
+class Recording:
+    """시각순으로 정렬한 녹화 측정값 열 배열"""
+
+    def __init__(self, path: str, timestamp: np.ndarray, is_tms: np.ndarray, channel: np.ndarray,
+                 value: np.ndarray, skipped: int):
+        order = np.argsort(timestamp, kind="stable")
+        self.path = path
+        self.timestamp = timestamp[order]
+        self.is_tms = is_tms[order]
+        self.channel = channel[order]      # 센서: (지, 공종, 센서) 평탄화 인덱스, TMS: 파라미터 인덱스
+        self.value = value[order]
+        self.skipped = skipped
+
+        # 프레임 = 같은 시각의 행 구간 [frame_starts[i], frame_starts[i + 1])
+        changes = np.flatnonzero(np.diff(self.timestamp)) + 1
+        self.frame_starts = np.concatenate(([0], changes, [len(self.timestamp)])) if len(self.timestamp) else np.zeros(1, dtype=np.int64)
+        self.frame_times = self.timestamp[self.frame_starts[:-1]]
+
+    @property
+    def frames(self) -> int:
+        return len(self.frame_times)
+
+    @property
+    def duration(self) -> float:
+        """녹화 구간 길이 + 프레임 간격 1개 (반복 재생 시 다음 회차 시작 간격)"""
+        if not self.frames:
+            return 0.0
+        step = float(np.median(np.diff(self.frame_times))) if self.frames > 1 else 1.0
+        return float(self.frame_times[-1] - self.frame_times[0]) + step
+
+
+def _read_table(path: str) -> pa.Table:
+    """확장자별 Arrow 테이블 읽기 (메모리 매핑)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    if extension == ".csv":
+        from pyarrow import csv
+        return csv.read_csv(
+            pa.memory_map(path),
+            convert_options=csv.ConvertOptions(column_types={"reactor": pa.string(), "sensor": pa.string()})
+        )
+    if extension in (".ndjson", ".jsonl"):
+        from pyarrow import json
+        return json.read_json(pa.memory_map(path))
+    raise ValueError(f"지원하지 않는 녹화 형식입니다: {extension} (csv / parquet / ndjson)")
+
+
+def _epoch_seconds(column: pa.ChunkedArray) -> np.ndarray:
+    """시각 열 → epoch 초 (없거나 해석 불가면 NaN)"""
+    if pa.types.is_timestamp(column.type):
+        seconds = column.cast(pa.timestamp("us", tz=column.type.tz)).cast(pa.int64())
+        seconds = seconds.cast(pa.float64()).fill_null(np.nan).to_numpy() / 1e6
+        if column.type.tz is None:
+            seconds -= time.localtime().tm_gmtoff   # 시간대 없는 시각은 로컬 시각
+        return seconds
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        # 같은 시각 문자열이 채널 수만큼 반복되므로 고유값만 해석
+        unique = pc.unique(column)
+        parsed = np.array([_parse_time(text) for text in unique.to_pylist()], dtype=np.float64)
+        return parsed[pc.index_in(column, value_set=unique).fill_null(0).to_numpy()] if len(unique) else np.zeros(0)
+    return column.cast(pa.float64()).fill_null(np.nan).to_numpy()
+
+
+def _parse_time(text: Optional[str]) -> float:
+    """ISO 8601 또는 epoch 초 문자열 → epoch 초 (시간대 없으면 로컬 시각, 해석 불가면 NaN)"""
+    if text is None:
+        return np.nan
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return np.nan
+
+
+def _lookup(column: pa.ChunkedArray, names: Sequence[str]) -> np.ndarray:
+    """문자열 열 → 이름 목록 내 인덱스 (없으면 -1)"""
+    column = pc.utf8_lower(column.cast(pa.string()))
+    return pc.index_in(column, value_set=pa.array(list(names))).fill_null(-1).to_numpy()
+
+
+def load_recording(path: str, topology: PlantTopology, parameters: Sequence[str]) -> Recording:
+    """녹화 파일 → Recording (알 수 없는 채널/미설치 센서/해석할 수 없는 행은 건너뜀)"""
+    table = _read_table(path)
+    missing = [field for field in ROW_FIELDS if field not in table.column_names]
+    if missing:
+        raise ValueError(f"녹화 파일에 필요한 열이 없습니다: {', '.join(missing)}")
+
+    timestamp = _epoch_seconds(table["timestamp"])
+    zone = table["zone"].cast(pa.float64()).fill_null(np.nan).to_numpy()
+    reactor = _lookup(table["reactor"], PROCESS_TYPES + (TMS_REACTOR,))
+    sensor = _lookup(table["sensor"], PROCESS_SENSORS)
+    param = _lookup(table["sensor"], parameters)
+    value = table["value"].cast(pa.float64()).fill_null(np.nan).to_numpy()
+
+    is_tms = reactor == len(PROCESS_TYPES)
+    z_idx = np.where(np.isfinite(zone), zone, 0).astype(np.int64) - 1
+    in_range = (z_idx >= 0) & (z_idx < topology.zone_count) & (zone % 1 == 0)
+    shape = topology.installed.shape
+    is_sensor = (reactor >= 0) & ~is_tms & (sensor >= 0) & in_range
+    flat = (np.clip(z_idx, 0, shape[0] - 1) * shape[1] + np.maximum(reactor, 0)) * shape[2] + np.maximum(sensor, 0)
+    is_sensor &= topology.installed.reshape(-1)[np.clip(flat, 0, topology.installed.size - 1)]
+
+    valid = np.isfinite(timestamp) & np.isfinite(value) & (is_sensor | (is_tms & (param >= 0)))
+    channel = np.where(is_tms, param, flat)
+    return Recording(
+        path, timestamp[valid], is_tms[valid], channel[valid].astype(np.int64), value[valid],
+        skipped=int((~valid).sum())
+    )
+
+
+class ReplayFrame(NamedTuple):
+    """재생 전송 단위 (밀린 프레임은 합쳐서 1개)"""
+    timestamp: float                  # 녹화 시각 (반복 재생 시 회차만큼 이동)
+    sensors: Optional[np.ndarray]     # 센서 최신값 스냅샷 (지, 공종, 센서), 변경 없으면 None
+    sensor_updates: Optional[np.ndarray]   # 이번 프레임에 기록된 채널만 값, 나머지 NaN (이동 통계용)
+    tms: Optional[np.ndarray]         # TMS 최신값 (파라미터,), 변경 없으면 None
+    process_status: bool              # 처리장 공종 현황 전송 시점
+    prediction: bool                  # 예측 전송 시점
+    frames: int                       # 합쳐진 녹화 프레임 수
+
+
+class ReplayProducer:
+    """녹화 데이터 재생기 (LIVE_SOURCE=replay일 때 모의 데이터 생성기 대신 사용)"""
+
+    def __init__(self, path: Optional[str], speed: float, loop: bool, topology: PlantTopology,
+                 parameters: Sequence[str], history: HistoryCache):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.topology = topology
+        self.parameters = list(parameters)
+        self.history = history
+        self.recording: Optional[Recording] = None
+        self.error: Optional[str] = None   # 재생 중단 사유 (녹화 파일/형식 오류 등)
+
+        self.lag_ms = Histogram(LATENCY_MS_BUCKETS)
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.recorded_seconds = 0.0
+        self.frames_played = 0
+        self.emitted = 0
+        self.coalesced = 0
+        self.max_lag_ms = 0.0
+        self.rounds = 0
+
+    async def frames(self) -> AsyncIterator[ReplayFrame]:
+        """
+        녹화 시각 간격 ÷ 배속 일정으로 프레임 생성
+        소비자가 전송을 마치고 다음 프레임을 요청한 시각이 예정보다 늦으면 밀린 프레임을 합침
+        """
+        loop = asyncio.get_running_loop()
+        self.error = None
+        if self.recording is None:
+            self.recording = await loop.run_in_executor(
+                None, load_recording, self.path, self.topology, self.parameters
+            )
+            print(f"[REPLAY] {self.path}: {len(self.recording.timestamp):,} rows, "
+                  f"{self.recording.frames:,} frames, {self.recording.duration / 3600:.2f} h, "
+                  f"skipped {self.recording.skipped:,}  speed={self.speed:g}x")
+
+        recording = self.recording
+        if not recording.frames:
+            return
+
+        self._reset_stats()
+        # 재생 데이터 출처가 바뀌었으므로 캐시된 이력 응답 무효화 (반복 재생은 회차마다)
+        self.history.bump_version()
+        sensors = np.full(self.topology.installed.shape, np.nan)
+        tms = np.full(len(self.parameters), np.nan)
+        flat_sensors = sensors.reshape(-1)
+        offset = 0.0
+        last_process = last_prediction = None
+
+        self.started = loop.time()
+        while True:
+            round_start = loop.time()
+            base = recording.frame_times[0]
+            due_times = round_start + (recording.frame_times - base) / self.speed
+
+            index = 0
+            while index < recording.frames:
+                delay = due_times[index] - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                # 예정 시각이 지난 프레임을 모두 합침
+                now = loop.time()
+                lag_ms = max(0.0, float(now - due_times[index]) * 1000)
+                stop = int(np.searchsorted(due_times, now, side="right"))
+                stop = max(stop, index + 1)
+                rows = slice(recording.frame_starts[index], recording.frame_starts[stop])
+
+                is_tms = recording.is_tms[rows]
+                channel, value = recording.channel[rows], recording.value[rows]
+                changed_sensors = _assign_latest(flat_sensors, channel[~is_tms], value[~is_tms])
+                updates = None
+                if changed_sensors:
+                    updates = np.full(sensors.shape, np.nan)
+                    _assign_latest(updates.reshape(-1), channel[~is_tms], value[~is_tms])
+                changed_tms = _assign_latest(tms, channel[is_tms], value[is_tms])
+
+                timestamp = float(recording.frame_times[stop - 1]) + offset
+                process_tick = int(timestamp // PROCESS_STATUS_SECONDS)
+                prediction_tick = int(timestamp // PREDICTION_SECONDS)
+
+                frame = ReplayFrame(
+                    timestamp=timestamp,
+                    sensors=sensors.copy() if changed_sensors else None,
+                    sensor_updates=updates,
+                    tms=tms.copy() if changed_tms else None,
+                    process_status=process_tick != last_process,
+                    prediction=prediction_tick != last_prediction,
+                    frames=stop - index
+                )
+                last_process, last_prediction = process_tick, prediction_tick
+
+                self.lag_ms.observe(lag_ms)
+                self.max_lag_ms = max(self.max_lag_ms, float(lag_ms))
+                self.frames_played += frame.frames
+                self.coalesced += frame.frames - 1
+                self.emitted += 1
+                self.recorded_seconds = float(timestamp - offset - base) + recording.duration * self.rounds
+                index = stop
+                yield frame
+
+            self.rounds += 1
+            if not self.loop:
+                break
+            offset += recording.duration
+            self.history.bump_version()
+
+        self.finished = loop.time()
+        stats = self.stats()
+        print(f"[REPLAY] finished: effective {stats['effectiveSpeed']}x / requested {self.speed:g}x, "
+              f"coalesced {self.coalesced:,} frames, max lag {self.max_lag_ms:.0f} ms, "
+              f"kept up: {stats['keptUp']}")
+
+    def fail(self, error: Exception):
+        """재생 중단 기록 (녹화 파일을 읽지 못했거나 전송 중 오류)"""
+        self.error = f"{type(error).__name__}: {error}"
+        if self.started is not None and self.finished is None:
+            self.finished = asyncio.get_event_loop().time()
+        print(f"[REPLAY] 재생 중단: {self.error}")
+
+    def stats(self) -> Dict:
+        """재생 현황 (실효 배속, 합쳐진 프레임 수, 지연 분포, 배속 유지 여부, 중단 사유)"""
+        wall = 0.0
+        if self.started is not None:
+            wall = (self.finished or asyncio.get_event_loop().time()) - self.started
+        effective = self.recorded_seconds / wall if wall > 0 else None
+        recording = self.recording
+        return {
+            "path": self.path,
+            "speed": self.speed,
+            "loop": self.loop,
+            "running": self.started is not None and self.finished is None,
+            "error": self.error,
+            "frames": recording.frames if recording is not None else 0,
+            "rows": len(recording.timestamp) if recording is not None else 0,
+            "skippedRows": recording.skipped if recording is not None else 0,
+            "framesPlayed": self.frames_played,
+            "messages": self.emitted,
+            "coalescedFrames": self.coalesced,
+            "rounds": self.rounds,
+            "recordedSeconds": round(self.recorded_seconds, 3),
+            "wallSeconds": round(wall, 3),
+            "effectiveSpeed": round(effective, 2) if effective is not None else None,
+            "maxLagMs": round(self.max_lag_ms, 1),
+            "lagMs": self.lag_ms.snapshot(),
+            # 밀린 프레임 없이 요청 배속의 KEPT_UP_RATIO 이상 유지
+            "keptUp": self.coalesced == 0 and (effective is None or effective >= self.speed * KEPT_UP_RATIO)
+        }
+
+
+def _assign_latest(target: np.ndarray, index: np.ndarray, value: np.ndarray) -> bool:
+    """채널별 마지막 값만 반영 (같은 채널이 여러 번 나오면 시각상 마지막 값), 변경 여부 반환"""
+    if not len(index):
+        return False
+    unique, last = np.unique(index[::-1], return_index=True)
+    target[unique] = value[::-1][last]
+    return True
+
+
+# 전역 인스턴스
+replay_producer = ReplayProducer(
+    path=settings.REPLAY_PATH,
+    speed=settings.REPLAY_SPEED,
+    loop=settings.REPLAY_LOOP,
+    topology=plant_topology,
+    parameters=threshold_engine.effluent_parameters,
+    history=history_cache
+)
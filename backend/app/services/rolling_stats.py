@@ -0,0 +1,232 @@
+"""
+채널별 이동 통계 및 이상 점수
+지 × 공종 × 센서 채널의 통계 상태를 NumPy 배열로 유지 (채널별 객체 없음)
+- EWMA 평균/분산: 측정값마다 O(1) 갱신, 평활 계수는 측정 간격 dt에 따라 1 - exp(-dt / 시정수)
+- 이동 최소/최대: 집계 구간을 고정 개수의 시간 버킷으로 나눠 버킷별 최소/최대만 유지
+  (측정값마다 현재 버킷만 갱신, 구간 경계 정밀도 = 버킷 길이, 채널별 시각 배열로 갱신하면 채널마다 자기 버킷)
+- EWMA 분산은 초기값 0에서 시작하므로 누적 가중치로 나눠 보정 (측정 초기 과소 추정 방지)
+- z-score: 새 측정값이 직전까지의 EWMA 분포에서 벗어난 정도 (측정 min_samples회 이후부터)
+- 측정값이 NaN(센서 미설치)인 채널은 상태를 바꾸지 않음
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.threshold_engine import PROCESS_NAMES, PROCESS_SENSORS, PROCESS_TYPES, SENSOR_LABELS
+from app.services.topology import PlantTopology, plant_topology
+
+
+class RollingStats:
+    """채널 배열 이동 통계 (EWMA 평균/분산, 이동 최소/최대, z-score)"""
+
+    def __init__(
+        self,
+        topology: PlantTopology,
+        mean_seconds: float,
+        window_seconds: float,
+        window_buckets: int,
+        zscore_alert: float,
+        min_samples: int
+    ):
+        self.topology = topology
+        self.zone_count = topology.zone_count
+        self.mean_seconds = mean_seconds
+        self.window_seconds = window_seconds
+        self.window_buckets = window_buckets
+        self.bucket_seconds = window_seconds / window_buckets
+        self.zscore_alert = zscore_alert
+        self.min_samples = min_samples
+
+        shape = (self.zone_count, len(PROCESS_TYPES), len(PROCESS_SENSORS))
+        self.mean = np.full(shape, np.nan)
+        self.var = np.zeros(shape)
+        self.weight = np.zeros(shape)   # 분산 추정 누적 가중치 1 - Π(1 - gain)
+        self.zscore = np.full(shape, np.nan)
+        self.last_values = np.full(shape, np.nan)
+        self.last_time = np.full(shape, np.nan)
+        self.samples = np.zeros(shape, dtype=np.int64)
+
+        # 버킷 링: 슬롯 = 버킷 번호 % 버킷 수
+        self._bucket_min = np.full((window_buckets,) + shape, np.nan)
+        self._bucket_max = np.full((window_buckets,) + shape, np.nan)
+        self._bucket_id: Optional[int] = None
+
+        self.updates = 0
+        self.last_update: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, values: np.ndarray, timestamp=None):
+        """
+        측정값 스냅샷 (지, 공종, 센서) 하나로 모든 채널 갱신
+        timestamp: 스냅샷 시각 또는 채널별 시각 배열 (값과 같은 모양, 채널마다 다른 시각의 측정값을 한 번에 반영)
+        """
+        now = time.time() if timestamp is None else timestamp
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        per_channel = np.ndim(now) > 0
+        if per_channel:
+            now = np.asarray(now, dtype=np.float64)
+            if not valid.any():
+                return
+
+        with self._lock:
+            first = valid & (self.samples == 0)
+            seen = valid & ~first
+
+            # z-score는 갱신 전 분포 기준 (표본이 적거나 분산이 0이면 계산하지 않음)
+            std = self._std()
+            ready = seen & (self.samples >= self.min_samples) & (std > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                zscore = np.where(ready, (values - self.mean) / std, np.nan)
+            self.zscore = np.where(valid, zscore, self.zscore)
+
+            dt = np.maximum(now - self.last_time, 1e-3)
+            gain = np.where(seen, -np.expm1(-dt / self.mean_seconds), 0.0)
+            diff = np.where(seen, values - self.mean, 0.0)
+            increment = gain * diff
+            self.mean = np.where(first, values, self.mean + increment)
+            self.var = np.where(seen, (1 - gain) * (self.var + diff * increment), self.var)
+            self.weight += gain * (1 - self.weight)
+
+            self.last_values = np.where(valid, values, self.last_values)
+            self.last_time = np.where(valid, now, self.last_time)
+            self.samples += valid
+
+            if per_channel:
+                self._bucket_channels(values, now, valid)
+                now = float(now[valid].max())
+            else:
+                slot = self._advance(now)
+                np.fmin(self._bucket_min[slot], values, out=self._bucket_min[slot])
+                np.fmax(self._bucket_max[slot], values, out=self._bucket_max[slot])
+
+            self.updates += 1
+            self.last_update = now if self.last_update is None else max(self.last_update, now)
+
+    def _bucket_channels(self, values: np.ndarray, now: np.ndarray, valid: np.ndarray):
+        """채널별 시각의 측정값을 각자의 버킷에 반영 (가장 늦은 시각까지 링을 진행, 구간 밖 측정값은 제외)"""
+        self._advance(float(now[valid].max()))
+        buckets = np.minimum((np.where(valid, now, 0) // self.bucket_seconds).astype(np.int64), self._bucket_id)
+        keep = valid & (buckets > self._bucket_id - self.window_buckets)
+        index = (buckets[keep] % self.window_buckets,) + np.nonzero(keep)
+        self._bucket_min[index] = np.fmin(self._bucket_min[index], values[keep])
+        self._bucket_max[index] = np.fmax(self._bucket_max[index], values[keep])
+
+    def _std(self) -> np.ndarray:
+        """가중치 보정 EWMA 표준편차 (측정 1회 이하 채널은 0)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(np.where(self.weight > 0, self.var / self.weight, 0.0))
+
+    def _advance(self, now: float) -> int:
+        """현재 시각의 버킷 슬롯 (구간을 벗어난 슬롯은 비움)"""
+        bucket_id = int(now // self.bucket_seconds)
+        if self._bucket_id is None or bucket_id - self._bucket_id >= self.window_buckets:
+            self._bucket_min.fill(np.nan)
+            self._bucket_max.fill(np.nan)
+        elif bucket_id > self._bucket_id:
+            for expired in range(self._bucket_id + 1, bucket_id + 1):
+                self._bucket_min[expired % self.window_buckets] = np.nan
+                self._bucket_max[expired % self.window_buckets] = np.nan
+        if self._bucket_id is None or bucket_id > self._bucket_id:
+            self._bucket_id = bucket_id
+        # 시각이 거꾸로 온 측정값은 현재 버킷에 반영
+        return self._bucket_id % self.window_buckets
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """통계 배열 복사본 (지, 공종, 센서)"""
+        with self._lock:
+            return {
+                "value": self.last_values.copy(),
+                "mean": self.mean.copy(),
+                "std": self._std(),
+                "min": np.fmin.reduce(self._bucket_min, axis=0),
+                "max": np.fmax.reduce(self._bucket_max, axis=0),
+                "zscore": self.zscore.copy(),
+                "samples": self.samples.copy()
+            }
+
+    def zone_stats(self, snapshot: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """
+        지별 통계 (지 → 공종 → 센서 → 통계)
+        측정값이 한 번도 없는 채널(미설치 센서)은 제외 (측정된 채널만 순회)
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        observed = np.nonzero(snapshot["samples"] > 0)
+        columns = [np.round(snapshot[key][observed], 3).tolist() for key in ("mean", "std", "min", "max")]
+        zscore = [_optional(value) for value in np.round(snapshot["zscore"][observed], 2).tolist()]
+        z_indices, r_indices, s_indices = (axis.tolist() for axis in observed)
+
+        zones = [{} for _ in range(self.zone_count)]
+        for z_idx, r_idx, s_idx, mean, std, low, high, score in zip(z_indices, r_indices, s_indices, *columns, zscore):
+            zones[z_idx].setdefault(PROCESS_TYPES[r_idx], {})[PROCESS_SENSORS[s_idx]] = {
+                "mean": mean, "std": std, "min": low, "max": high, "zscore": score
+            }
+        return zones
+
+    def anomalies(self, snapshot: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """|z-score|가 기준 이상인 채널 (점수 큰 순)"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        zscore = snapshot["zscore"]
+        with np.errstate(invalid="ignore"):
+            flagged = np.argwhere(np.abs(zscore) >= self.zscore_alert)
+
+        results = []
+        for z_idx, r_idx, s_idx in flagged.tolist():
+            process_type, sensor = PROCESS_TYPES[r_idx], PROCESS_SENSORS[s_idx]
+            score = float(zscore[z_idx, r_idx, s_idx])
+            zone = self.topology.zone_labels[z_idx]
+            results.append({
+                "zone": zone,
+                "processType": process_type,
+                "sensor": sensor,
+                "label": f"{zone} {PROCESS_NAMES[process_type]} {SENSOR_LABELS[sensor]}",
+                "value": round(float(snapshot["value"][z_idx, r_idx, s_idx]), 3),
+                "mean": round(float(snapshot["mean"][z_idx, r_idx, s_idx]), 3),
+                "zscore": round(score, 2),
+                "direction": "up" if score > 0 else "down"
+            })
+            if self.topology.multi_plant:
+                results[-1]["plant"] = self.topology.plant_ids[self.topology.zone_plant[z_idx]]
+        results.sort(key=lambda item: abs(item["zscore"]), reverse=True)
+        return results
+
+    def summary(self) -> Dict:
+        """전체 통계 현황 (/api/monitoring/stats)"""
+        snapshot = self.snapshot()
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "lastUpdate": datetime.fromtimestamp(self.last_update).isoformat() if self.last_update else None,
+            "updates": self.updates,
+            "config": {
+                "ewmaSeconds": self.mean_seconds,
+                "windowSeconds": self.window_seconds,
+                "windowBuckets": self.window_buckets,
+                "zscoreAlert": self.zscore_alert,
+                "minSamples": self.min_samples
+            },
+            "zones": [
+                {"zone": self.topology.zone_labels[z_idx], **stats}
+                for z_idx, stats in enumerate(self.zone_stats(snapshot))
+            ],
+            "anomalies": self.anomalies(snapshot)
+        }
+
+
+def _optional(value: float) -> Optional[float]:
+    """NaN(분산 추정 전)을 None으로 변환"""
+    return None if value != value else value
+
+
+# 전역 인스턴스
+rolling_stats = RollingStats(
+    topology=plant_topology,
+    mean_seconds=settings.STATS_EWMA_SECONDS,
+    window_seconds=settings.STATS_WINDOW_SECONDS,
+    window_buckets=settings.STATS_WINDOW_BUCKETS,
+    zscore_alert=settings.STATS_ZSCORE_ALERT,
+    min_samples=settings.STATS_MIN_SAMPLES
+)
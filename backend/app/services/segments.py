@@ -0,0 +1,502 @@
+"""
+압축 시계열 세그먼트 파일 (수집 측정값 장기 보관)
+기간(SEGMENT_SECONDS) 단위로 봉인한 측정값을 채널별 블록으로 압축하여 저장하고, 읽을 때는 파일을 메모리 매핑
+- 시각: ms 단위 delta-of-delta (일정 간격이면 측정값당 2비트)
+- 값: Gorilla 방식 XOR 부동소수점 인코딩 (직전 값과 XOR → 0이면 2비트, 아니면 의미 있는 비트 구간만 기록)
+- 제어 코드/창(window)/가변 길이 비트를 별도 스트림으로 나누어 기록
+  → 원소별 비트 위치를 누적합으로 구할 수 있어 디코딩이 NumPy 벡터 연산 (Python 반복 없음)
+- 파일 머리말과 블록 머리말(채널, 개수, 시각/값 최소·최대)을 파일 앞에 모아 두어
+  범위 조회는 머리말만 보고 세그먼트/블록 단위로 건너뜀
+
+파일 구성:
+    [파일 머리말 FILE_HEADER] [블록 머리말 BLOCK_HEADER × 블록 수] [블록 본문 ...]
+    블록 본문 = 시각 스트림 (제어 2비트 × n, 가변 비트) + 값 스트림 (제어 2비트 × n, 창 11비트 × 새 창 수, 가변 비트)
+"""
+import mmap
+import os
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+
+
+MAGIC = b"ICSG"
+FORMAT_VERSION = 1
+
+# 블록당 최대 측정값 수 (블록 = 한 채널의 연속 구간, 블록이 작을수록 범위 조회 건너뛰기 단위가 세밀)
+BLOCK_POINTS = 4096
+
+FILE_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("reserved", "<u2"),
+    ("blocks", "<u4"),
+    ("span", "<u4"),          # 세그먼트 기간 (초)
+    ("start", "<i8"),         # 세그먼트 시작 (epoch 초)
+    ("t_min", "<i8"),         # ms
+    ("t_max", "<i8"),
+    ("rows", "<u8"),
+])
+
+BLOCK_HEADER = np.dtype([
+    ("zone", "<i4"),          # 0부터 시작하는 지 인덱스
+    ("reactor", "u1"),        # PROCESS_TYPES 인덱스
+    ("sensor", "u1"),         # PROCESS_SENSORS 인덱스
+    ("reserved", "<u2"),
+    ("count", "<u4"),
+    ("t_min", "<i8"),         # ms
+    ("t_max", "<i8"),
+    ("v_min", "<f8"),
+    ("v_max", "<f8"),
+    ("offset", "<u8"),        # 파일 내 블록 본문 위치
+    ("t_bytes", "<u4"),       # 시각 스트림 크기
+    ("v_bytes", "<u4"),       # 값 스트림 크기
+    ("windows", "<u4"),       # 값 스트림의 새 창 수
+])
+
+# delta-of-delta 제어 코드별 비트 수 (zigzag 부호화 값 기준)
+DOD_BITS = np.array([0, 12, 32, 64])
+
+# XOR 제어 코드: 같은 값 / 직전 창 재사용 / 새 창
+XOR_SAME, XOR_REUSE, XOR_NEW = 0, 1, 2
+WINDOW_BITS = 11              # 앞쪽 0 개수 5비트 + 의미 있는 비트 길이 6비트 (Gorilla와 같음)
+
+_U64 = np.uint64
+_SHIFT_56 = np.arange(56, -1, -8, dtype=np.uint64)
+
+
+class SegmentRows(NamedTuple):
+    """세그먼트 측정값 (열 단위 배열, 같은 길이)"""
+    timestamp: np.ndarray   # float64, epoch 초 (ms 단위로 저장)
+    zone: np.ndarray        # int64
+    reactor: np.ndarray     # int64
+    sensor: np.ndarray      # int64
+    value: np.ndarray       # float64
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @classmethod
+    def concat(cls, parts: Sequence["SegmentRows"]) -> "SegmentRows":
+        if not parts:
+            return cls(*(np.zeros(0, dtype=dtype) for dtype in (np.float64, np.int64, np.int64, np.int64, np.float64)))
+        return cls(*(np.concatenate(column) for column in zip(*parts)))
+
+
+# ---------------------------------------------------------------------------
+# 비트 스트림
+
+def _pack_bits(values: np.ndarray, lengths: np.ndarray) -> bytes:
+    """각 값의 하위 lengths 비트를 순서대로 이어 붙인 바이트열 (MSB 우선)"""
+    lengths = lengths.astype(np.int64)
+    total = int(lengths.sum())
+    if not total:
+        return b""
+    owner = np.repeat(np.arange(len(values)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    position = np.arange(total) - starts[owner]
+    shift = (lengths[owner] - 1 - position).astype(np.uint64)
+    bits = (values.astype(np.uint64)[owner] >> shift) & _U64(1)
+    return np.packbits(bits.astype(np.uint8)).tobytes()
+
+
+def _unpack_bits(buffer: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """_pack_bits의 역변환 (원소별 비트 위치 = 길이 누적합 → 벡터 추출)"""
+    lengths = lengths.astype(np.int64)
+    result = np.zeros(len(lengths), dtype=np.uint64)
+    present = lengths > 0
+    if not present.any():
+        return result
+
+    offsets = (np.cumsum(lengths) - lengths)[present]
+    length = lengths[present].astype(np.uint64)
+    padded = np.concatenate([buffer, np.zeros(9, dtype=np.uint8)])
+    first = offsets // 8
+    window = padded[first[:, None] + np.arange(9)].astype(np.uint64)
+
+    # 64비트 단어 + 다음 1바이트에서 비트 위치만큼 왼쪽으로 맞춘 뒤 상위 length 비트
+    shift = (offsets % 8).astype(np.uint64)
+    word = np.bitwise_or.reduce(window[:, :8] << _SHIFT_56, axis=1)
+    carry = np.where(shift > 0, window[:, 8] >> (_U64(8) - shift), _U64(0))
+    aligned = (word << shift) | carry
+    result[present] = np.where(length == 64, aligned, aligned >> (_U64(64) - length))
+    return result
+
+
+def _pack_codes(codes: np.ndarray) -> bytes:
+    """2비트 제어 코드 → 바이트당 4개"""
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] << 6 | quads[:, 1] << 4 | quads[:, 2] << 2 | quads[:, 3]).astype(np.uint8).tobytes()
+
+
+def _unpack_codes(buffer: np.ndarray, count: int) -> np.ndarray:
+    shifts = np.array([6, 4, 2, 0], dtype=np.uint8)
+    return ((buffer[:, None] >> shifts) & 3).reshape(-1)[:count]
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """uint64 배열의 비트 길이 (0이면 0)"""
+    high = (values >> _U64(32)).astype(np.float64)
+    low = (values & _U64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1]).astype(np.int64)
+
+
+def _trailing_zeros(values: np.ndarray) -> np.ndarray:
+    """uint64 배열의 하위 0 비트 수 (0이면 64)"""
+    lowest = values & (~values + _U64(1))
+    return np.where(values == 0, 64, _bit_length(lowest) - 1)
+
+
+# ---------------------------------------------------------------------------
+# 시각: delta-of-delta
+
+def encode_timestamps(ms: np.ndarray) -> bytes:
+    """정렬된 ms 시각 → 제어 코드 + 가변 비트 (첫 시각은 블록 머리말 t_min)"""
+    delta = np.diff(ms, prepend=ms[:1])
+    dod = np.diff(delta, prepend=0)
+    zigzag = ((dod << 1) ^ (dod >> 63)).astype(np.uint64)
+    codes = np.searchsorted(
+        np.array([0, (1 << 12) - 1, (1 << 32) - 1], dtype=np.uint64), zigzag, side="left"
+    ).astype(np.uint8)
+    return _pack_codes(codes) + _pack_bits(zigzag, DOD_BITS[codes])
+
+
+def decode_timestamps(buffer: np.ndarray, count: int, first: int) -> np.ndarray:
+    code_bytes = -(-count // 4)
+    codes = _unpack_codes(buffer[:code_bytes], count)
+    zigzag = _unpack_bits(buffer[code_bytes:], DOD_BITS[codes])
+    dod = (zigzag >> _U64(1)).astype(np.int64) ^ -(zigzag & _U64(1)).astype(np.int64)
+    return first + np.cumsum(np.cumsum(dod))
+
+
+# ---------------------------------------------------------------------------
+# 값: Gorilla XOR
+
+def encode_values(values: np.ndarray) -> tuple:
+    """
+    float64 배열 → (바이트열, 새 창 수)
+    직전 창(앞쪽 0 개수, 의미 있는 비트 길이) 안에 들어가면 재사용, 아니면 새 창 기록
+    창 재사용 판단은 직전 창에 의존하므로 0이 아닌 XOR 원소만 순회 (봉인 시 1회)
+    """
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64)
+    xor = bits ^ np.concatenate([np.zeros(1, dtype=np.uint64), bits[:-1]])
+    leading = np.minimum(64 - _bit_length(xor), 31)
+    trailing = _trailing_zeros(xor)
+
+    codes = np.zeros(len(xor), dtype=np.uint8)
+    lengths = np.zeros(len(xor), dtype=np.int64)
+    shifts = np.zeros(len(xor), dtype=np.uint64)
+    windows = []
+    window_lead, window_trail = -1, -1
+    for idx, lead, trail in zip(np.flatnonzero(xor).tolist(), leading[xor != 0].tolist(), trailing[xor != 0].tolist()):
+        if window_lead >= 0 and lead >= window_lead and trail >= window_trail:
+            codes[idx] = XOR_REUSE
+        else:
+            codes[idx] = XOR_NEW
+            window_lead, window_trail = lead, trail
+            windows.append((lead << 6) | (64 - lead - trail - 1))
+        lengths[idx] = 64 - window_lead - window_trail
+        shifts[idx] = window_trail
+
+    packed_windows = _pack_bits(np.array(windows, dtype=np.uint64), np.full(len(windows), WINDOW_BITS))
+    payload = _pack_bits(xor >> shifts, lengths)
+    return _pack_codes(codes) + packed_windows + payload, len(windows)
+
+
+def decode_values(buffer: np.ndarray, count: int, windows: int) -> np.ndarray:
+    code_bytes = -(-count // 4)
+    window_bytes = -(-windows * WINDOW_BITS // 8)
+    codes = _unpack_codes(buffer[:code_bytes], count)
+    window = _unpack_bits(buffer[code_bytes:code_bytes + window_bytes], np.full(windows, WINDOW_BITS)).astype(np.int64)
+
+    # 원소별 창 = 직전 새 창 (누적 개수로 인덱스)
+    current = np.maximum(np.cumsum(codes == XOR_NEW) - 1, 0)
+    lead = (window >> 6)[current] if windows else np.zeros(count, dtype=np.int64)
+    length = ((window & 63) + 1)[current] if windows else np.zeros(count, dtype=np.int64)
+    length = np.where(codes == XOR_SAME, 0, length)
+
+    meaningful = _unpack_bits(buffer[code_bytes + window_bytes:], length)
+    shift = np.where(codes == XOR_SAME, 0, 64 - lead - length).astype(np.uint64)
+    xor = meaningful << shift
+    return np.bitwise_xor.accumulate(xor).view(np.float64)
+
+
+# ---------------------------------------------------------------------------
+# 세그먼트 파일
+
+def write_segment(path: str, start: int, span: int, rows: SegmentRows):
+    """측정값 → 세그먼트 파일 (임시 파일에 기록 후 fsync, 이름 바꾸기로 원자적 교체)"""
+    ms = np.round(rows.timestamp * 1000).astype(np.int64)
+    order = np.lexsort((ms, rows.sensor, rows.reactor, rows.zone))
+    ms, value = ms[order], rows.value[order]
+    zone, reactor, sensor = rows.zone[order], rows.reactor[order], rows.sensor[order]
+
+    # 채널이 바뀌거나 BLOCK_POINTS마다 블록 분할
+    change = np.flatnonzero((np.diff(zone) != 0) | (np.diff(reactor) != 0) | (np.diff(sensor) != 0)) + 1
+    bounds = []
+    for begin, end in zip(np.concatenate([[0], change]).tolist(), np.concatenate([change, [len(ms)]]).tolist()):
+        bounds += [(b, min(b + BLOCK_POINTS, end)) for b in range(begin, end, BLOCK_POINTS)]
+
+    headers = np.zeros(len(bounds), dtype=BLOCK_HEADER)
+    bodies = []
+    offset = FILE_HEADER.itemsize + BLOCK_HEADER.itemsize * len(bounds)
+    for idx, (begin, end) in enumerate(bounds):
+        t_stream = encode_timestamps(ms[begin:end])
+        v_stream, windows = encode_values(value[begin:end])
+        headers[idx] = (
+            zone[begin], reactor[begin], sensor[begin], 0, end - begin,
+            ms[begin], ms[end - 1], value[begin:end].min(), value[begin:end].max(),
+            offset, len(t_stream), len(v_stream), windows
+        )
+        bodies += [t_stream, v_stream]
+        offset += len(t_stream) + len(v_stream)
+
+    file_header = np.zeros(1, dtype=FILE_HEADER)
+    file_header[0] = (
+        MAGIC, FORMAT_VERSION, 0, len(bounds), span, start,
+        ms.min() if len(ms) else 0, ms.max() if len(ms) else 0, len(ms)
+    )
+
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(file_header.tobytes())
+        f.write(headers.tobytes())
+        for body in bodies:
+            f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+def _unique_rows(rows: SegmentRows) -> SegmentRows:
+    """중복 측정값 제거 (ms 시각, 채널, 값이 모두 같은 행)"""
+    stacked = np.unique(np.column_stack([
+        np.round(rows.timestamp * 1000), rows.zone, rows.reactor, rows.sensor, rows.value
+    ]), axis=0)
+    return SegmentRows(stacked[:, 0] / 1000.0, *(stacked[:, col].astype(np.int64) for col in (1, 2, 3)), stacked[:, 4])
+
+
+class Segment:
+    """봉인된 세그먼트 (읽기 전용 메모리 매핑, 머리말은 매핑 위의 배열 뷰)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = np.frombuffer(self._map, dtype=np.uint8)
+        self.header = np.frombuffer(self._map, dtype=FILE_HEADER, count=1)[0]
+        if self.header["magic"] != MAGIC or self.header["version"] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"세그먼트 파일 형식이 아닙니다: {path}")
+        self.blocks = np.frombuffer(
+            self._map, dtype=BLOCK_HEADER, count=int(self.header["blocks"]), offset=FILE_HEADER.itemsize
+        )
+        self.start = int(self.header["start"])
+        self.t_min = int(self.header["t_min"])
+        self.t_max = int(self.header["t_max"])
+        self.rows = int(self.header["rows"])
+
+    def close(self):
+        """매핑 해제 (디코딩 중인 배열 뷰가 남아 있으면 해당 배열이 사라질 때 해제)"""
+        self.buffer = self.header = self.blocks = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def select(self, start_ms: int, end_ms: int, channels: Optional[np.ndarray] = None,
+               value_range: Optional[tuple] = None) -> np.ndarray:
+        """머리말만으로 조건에 맞을 수 있는 블록 인덱스 선택 (시각 구간, 채널 마스크, 값 범위)"""
+        blocks = self.blocks
+        mask = (blocks["t_max"] >= start_ms) & (blocks["t_min"] < end_ms)
+        if channels is not None:
+            # 현재 구성에 없는 지(구성 변경 전 봉인)의 블록은 제외
+            known = blocks["zone"] < channels.shape[0]
+            zone = np.where(known, blocks["zone"], 0)
+            mask &= known & channels[zone, blocks["reactor"], blocks["sensor"]]
+        if value_range is not None:
+            low, high = value_range
+            mask &= (blocks["v_max"] >= low) & (blocks["v_min"] <= high)
+        return np.flatnonzero(mask)
+
+    def read(self, indices: np.ndarray, start_ms: int, end_ms: int) -> SegmentRows:
+        """선택한 블록 디코딩 후 [start_ms, end_ms) 구간만 반환"""
+        parts = []
+        for block in self.blocks[indices]:
+            count, offset, t_bytes = int(block["count"]), int(block["offset"]), int(block["t_bytes"])
+            ms = decode_timestamps(self.buffer[offset:offset + t_bytes], count, int(block["t_min"]))
+            inside = (ms >= start_ms) & (ms < end_ms)
+            if not inside.any():
+                continue
+            values = decode_values(
+                self.buffer[offset + t_bytes:offset + t_bytes + int(block["v_bytes"])], count, int(block["windows"])
+            )
+            size = int(inside.sum())
+            parts.append(SegmentRows(
+                ms[inside] / 1000.0,
+                np.full(size, block["zone"], dtype=np.int64),
+                np.full(size, block["reactor"], dtype=np.int64),
+                np.full(size, block["sensor"], dtype=np.int64),
+                values[inside]
+            ))
+        return SegmentRows.concat(parts)
+
+    def read_all(self) -> SegmentRows:
+        return self.read(np.arange(len(self.blocks)), self.t_min, self.t_max + 1)
+
+
+class SegmentStore:
+    """세그먼트 디렉터리 (파일 이름 = 세그먼트 시작 epoch 초, 열린 세그먼트는 매핑 유지)"""
+
+    def __init__(self, directory: str, span_seconds: int):
+        self.directory = directory
+        self.span = span_seconds
+        self._segments: Dict[int, Segment] = {}
+        self._lock = threading.Lock()
+
+        self.queries = 0
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+
+    def open(self):
+        """디렉터리의 봉인된 세그먼트 매핑 (앱 시작 시 호출, 남은 임시 파일은 삭제)"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for name in sorted(os.listdir(self.directory)):
+                path = os.path.join(self.directory, name)
+                if name.endswith((".seg.tmp", ".seg.merge", ".seg.merge.tmp")):
+                    os.remove(path)
+                elif name.endswith(".seg") and name[:-4].isdigit() and int(name[:-4]) not in self._segments:
+                    self._segments[int(name[:-4])] = Segment(path)
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments = {}
+
+    def span_start(self, timestamp: float) -> int:
+        """시각이 속한 세그먼트 시작 (epoch 초, 기간 단위로 정렬)"""
+        return int(timestamp // self.span) * self.span
+
+    def _path(self, start: int) -> str:
+        return os.path.join(self.directory, f"{start}.seg")
+
+    def seal(self, start: int, rows: SegmentRows):
+        """
+        한 기간의 측정값을 세그먼트로 봉인
+        같은 기간 세그먼트가 이미 있으면(이전 봉인 후 원본 삭제 전에 중단된 경우 등) 합쳐서 다시 쓰고 중복 행은 제거
+        """
+        with self._lock:
+            existing = self._segments.pop(start, None)
+        if existing is not None:
+            rows = _unique_rows(SegmentRows.concat([existing.read_all(), rows]))
+            existing.close()
+
+        path = self._path(start)
+        write_segment(path, start, self.span, rows)
+        with self._lock:
+            self._segments[start] = Segment(path)
+
+    def query(self, start: float, end: float, channels: Optional[np.ndarray] = None,
+              value_range: Optional[tuple] = None) -> SegmentRows:
+        """[start, end) 구간 측정값 (세그먼트 → 블록 머리말 순으로 건너뛰고 필요한 블록만 디코딩)"""
+        start_ms, end_ms = int(np.floor(start * 1000)), int(np.ceil(end * 1000))
+        with self._lock:
+            segments = [
+                segment for seg_start, segment in sorted(self._segments.items())
+                if segment.t_max >= start_ms and segment.t_min < end_ms
+            ]
+            parts = []
+            for segment in segments:
+                indices = segment.select(start_ms, end_ms, channels, value_range)
+                self.blocks_read += len(indices)
+                self.blocks_skipped += len(segment.blocks) - len(indices)
+                parts.append(segment.read(indices, start_ms, end_ms))
+        self.queries += 1
+        rows = SegmentRows.concat(parts)
+        order = np.argsort(rows.timestamp, kind="stable")
+        return SegmentRows(*(column[order] for column in rows))
+
+    def list(self) -> List[Segment]:
+        """봉인된 세그먼트 (시작 시각순)"""
+        with self._lock:
+            return [self._segments[start] for start in sorted(self._segments)]
+
+    def get(self, start: int) -> Optional[Segment]:
+        with self._lock:
+            return self._segments.get(start)
+
+    def drop(self, start: int) -> int:
+        """세그먼트 파일 삭제 (삭제한 바이트 수)"""
+        with self._lock:
+            segment = self._segments.pop(start, None)
+        if segment is None:
+            return 0
+        segment.close()
+        os.remove(segment.path)
+        return segment.size
+
+    def merge(self, starts: Sequence[int], start: int, span: int,
+              pace: Optional[Callable[[int], None]] = None) -> int:
+        """
+        연속된 세그먼트 여러 개를 기간 span의 세그먼트 하나로 병합 (파일 수/매핑 수 감소, 블록 채움률 향상)
+        새 파일을 먼저 쓴 뒤 원본을 지우므로 중간에 중단되어도 측정값은 남음 (다음 병합 시 중복 제거)
+        pace: 원본 파일 1개를 읽을 때마다, 병합 파일을 쓴 뒤 처리 바이트 수로 호출 (처리량 제한)
+        병합한 원본 바이트 수 반환
+        """
+        segments = [segment for segment in (self.get(item) for item in starts) if segment is not None]
+        if len(segments) < 2:
+            return 0
+        parts = []
+        for segment in segments:
+            parts.append(segment.read_all())
+            if pace is not None:
+                pace(segment.size)
+        rows = _unique_rows(SegmentRows.concat(parts))
+        path = self._path(start)
+        write_segment(path + ".merge", start, span, rows)
+        if pace is not None:
+            pace(os.path.getsize(path + ".merge"))
+
+        with self._lock:
+            for segment in segments:
+                self._segments.pop(segment.start, None)
+                segment.close()
+            os.replace(path + ".merge", path)
+            for segment in segments:
+                if segment.path != path:
+                    os.remove(segment.path)
+            self._segments[start] = Segment(path)
+        return sum(segment.size for segment in segments)
+
+    def stats(self) -> Dict:
+        """세그먼트 현황 (압축률 = 측정값 16바이트(시각 8 + 값 8) 대비 파일 크기)"""
+        with self._lock:
+            segments = list(self._segments.values())
+        rows = sum(segment.rows for segment in segments)
+        size = sum(segment.size for segment in segments)
+        return {
+            "directory": self.directory,
+            "spanSeconds": self.span,
+            "segments": len(segments),
+            "rows": rows,
+            "bytes": size,
+            "bytesPerReading": round(size / rows, 3) if rows else None,
+            "compressionRatio": round(rows * 16 / size, 2) if size else None,
+            "queries": self.queries,
+            "blocksRead": self.blocks_read,
+            "blocksSkipped": self.blocks_skipped
+        }
+
+
+# 전역 인스턴스
+segment_store = SegmentStore(
+    directory=settings.SEGMENT_PATH,
+    span_seconds=settings.SEGMENT_SECONDS
+)
@@ -0,0 +1,233 @@
+"""
+시간 상관 모의 데이터 시뮬레이션 엔진
+채널별 값 = 기준값 + 편차 × (지별 오프셋 + AR(1) 변동 + 일 주기 부하 반응 + 부하 충격 + 측정 잡음)
+- AR(1) 변동: 연속 시간 AR(1)(OU 과정)과 같은 자기상관 exp(-|Δt|/τ)를 갖는 무작위 푸리에 특징의 합
+  → 직전 상태 없이 임의 시각의 값을 O(1)로 계산 (이력 구간 어디로든 바로 건너뛰어 필요한 블록만 생성)
+- 일 주기 부하: 새벽 최저, 오전·저녁 정점의 유입 부하 곡선 (로컬 시각 기준)
+- 부하 충격: 하루 단위로 확률적으로 발생하는 강우/유입 부하 급증 (수 시간 동안 완만히 상승 후 회복)
+- 모든 난수는 (시드, 채널, 용도, 시점) 해시로 생성 → 같은 시드·같은 시각이면 조회 경로와 무관하게 항상 같은 값
+- 시점 × 채널 배열로 한 번에 계산 (채널별 Python 반복 없음)
+"""
+import math
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from app.config import settings
+
+
+# 시뮬레이션 기준 시각 (2024-01-01 00:00 UTC, 위상 계산 정밀도 및 적산값 기준)
+EPOCH = 1704067200.0
+
+# 일 주기 부하 곡선 (하루당 주기 수, 진폭, 정점 시각)
+DIURNAL_HARMONICS = ((1, 0.7, 13.0), (2, 0.45, 10.0))
+
+# 부하 충격 지속 시간 (최소, 최대, 초)
+SHOCK_DURATION = (7200.0, 21600.0)
+
+# AR(1) 변동 특징의 최대 각주파수 (rad/s, 1초 측정 간격의 나이퀴스트 주파수)
+MAX_OMEGA = math.pi
+
+# 특징 계산 시 한 번에 만드는 (시점 × 채널 × 특징) 원소 수 (메모리 상한)
+CHUNK_ELEMENTS = 1 << 21
+
+# 난수 용도 구분
+STREAM_FREQUENCY = 1
+STREAM_PHASE = 2
+STREAM_OFFSET = 3
+STREAM_NOISE = 4
+STREAM_SHOCK = 5
+STREAM_FORECAST = 6
+STREAM_ZONE = 7
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 비트 섞기 (uint64 배열, 자리 넘침은 의도된 동작)"""
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def _hash(seed: int, *keys) -> np.ndarray:
+    """시드와 키(정수 또는 정수 배열, 브로드캐스트) → 64비트 해시 배열"""
+    value = _mix(np.atleast_1d(np.uint64(seed & 0xFFFFFFFFFFFFFFFF)))
+    for key in keys:
+        value = _mix(value ^ np.asarray(key).astype(np.uint64))
+    return value
+
+
+def _uniform(hashed: np.ndarray) -> np.ndarray:
+    """해시 → [0, 1) 균등 분포"""
+    return (hashed >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _normal(hashed: np.ndarray) -> np.ndarray:
+    """해시 → 표준 정규 분포 (Box-Muller)"""
+    u1 = _uniform(_mix(hashed ^ np.uint64(1)))
+    u2 = _uniform(_mix(hashed ^ np.uint64(2)))
+    return np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2.0 * math.pi * u2)
+
+
+class SimulationChannels(NamedTuple):
+    """채널 묶음의 시뮬레이션 파라미터 (모든 배열의 첫 축 = 채널)"""
+    ids: np.ndarray        # 채널 고유 번호 (난수 키, 채널 구성이 바뀌어도 같은 번호면 같은 값)
+    mean: np.ndarray       # 기준값
+    spread: np.ndarray     # 편차 단위 (표준편차)
+    offset: np.ndarray     # 채널별 기준값 오프셋 (편차 단위)
+    diurnal: np.ndarray    # 일 주기 부하 반응 (편차 단위, 음수면 부하가 높을 때 감소)
+    shock: np.ndarray      # 부하 충격 반응 (편차 단위)
+    noise: np.ndarray      # 측정 잡음 (편차 단위)
+    lag: np.ndarray        # 부하 반응 지연 (초)
+    omega: np.ndarray      # (채널, 특징) 각주파수
+    phase: np.ndarray      # (채널, 특징) 위상
+
+    def take(self, index) -> "SimulationChannels":
+        """일부 채널만 선택"""
+        return SimulationChannels(*(np.asarray(field)[index] for field in self))
+
+
+class SimulationEngine:
+    """시드 고정 시간 상관 시뮬레이션 엔진"""
+
+    def __init__(self, seed: int, features: int, event_rate: float, utc_offset: float):
+        self.seed = seed
+        self.features = features
+        self.event_rate = event_rate
+        self.utc_offset = utc_offset
+
+    def channels(
+        self,
+        ids,
+        mean,
+        spread,
+        tau,
+        diurnal=0.0,
+        shock=0.0,
+        noise=0.0,
+        lag=0.0,
+        offset: float = 0.0
+    ) -> SimulationChannels:
+        """
+        채널 묶음 생성 (인자는 채널 수 길이 배열 또는 스칼라)
+        tau: AR(1) 변동 시정수 (초), offset: 채널별 기준값 오프셋의 표준편차 (편차 단위)
+        """
+        ids = np.asarray(ids, dtype=np.uint64)
+        count = len(ids)
+
+        def column(value) -> np.ndarray:
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (count,)).copy()
+
+        # OU 과정의 스펙트럼(코시 분포)에서 특징 주파수를 뽑으면 특징 합의 자기상관 = exp(-|Δt|/τ)
+        feature = np.arange(self.features, dtype=np.uint64)
+        u = _uniform(_hash(self.seed, STREAM_FREQUENCY, ids[:, None], feature[None, :]))
+        omega = np.tan(math.pi * (u - 0.5)) / column(tau)[:, None]
+        omega = np.clip(omega, -MAX_OMEGA, MAX_OMEGA)
+        phase = 2.0 * math.pi * _uniform(_hash(self.seed, STREAM_PHASE, ids[:, None], feature[None, :]))
+
+        return SimulationChannels(
+            ids=ids,
+            mean=column(mean),
+            spread=column(spread),
+            offset=offset * _normal(_hash(self.seed, STREAM_OFFSET, ids)),
+            diurnal=column(diurnal),
+            shock=column(shock),
+            noise=column(noise),
+            lag=column(lag),
+            omega=omega,
+            phase=phase
+        )
+
+    def sample(self, channels: SimulationChannels, times) -> np.ndarray:
+        """
+        시각 배열 (Unix 초) → (시점, 채널) 값
+        각 시점은 독립적으로 계산되므로 시각 순서/간격 제한 없음
+        """
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        values = np.empty((len(times), len(channels.ids)))
+        if not values.size:
+            return values
+
+        # AR(1) 변동 (특징 배열이 메모리 상한을 넘지 않도록 시점을 나누어 계산)
+        relative = times - EPOCH
+        scale = math.sqrt(2.0 / self.features)
+        step = max(1, CHUNK_ELEMENTS // max(1, channels.omega.size))
+        for start in range(0, len(times), step):
+            chunk = relative[start:start + step, None, None]
+            values[start:start + step] = np.cos(chunk * channels.omega + channels.phase).sum(axis=2) * scale
+
+        # 부하 반응 (채널별 지연 적용)
+        lagged = times[:, None] - channels.lag
+        values += channels.diurnal * self.load(lagged)
+        values += channels.shock * self.shock(lagged)
+
+        # 측정 잡음 (1초 단위로 고정)
+        seconds = np.floor(times).astype(np.int64)
+        values += channels.noise * _normal(_hash(self.seed, STREAM_NOISE, channels.ids[None, :], seconds[:, None]))
+
+        values += channels.offset
+        return channels.mean + channels.spread * values
+
+    def load(self, times) -> np.ndarray:
+        """일 주기 부하 (로컬 시각 기준, 평균 0, 대략 -1 ~ 1)"""
+        local = np.asarray(times, dtype=np.float64) + self.utc_offset
+        result = np.zeros_like(local)
+        for cycles, amplitude, peak in DIURNAL_HARMONICS:
+            result += amplitude * np.cos(2.0 * math.pi * cycles * (local / 86400.0 - peak / 24.0))
+        return result
+
+    def load_integral(self, times) -> np.ndarray:
+        """EPOCH부터 times까지 일 주기 부하의 적분 (초 단위, 적산값 계산용)"""
+        times = np.asarray(times, dtype=np.float64)
+        result = np.zeros_like(times)
+        for cycles, amplitude, peak in DIURNAL_HARMONICS:
+            omega = 2.0 * math.pi * cycles / 86400.0
+            shift = 2.0 * math.pi * cycles * peak / 24.0
+            result += amplitude / omega * (
+                np.sin(omega * (times + self.utc_offset) - shift) - np.sin(omega * (EPOCH + self.utc_offset) - shift)
+            )
+        return result
+
+    def shock(self, times) -> np.ndarray:
+        """
+        부하 충격 강도 (0 ~ 약 1.3)
+        하루마다 event_rate 확률로 충격 1회 (시작 시각, 지속 시간, 크기는 날짜 해시로 결정)
+        전날 시작한 충격이 자정을 넘길 수 있으므로 당일과 전날만 확인 → 시각당 O(1)
+        """
+        local = np.asarray(times, dtype=np.float64) + self.utc_offset
+        today = np.floor(local / 86400.0).astype(np.int64)
+        result = np.zeros_like(local)
+        for day in (today, today - 1):
+            hashed = _hash(self.seed, STREAM_SHOCK, day)
+            occurs = _uniform(_mix(hashed ^ np.uint64(1))) < self.event_rate
+            start = (day + _uniform(_mix(hashed ^ np.uint64(2)))) * 86400.0
+            duration = SHOCK_DURATION[0] + (SHOCK_DURATION[1] - SHOCK_DURATION[0]) * _uniform(_mix(hashed ^ np.uint64(3)))
+            magnitude = 0.7 + 0.6 * _uniform(_mix(hashed ^ np.uint64(4)))
+            progress = (local - start) / duration
+            active = occurs & (progress >= 0) & (progress <= 1)
+            result += np.where(active, magnitude * 0.5 * (1.0 - np.cos(2.0 * math.pi * progress)), 0.0)
+        return result
+
+    def uniform(self, stream: int, key, times) -> np.ndarray:
+        """(용도, 키, 시각) 고정 균등 난수 [0, 1) (시각은 1초 단위)"""
+        seconds = np.floor(np.asarray(times, dtype=np.float64)).astype(np.int64)
+        return _uniform(_hash(self.seed, stream, key, seconds))
+
+    def normal(self, stream: int, key, times) -> np.ndarray:
+        """(용도, 키, 시각) 고정 표준 정규 난수 (시각은 1초 단위)"""
+        seconds = np.floor(np.asarray(times, dtype=np.float64)).astype(np.int64)
+        return _normal(_hash(self.seed, stream, key, seconds))
+
+
+# 전역 인스턴스
+simulation_engine = SimulationEngine(
+    seed=settings.SIMULATION_SEED,
+    features=settings.SIMULATION_FEATURES,
+    event_rate=settings.SIMULATION_EVENT_RATE,
+    utc_offset=time.localtime().tm_gmtoff
+)
@@ -0,0 +1,63 @@
+"""
+동일 요청 병합 (single-flight)
+같은 키로 동시에 들어온 요청은 진행 중인 하나의 계산 결과를 함께 기다림
+완료된 결과는 보관하지 않으므로 데이터 지연(staleness)이 생기지 않음
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def request_key(name: str, request: BaseModel, exclude: Iterable[str] = ()) -> str:
+    """요청 모델을 정규화한 키 생성 (필드 순서와 무관)"""
+    payload = request.model_dump(mode="json", exclude=set(exclude))
+    return f"{name}:{json.dumps(payload, sort_keys=True, ensure_ascii=False)}"
+
+
+class SingleFlight:
+    """진행 중인 계산을 키별로 공유"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, name: str, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        key로 진행 중인 계산이 있으면 그 결과를 기다리고, 없으면 fn을 실행
+        계산은 별도 Task로 실행하므로 처음 요청한 클라이언트가 끊겨도 대기 중인 요청은 결과를 받음
+        """
+        stats = self._stats.setdefault(name, {"requests": 0, "executions": 0, "coalesced": 0})
+        stats["requests"] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            stats["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """완료된 계산 제거 (대기자가 모두 취소된 경우의 예외도 회수)"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        """경로별 요청/실행/병합 횟수"""
+        return {
+            "inflight": len(self._inflight),
+            "paths": {name: dict(values) for name, values in self._stats.items()}
+        }
+
+
+# 전역 인스턴스 (이력/집계/내보내기 공용)
+query_flight = SingleFlight()
@@ -0,0 +1,105 @@
+"""
+임계값 평가 엔진
+공종/방류 임계값을 하한·상한 NumPy 배열로 컴파일하여
+실시간 스냅샷과 이력 블록을 한 번의 벡터 비교로 평가
+- 공종: (지, 공종, 센서) 배열, 임계값이 없는 칸은 NaN (항상 정상)
+- 방류: (파라미터,) 배열, 상한만 적용 (방류 기준은 하한 없음)
+- 측정값이 NaN(센서 미설치)이면 정상
+- 임계값 내용이 바뀐 경우에만 재컴파일
+"""
+import json
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.services.topology import PROCESS_SENSORS, PROCESS_TYPES, plant_topology
+
+# 표시 이름
+PROCESS_NAMES = {"anaerobic": "혐기조", "anoxic": "무산소조", "aerobic": "호기조"}
+SENSOR_LABELS = {"orp": "ORP", "ph": "pH", "do": "DO", "mlss": "MLSS"}
+
+
+def parameter_label(param: str) -> str:
+    """방류 파라미터 표시 이름 (tn → T-N)"""
+    return param.upper().replace("N", "-N").replace("P", "-P")
+
+
+class CompiledThresholds(NamedTuple):
+    """컴파일된 임계값 배열 (교체 시 객체 단위로 바꿔 읽는 쪽은 잠금 불필요)"""
+    version: int
+    process_lower: np.ndarray    # (지, 공종, 센서)
+    process_upper: np.ndarray    # (지, 공종, 센서)
+    effluent_lower: np.ndarray   # (파라미터,)
+    effluent_upper: np.ndarray   # (파라미터,)
+
+
+class ThresholdEngine:
+    """임계값 컴파일 및 벡터 평가"""
+
+    def __init__(self, zone_count: int, effluent_parameters: Sequence[str]):
+        self.zone_count = zone_count
+        self.effluent_parameters = list(effluent_parameters)
+        self.compiles = 0
+        self._fingerprint: Optional[str] = None
+        self.compiled: Optional[CompiledThresholds] = None
+
+    def compile(self, process_thresholds: Dict, effluent_thresholds: Dict) -> bool:
+        """
+        임계값 딕셔너리를 배열로 컴파일
+        내용이 이전과 같으면 아무것도 하지 않음 (재컴파일 시 True)
+        """
+        fingerprint = json.dumps([process_thresholds, effluent_thresholds], sort_keys=True, default=str)
+        if fingerprint == self._fingerprint:
+            return False
+
+        shape = (self.zone_count, len(PROCESS_TYPES), len(PROCESS_SENSORS))
+        process_lower = np.full(shape, np.nan)
+        process_upper = np.full(shape, np.nan)
+        for r_idx, process_type in enumerate(PROCESS_TYPES):
+            for s_idx, sensor in enumerate(PROCESS_SENSORS):
+                threshold = process_thresholds.get(process_type, {}).get(sensor) or {}
+                process_lower[:, r_idx, s_idx] = _bound(threshold.get("lower"))
+                process_upper[:, r_idx, s_idx] = _bound(threshold.get("upper"))
+
+        effluent_upper = np.array(
+            [_bound((effluent_thresholds.get(param) or {}).get("upper")) for param in self.effluent_parameters]
+        )
+        effluent_lower = np.full_like(effluent_upper, np.nan)
+
+        self.compiles += 1
+        self.compiled = CompiledThresholds(
+            self.compiles, process_lower, process_upper, effluent_lower, effluent_upper
+        )
+        self._fingerprint = fingerprint
+        return True
+
+    @property
+    def version(self) -> int:
+        return self.compiled.version if self.compiled is not None else 0
+
+    def evaluate_process(self, values: np.ndarray) -> np.ndarray:
+        """공종 측정값 (..., 지, 공종, 센서) → 이상 여부 마스크 (같은 shape)"""
+        compiled = self.compiled
+        return (values > compiled.process_upper) | (values < compiled.process_lower)
+
+    def process_status(self, values: np.ndarray) -> np.ndarray:
+        """공종 측정값 (..., 지, 공종, 센서) → 공종별 이상 여부 (..., 지, 공종)"""
+        return self.evaluate_process(values).any(axis=-1)
+
+    def evaluate_effluent(self, values: np.ndarray) -> np.ndarray:
+        """방류 측정/예측값 (..., 파라미터) → 이상 여부 마스크 (같은 shape)"""
+        compiled = self.compiled
+        return (values > compiled.effluent_upper) | (values < compiled.effluent_lower)
+
+
+def _bound(value) -> float:
+    """임계값 한쪽 경계 (없으면 NaN → 비교 결과 항상 False)"""
+    return np.nan if value is None else float(value)
+
+
+# 전역 인스턴스 (임계값 저장소가 생성 시 컴파일)
+threshold_engine = ThresholdEngine(
+    zone_count=plant_topology.zone_count,
+    effluent_parameters=list(settings.DEFAULT_EFFLUENT_THRESHOLDS.keys())
+)
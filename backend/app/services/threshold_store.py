@@ -0,0 +1,223 @@
+"""
+임계값 저장소
+버전이 붙은 읽기 전용 스냅샷을 통째로 교체하는 방식 (copy-on-write)
+- 읽기: 현재 스냅샷 참조 한 번 (잠금 없음, 디스크 접근 없음)
+- 쓰기: 잠금 안에서 새 딕셔너리를 만들어 병합 → SQLite에 버전 기록 → 평가 배열 재컴파일 → 스냅샷 교체
+- 시작 시 마지막 버전을 읽어 메모리에 적재, 변경 이력(누가/무엇을)은 버전별로 보관
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from app.config import settings
+from app.database import open_sqlite
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES, ThresholdEngine, threshold_engine
+
+
+class FrozenDict(dict):
+    """수정할 수 없는 딕셔너리 (JSON 직렬화는 일반 dict와 동일)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("임계값 스냅샷은 읽기 전용입니다.")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    """중첩 딕셔너리를 읽기 전용으로 변환"""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    return value
+
+
+def thaw(value):
+    """읽기 전용 딕셔너리를 수정 가능한 일반 딕셔너리로 복사"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    return value
+
+
+class ThresholdSnapshot(NamedTuple):
+    """임계값 스냅샷 (교체 단위)"""
+    version: int
+    process: FrozenDict
+    effluent: FrozenDict
+    lastUpdated: datetime
+    updatedBy: str
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threshold_versions (
+    version     INTEGER PRIMARY KEY,
+    category    TEXT NOT NULL,
+    changes     TEXT NOT NULL,
+    process     TEXT NOT NULL,
+    effluent    TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    updated_by  TEXT NOT NULL
+)
+"""
+
+
+class ThresholdStore:
+    """버전 관리되는 임계값 저장소 (open 전에는 메모리에서만 유지)"""
+
+    def __init__(self, engine: ThresholdEngine, process: Dict, effluent: Dict):
+        self.engine = engine
+        self._write_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._snapshot = self._publish(1, process, effluent, datetime.now(), "system")
+
+    def open(self, path: str):
+        """
+        저장소 파일 열기 및 마지막 버전 적재 (앱 시작 시 호출)
+        파일이 비어 있으면 현재(기본) 임계값을 1번 버전으로 기록
+        """
+        with self._write_lock:
+            conn = open_sqlite(path)
+            conn.execute(SCHEMA)
+            row = conn.execute(
+                "SELECT * FROM threshold_versions ORDER BY version DESC LIMIT 1"
+            ).fetchone()
+
+            if row is None:
+                current = self._snapshot
+                self._insert(conn, current, "all", {"process": current.process, "effluent": current.effluent})
+            else:
+                self._snapshot = self._publish(
+                    row["version"],
+                    json.loads(row["process"]),
+                    json.loads(row["effluent"]),
+                    datetime.fromisoformat(row["updated_at"]),
+                    row["updated_by"]
+                )
+            self._conn = conn
+
+    def close(self):
+        """저장소 파일 닫기 (앱 종료 시 호출)"""
+        with self._write_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def current(self) -> ThresholdSnapshot:
+        """현재 스냅샷 (잠금 없음)"""
+        return self._snapshot
+
+    def update(self, category: str, thresholds: Dict, updated_by: str) -> ThresholdSnapshot:
+        """
+        공종 또는 방류 임계값 병합 후 새 스냅샷 발행
+        센서(파라미터) 단위로 병합하므로 일부 항목만 보내도 나머지는 유지
+        잘못된 카테고리/항목/값은 ValueError
+        """
+        with self._write_lock:
+            current = self._snapshot
+            process, effluent = thaw(current.process), thaw(current.effluent)
+
+            if category == "process":
+                for process_type, sensors in thresholds.items():
+                    if process_type not in PROCESS_TYPES:
+                        raise ValueError(f"알 수 없는 공종입니다: {process_type}")
+                    if not isinstance(sensors, dict):
+                        raise ValueError(f"{process_type}: 센서별 임계값이 필요합니다.")
+                    for sensor, bounds in sensors.items():
+                        if sensor not in PROCESS_SENSORS:
+                            raise ValueError(f"알 수 없는 센서입니다: {process_type}.{sensor}")
+                        sensors_map = process.setdefault(process_type, {})
+                        sensors_map[sensor] = _bounds(sensors_map.get(sensor), bounds, f"{process_type}.{sensor}")
+            elif category == "effluent":
+                for param, bounds in thresholds.items():
+                    if param not in self.engine.effluent_parameters:
+                        raise ValueError(f"알 수 없는 방류 항목입니다: {param}")
+                    effluent[param] = _bounds(effluent.get(param), bounds, param)
+            else:
+                raise ValueError("잘못된 카테고리입니다.")
+
+            snapshot = ThresholdSnapshot(
+                current.version + 1, freeze(process), freeze(effluent), datetime.now(), updated_by
+            )
+            # 디스크 기록이 끝난 뒤에만 새 버전을 공개 (기록 실패 시 기존 스냅샷 유지)
+            if self._conn is not None:
+                self._insert(self._conn, snapshot, category, thresholds)
+            self._snapshot = self._publish(*snapshot)
+            return self._snapshot
+
+    def history(self, limit: int = 20) -> List[Dict]:
+        """변경 이력 (최신순, 버전별 변경 항목과 변경자)"""
+        with self._write_lock:
+            if self._conn is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT version, category, changes, updated_at, updated_by "
+                "FROM threshold_versions ORDER BY version DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+        return [
+            {
+                "version": row["version"],
+                "category": row["category"],
+                "changes": json.loads(row["changes"]),
+                "updatedAt": row["updated_at"],
+                "updatedBy": row["updated_by"]
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, snapshot: ThresholdSnapshot, category: str, changes: Dict):
+        """버전 1건 기록 (autocommit, 커밋 시 fsync)"""
+        conn.execute(
+            "INSERT INTO threshold_versions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                snapshot.version,
+                category,
+                json.dumps(changes, ensure_ascii=False),
+                json.dumps(snapshot.process, ensure_ascii=False),
+                json.dumps(snapshot.effluent, ensure_ascii=False),
+                snapshot.lastUpdated.isoformat(),
+                snapshot.updatedBy
+            )
+        )
+
+    def _publish(self, version: int, process: Dict, effluent: Dict, updated_at: datetime, updated_by: str) -> ThresholdSnapshot:
+        """평가 배열을 먼저 재컴파일한 뒤 스냅샷 생성"""
+        self.engine.compile(process, effluent)
+        return ThresholdSnapshot(version, freeze(process), freeze(effluent), updated_at, updated_by)
+
+
+def _bounds(current: Optional[Dict], bounds: Dict, name: str) -> Dict:
+    """기존 상한/하한에 새 값 병합 후 검증 (숫자만 허용, 하한 ≤ 상한)"""
+    if not isinstance(bounds, dict):
+        raise ValueError(f"{name}: 상한/하한 값이 필요합니다.")
+    bounds = {**(current or {}), **bounds}
+    result = {}
+    for key in ("upper", "lower"):
+        if bounds.get(key) is None:
+            continue
+        if isinstance(bounds[key], bool) or not isinstance(bounds[key], (int, float)):
+            raise ValueError(f"{name}.{key}: 숫자여야 합니다.")
+        result[key] = bounds[key]
+    if "upper" not in result:
+        raise ValueError(f"{name}: 상한값이 필요합니다.")
+    if "lower" in result and result["lower"] > result["upper"]:
+        raise ValueError(f"{name}: 하한값이 상한값보다 클 수 없습니다.")
+    return result
+
+
+# 전역 인스턴스 (기본 임계값)
+threshold_store = ThresholdStore(
+    engine=threshold_engine,
+    process=settings.DEFAULT_PROCESS_THRESHOLDS,
+    effluent=settings.DEFAULT_EFFLUENT_THRESHOLDS
+)
@@ -0,0 +1,120 @@
+"""
+시계열 수치 연산 (NumPy 벡터 연산)
+- 차트용 다운샘플링 (LTTB)
+- 시간 버킷 집계 (min/max/mean/percentile 등)
+"""
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+BASIC_STATISTICS = ("count", "sum", "min", "max", "mean", "std", "median")
+PERCENTILE_PATTERN = re.compile(r"^p(\d{1,2}(\.\d+)?|100)$")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+    선택된 포인트의 인덱스 배열을 반환 (첫/마지막 포인트는 항상 포함)
+
+    버킷 간에는 직전 선택 포인트에 의존하므로 버킷 단위로 순회하지만,
+    버킷 내부 삼각형 면적 계산은 벡터 연산으로 처리하여 비용이 출력 포인트 수에 비례
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 첫/마지막 포인트를 제외한 구간을 (threshold - 2)개 버킷으로 분할
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+
+    # 다음 버킷 평균점 (마지막 버킷은 마지막 포인트)
+    cum_x = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y, dtype=np.float64)))
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    avg_x = (cum_x[next_end] - cum_x[next_start]) / counts
+    avg_y = (cum_y[next_end] - cum_y[next_start]) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        # 삼각형 면적 (상수 1/2 생략)
+        area = np.abs(
+            (x[a] - avg_x[i]) * (bucket_y - y[a])
+            - (x[a] - bucket_x) * (avg_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def is_valid_statistic(name: str) -> bool:
+    """지원하는 통계 이름인지 확인 (기본 통계 또는 p0~p100 백분위)"""
+    return name in BASIC_STATISTICS or PERCENTILE_PATTERN.match(name) is not None
+
+
+def bucket_aggregate(
+    offsets: np.ndarray,
+    values: np.ndarray,
+    bucket_seconds: float,
+    statistics: List[str]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    시간 버킷별 통계 계산
+    - offsets: 기준 시각으로부터 경과 초, values: 측정값 (NaN은 제외)
+    - (버킷 시작 경과 초 배열, 통계 이름별 배열) 반환
+
+    (버킷, 값) 기준으로 한 번 정렬한 뒤 reduceat으로 버킷별 합계/최소/최대를,
+    정렬된 위치 보간으로 백분위를 계산하여 버킷 수만큼의 Python 반복이 없음
+    """
+    valid = ~np.isnan(values)
+    offsets, values = offsets[valid], values[valid]
+    if len(values) == 0:
+        return np.empty(0), {name: np.empty(0) for name in statistics}
+
+    bucket_idx = np.floor(offsets / bucket_seconds).astype(np.int64)
+    order = np.lexsort((values, bucket_idx))
+    buckets = bucket_idx[order]
+    sorted_values = values[order]
+
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    counts = np.diff(np.append(starts, len(sorted_values)))
+    sums = np.add.reduceat(sorted_values, starts)
+    means = sums / counts
+
+    result = {}
+    for name in statistics:
+        if name == "count":
+            result[name] = counts.astype(np.float64)
+        elif name == "sum":
+            result[name] = sums
+        elif name == "min":
+            result[name] = sorted_values[starts]
+        elif name == "max":
+            result[name] = sorted_values[starts + counts - 1]
+        elif name == "mean":
+            result[name] = means
+        elif name == "std":
+            squared = (sorted_values - np.repeat(means, counts)) ** 2
+            result[name] = np.sqrt(np.add.reduceat(squared, starts) / counts)
+        else:
+            q = 50.0 if name == "median" else float(name[1:])
+            result[name] = _sorted_percentile(sorted_values, starts, counts, q)
+
+    return buckets[starts] * bucket_seconds, result
+
+
+def _sorted_percentile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """버킷 내 정렬된 값에서 선형 보간 백분위 계산 (numpy.percentile 기본 방식과 동일)"""
+    position = starts + (q / 100.0) * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
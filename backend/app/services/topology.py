@@ -0,0 +1,186 @@
+"""
+처리장 구성 (처리장 → 지 → 공종별 설치 센서)
+선언형 구성(JSON)을 한 번 컴파일하여 배열 인덱스로 사용
+- 지 축: 모든 처리장의 지를 처리장 순서대로 이어 붙인 전역 지 인덱스 → 센서 배열 shape = (전체 지, 공종, 센서)
+- 처리장별 지 구간은 연속이므로 처리장 단위 조회/전송은 슬라이스
+- 설치 센서 마스크, 시뮬레이션 채널 번호, 지 표시 이름을 컴파일 시 한 번만 계산
+  (생성/임계값 평가/알림/통계/전송은 이 배열만 사용, 지별 Python 분기 없음)
+
+구성 파일 형식 (TOPOLOGY_PATH):
+    {"plants": [
+        {"id": "namhang", "name": "남항사업소", "zones": 5,
+         "sensors": {"anaerobic": {"orp": [1, 4], "ph": [4]},
+                     "anoxic": {"orp": "all", "ph": "all"},
+                     "aerobic": {"ph": "all", "do": "all", "mlss": [1, 4]}}},
+        {"id": "region", "name": "권역", "zones": 50, "count": 20, "sensors": {...}}
+    ]}
+    - sensors: 공종 → 센서 → 설치된 지 번호 목록 (처리장 내 1부터) 또는 "all"
+      (공종별로 SUPPORTED_SENSORS에 있는 센서만 설치 가능)
+    - count: 같은 구성의 처리장 반복 수 (id/name 뒤에 번호)
+"""
+import json
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+# 배열 축 순서
+PROCESS_TYPES = ("anaerobic", "anoxic", "aerobic")
+PROCESS_SENSORS = ("orp", "ph", "do", "mlss")
+
+# 공종별 설치 가능 센서 (측정 범위/시뮬레이션 동특성이 정의된 센서, data_generator.SENSOR_RANGES와 같은 구성)
+SUPPORTED_SENSORS = {
+    "anaerobic": ("orp", "ph"),
+    "anoxic": ("orp", "ph"),
+    "aerobic": ("ph", "do", "mlss"),
+}
+
+# 기본 설치 센서 (남항사업소: 혐기조 ORP 1지·4지, 혐기조 pH 4지, MLSS 1지·4지)
+DEFAULT_SENSORS = {
+    "anaerobic": {"orp": [1, 4], "ph": [4]},
+    "anoxic": {"orp": "all", "ph": "all"},
+    "aerobic": {"ph": "all", "do": "all", "mlss": [1, 4]},
+}
+
+
+def default_spec(zone_count: int) -> Dict:
+    """단일 처리장 기본 구성"""
+    return {"plants": [{"id": "namhang", "name": "남항사업소", "zones": zone_count, "sensors": DEFAULT_SENSORS}]}
+
+
+class Plant(NamedTuple):
+    """처리장 1개 (전역 지 인덱스 구간 [start, stop))"""
+    index: int
+    id: str
+    name: str
+    start: int
+    stop: int
+
+    @property
+    def zones(self) -> slice:
+        return slice(self.start, self.stop)
+
+
+class PlantTopology:
+    """컴파일된 처리장 구성"""
+
+    def __init__(self, spec: Dict):
+        plants = self._expand(spec)
+        if not plants:
+            raise ValueError("처리장 구성에 처리장이 없습니다.")
+
+        self.plants: List[Plant] = []
+        zone_plant, zone_number, installed = [], [], []
+        shape = (len(PROCESS_TYPES), len(PROCESS_SENSORS))
+        for p_idx, (plant_id, name, zones, sensors) in enumerate(plants):
+            start = len(zone_number)
+            self.plants.append(Plant(p_idx, plant_id, name, start, start + zones))
+            mask = np.zeros((zones,) + shape, dtype=bool)
+            for process_type, sensor_zones in sensors.items():
+                for sensor, zone_nums in sensor_zones.items():
+                    index = self._sensor_index(plant_id, process_type, sensor)
+                    if zone_nums == "all":
+                        mask[(slice(None),) + index] = True
+                        continue
+                    zone_nums = np.asarray(zone_nums, dtype=int)
+                    if ((zone_nums < 1) | (zone_nums > zones)).any():
+                        raise ValueError(f"{plant_id}: {process_type}/{sensor} 설치 지 번호가 범위를 벗어났습니다.")
+                    mask[(zone_nums - 1,) + index] = True
+            installed.append(mask)
+            zone_plant += [p_idx] * zones
+            zone_number += range(1, zones + 1)
+
+        self.plant_ids = [plant.id for plant in self.plants]
+        if len(set(self.plant_ids)) != len(self.plant_ids):
+            raise ValueError("처리장 id가 중복되었습니다.")
+
+        self.zone_count = len(zone_number)
+        self.zone_plant = np.array(zone_plant, dtype=np.int64)      # (지,) 처리장 인덱스
+        self.zone_number = np.array(zone_number, dtype=np.int64)    # (지,) 처리장 내 지 번호 (1부터)
+        self.installed = np.concatenate(installed)                  # (지, 공종, 센서)
+        self.multi_plant = len(self.plants) > 1
+
+        # 지 표시 이름 (단일 처리장은 "1지", 여러 처리장은 "남항사업소 1지")
+        if self.multi_plant:
+            self.zone_labels = [
+                f"{self.plants[p_idx].name} {number}지" for p_idx, number in zip(zone_plant, zone_number)
+            ]
+        else:
+            self.zone_labels = [f"{number}지" for number in zone_number]
+
+        # 채널 고유 번호 = (처리장 인덱스 << 32) | 처리장 내 (지, 공종, 센서) 평탄화 인덱스
+        # (처리장 추가/순서 변경 전까지 같은 채널은 같은 번호 → 같은 시뮬레이션 값)
+        local = (self.zone_number - 1)[:, None, None] * (shape[0] * shape[1]) + np.arange(shape[0] * shape[1]).reshape(shape)
+        self.channel_ids = (self.zone_plant.astype(np.uint64)[:, None, None] << np.uint64(32)) | local.astype(np.uint64)
+
+    @staticmethod
+    def _expand(spec: Dict) -> List[tuple]:
+        """처리장 반복(count) 전개 → (id, 이름, 지 수, 설치 센서) 목록"""
+        plants = []
+        for item in spec.get("plants", []):
+            zones = int(item.get("zones", 0))
+            if zones <= 0:
+                raise ValueError(f"{item.get('id')}: 지 수는 1 이상이어야 합니다.")
+            count = int(item.get("count", 1))
+            sensors = item.get("sensors", DEFAULT_SENSORS)
+            for k in range(count):
+                suffix = "" if count == 1 else f"-{k + 1}"
+                name = item.get("name", item["id"]) + ("" if count == 1 else f" {k + 1}")
+                plants.append((f"{item['id']}{suffix}", name, zones, sensors))
+        return plants
+
+    @staticmethod
+    def _sensor_index(plant_id: str, process_type: str, sensor: str) -> tuple:
+        if process_type not in PROCESS_TYPES or sensor not in PROCESS_SENSORS:
+            raise ValueError(f"{plant_id}: 알 수 없는 공종/센서입니다: {process_type}/{sensor}")
+        if sensor not in SUPPORTED_SENSORS[process_type]:
+            raise ValueError(f"{plant_id}: 설치할 수 없는 공종/센서입니다: {process_type}/{sensor}")
+        return PROCESS_TYPES.index(process_type), PROCESS_SENSORS.index(sensor)
+
+    def plant(self, plant_id: str) -> Optional[Plant]:
+        """처리장 id → 처리장 (없으면 None)"""
+        return next((plant for plant in self.plants if plant.id == plant_id), None)
+
+    def zone_indices(self, zone: str) -> List[int]:
+        """지 필터("all" 또는 전역 지 번호) → 전역 지 인덱스 목록"""
+        if zone == "all":
+            return list(range(self.zone_count))
+        zone_num = int(zone) if str(zone).isdigit() else 0
+        return [zone_num - 1] if 1 <= zone_num <= self.zone_count else []
+
+    def is_installed(self, zone_num: int, process_type: str, sensor: str) -> bool:
+        """전역 지 번호/공종/센서 설치 여부"""
+        if not 1 <= zone_num <= self.zone_count or process_type not in PROCESS_TYPES or sensor not in PROCESS_SENSORS:
+            return False
+        return bool(self.installed[zone_num - 1, PROCESS_TYPES.index(process_type), PROCESS_SENSORS.index(sensor)])
+
+    def describe(self) -> Dict:
+        """구성 요약 (/api/monitoring/topology)"""
+        return {
+            "zoneCount": self.zone_count,
+            "channelCount": int(self.installed.sum()),
+            "plants": [
+                {
+                    "id": plant.id,
+                    "name": plant.name,
+                    "zones": plant.stop - plant.start,
+                    "firstZone": plant.start + 1,
+                    "channels": int(self.installed[plant.zones].sum())
+                }
+                for plant in self.plants
+            ]
+        }
+
+
+def load_topology(path: Optional[str], zone_count: int) -> PlantTopology:
+    """구성 파일 로드 (경로가 없으면 기본 구성)"""
+    if not path:
+        return PlantTopology(default_spec(zone_count))
+    with open(path, encoding="utf-8") as f:
+        return PlantTopology(json.load(f))
+
+
+# 전역 인스턴스
+plant_topology = load_topology(settings.TOPOLOGY_PATH, settings.ZONE_COUNT)
@@ -0,0 +1,131 @@
+"""
+채널별 최근 추이 (스파크라인용 링 버퍼)
+지 × 공종 × 센서 채널의 최근 측정값을 고정 크기 NumPy 링에 보관 (이력 DB 조회 없이 메모리에서 읽음)
+- 시간을 TREND_RESOLUTION_SECONDS 버킷으로 나누고 버킷마다 마지막 스냅샷만 유지 (슬롯 = 버킷 번호 % 슬롯 수)
+- 링은 시작 시 한 번만 할당하고, 갱신은 해당 슬롯에 제자리 복사 (측정마다 할당 없음)
+- 측정이 없던 버킷은 슬롯의 버킷 번호가 달라서 조회 시 빈 값(None)으로 표시
+- 실시간 전송 루프(mock / ingest / replay)가 전송하는 스냅샷으로 채움
+"""
+import math
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+from app.services.topology import Plant, PlantTopology, plant_topology
+
+WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_window(text: str) -> float:
+    """"2h", "30m", "90s", "1d" 또는 초 숫자 → 초"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", text.lower())
+    if match is None:
+        raise ValueError(f"조회 구간 형식이 올바르지 않습니다: {text} (예: 2h, 30m, 90s)")
+    seconds = float(match.group(1)) * WINDOW_UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise ValueError("조회 구간은 0보다 커야 합니다.")
+    return seconds
+
+
+class TrendBuffer:
+    """채널 배열 링 버퍼 (버킷, 지, 공종, 센서)"""
+
+    def __init__(self, topology: PlantTopology, max_seconds: float, resolution_seconds: float):
+        self.topology = topology
+        self.resolution = resolution_seconds
+        self.capacity = max(int(math.ceil(max_seconds / resolution_seconds)), 1)
+        self.max_seconds = self.capacity * resolution_seconds
+
+        shape = (topology.zone_count, len(PROCESS_TYPES), len(PROCESS_SENSORS))
+        self.values = np.full((self.capacity,) + shape, np.nan)
+        self.bucket_ids = np.full(self.capacity, -1, dtype=np.int64)   # 슬롯에 들어 있는 버킷 번호
+        self.last_bucket: Optional[int] = None
+
+        # 응답 필드: 지별로 설치된 (공종, 센서) 채널
+        installed = topology.installed
+        self._zone_channels = [
+            [
+                (PROCESS_TYPES[r_idx], PROCESS_SENSORS[s_idx], r_idx, s_idx)
+                for r_idx, s_idx in zip(*np.nonzero(installed[z_idx]))
+            ]
+            for z_idx in range(topology.zone_count)
+        ]
+
+        self.updates = 0
+
+    def append(self, block: np.ndarray, timestamp: float):
+        """측정값 스냅샷 (지, 공종, 센서) 기록 (같은 버킷이면 덮어씀, 현재 버킷보다 오래된 스냅샷은 무시)"""
+        bucket = int(timestamp // self.resolution)
+        if self.last_bucket is not None and bucket < self.last_bucket:
+            return
+        slot = bucket % self.capacity
+        np.copyto(self.values[slot], block)
+        self.bucket_ids[slot] = bucket
+        self.last_bucket = bucket
+        self.updates += 1
+
+    def window(self, seconds: float, zones: slice = slice(None)) -> Dict:
+        """
+        마지막 기록 버킷까지 최근 seconds 구간 (버킷 시각순)
+        - start: 첫 버킷 시작 시각, step: 버킷 길이(초), 측정이 없던 버킷은 NaN
+        """
+        points = min(max(int(math.ceil(seconds / self.resolution)), 1), self.capacity)
+        if self.last_bucket is None:
+            return {"start": None, "values": self.values[:0, zones]}
+        buckets = np.arange(self.last_bucket - points + 1, self.last_bucket + 1)
+        slots = buckets % self.capacity
+        values = self.values[slots, zones]
+        values[self.bucket_ids[slots] != buckets] = np.nan
+        return {"start": float(buckets[0] * self.resolution), "values": values}
+
+    def describe(self, seconds: float, plant: Optional[Plant] = None) -> Dict:
+        """최근 추이 응답 (지 → 공종 → 센서 → 값 배열)"""
+        zones = slice(None) if plant is None else plant.zones
+        trend = self.window(seconds, zones)
+        values = np.round(trend["values"], 3)
+        series = np.where(np.isnan(values), None, values).transpose(1, 2, 3, 0).tolist()
+
+        labels = self.topology.zone_labels[zones]
+        channels = self._zone_channels[zones]
+        result = {
+            "window": seconds,
+            "step": self.resolution,
+            "points": len(values),
+            "start": datetime.fromtimestamp(trend["start"]).isoformat() if trend["start"] is not None else None,
+            "zones": [
+                {"zone": label, **_zone_series(zone_series, zone_channels)}
+                for label, zone_series, zone_channels in zip(labels, series, channels)
+            ]
+        }
+        if plant is not None:
+            result["plant"] = plant.id
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "resolutionSeconds": self.resolution,
+            "maxSeconds": self.max_seconds,
+            "updates": self.updates,
+            "bytes": self.values.nbytes + self.bucket_ids.nbytes
+        }
+
+
+def _zone_series(zone_series: List, zone_channels: List) -> Dict:
+    """지 1개의 설치 채널별 값 배열 (공종 → 센서 → 배열)"""
+    sections: Dict[str, Dict[str, List]] = {}
+    for process_type, sensor, r_idx, s_idx in zone_channels:
+        sections.setdefault(process_type, {})[sensor] = zone_series[r_idx][s_idx]
+    return sections
+
+
+# 전역 인스턴스
+trend_buffer = TrendBuffer(
+    topology=plant_topology,
+    max_seconds=settings.TREND_MAX_SECONDS,
+    resolution_seconds=settings.TREND_RESOLUTION_SECONDS
+)
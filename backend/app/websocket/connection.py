@@ -2,10 +2,22 @@
 WebSocket 실시간 통신
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List
+from typing import Dict, List, Optional
 import asyncio
 import json
+import time
+from datetime import datetime
+import numpy as np
+from app.config import settings
+from fastapi.concurrency import run_in_threadpool
+from app.services.alarm_engine import alarm_engine
 from app.services.data_generator import data_generator
+from app.services.ingest import ingest_pipeline
+from app.services.inference import inference_service
+from app.services.metrics import broadcast_seconds, client_queue_depth, generator_seconds, metrics_registry
+from app.services.replay import replay_producer
+from app.services.topology import Plant
+from app.services.trend import trend_buffer
 
 
 class ConnectionManager:
@@ -13,57 +25,193 @@ class ConnectionManager:
 
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.plants: Dict[WebSocket, Plant] = {}   # 처리장 구독 (없으면 전체 처리장)
+        self.pending: Dict[WebSocket, int] = {}    # 클라이언트별 진행 중인 전송 수 (느린 클라이언트 감지)
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, plant: Optional[Plant] = None):
         """클라이언트 연결"""
         await websocket.accept()
         self.active_connections.append(websocket)
+        if plant is not None:
+            self.plants[websocket] = plant
         print(f"✅ Client connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         """클라이언트 연결 해제"""
         self.active_connections.remove(websocket)
+        self.plants.pop(websocket, None)
         print(f"❌ Client disconnected. Total connections: {len(self.active_connections)}")
 
     async def broadcast(self, message: dict):
-        """모든 연결된 클라이언트에게 메시지 브로드캐스트"""
-        disconnected = []
+        """모든 연결된 클라이언트에게 메시지 브로드캐스트 (직렬화는 메시지당 한 번)"""
+        await self._send(list(self.active_connections), json.dumps(message, ensure_ascii=False), message["type"])
+
+    async def broadcast_zone_data(self, zone_data: dict):
+        """
+        지별 센서 데이터 브로드캐스트
+        처리장을 구독한 클라이언트에게는 해당 처리장 지만 전송 (처리장별로 한 번 직렬화)
+        """
+        started = time.perf_counter()
+        groups: Dict[Optional[Plant], List[WebSocket]] = {}
         for connection in self.active_connections:
+            groups.setdefault(self.plants.get(connection), []).append(connection)
+
+        for plant, connections in groups.items():
+            data = zone_data if plant is None else data_generator.plant_zone_data(zone_data, plant)
+            await self._send(connections, json.dumps({
+                "type": "zone_data_update",
+                "timestamp": zone_data["timestamp"],
+                "data": data
+            }, ensure_ascii=False))
+        broadcast_seconds.labels("zone_data_update").observe(time.perf_counter() - started)
+
+    async def _send(self, connections: List[WebSocket], text: str, kind: Optional[str] = None):
+        """연결 목록에 순서대로 전송 (kind를 주면 전체 전송 시간 기록)"""
+        started = time.perf_counter()
+        disconnected = []
+        for connection in connections:
+            depth = self.pending.get(connection, 0)
+            client_queue_depth.observe(depth)
+            self.pending[connection] = depth + 1
             try:
-                await connection.send_text(json.dumps(message, ensure_ascii=False))
+                await connection.send_text(text)
             except WebSocketDisconnect:
                 disconnected.append(connection)
             except Exception as e:
                 print(f"Error sending message: {e}")
                 disconnected.append(connection)
+            finally:
+                if self.pending.get(connection, 1) <= 1:
+                    self.pending.pop(connection, None)
+                else:
+                    self.pending[connection] -= 1
+        if kind is not None:
+            broadcast_seconds.labels(kind).observe(time.perf_counter() - started)
 
         # 연결이 끊긴 클라이언트 제거
         for conn in disconnected:
             if conn in self.active_connections:
                 self.active_connections.remove(conn)
+            self.plants.pop(conn, None)
 
 
 # 전역 ConnectionManager 인스턴스
 manager = ConnectionManager()
+metrics_registry.gauge("websocket_connections", "WebSocket 연결 수", lambda: len(manager.active_connections))
+metrics_registry.gauge(
+    "websocket_client_queue_depth_max", "클라이언트별 진행 중인 전송 수의 최댓값",
+    lambda: max(manager.pending.values(), default=0)
+)
+
+
+async def send_snapshot(websocket: WebSocket, plant: Optional[Plant] = None, trend_seconds: Optional[float] = None):
+    """
+    연결 직후 현재 상태 전송 (다음 주기 전송을 기다리지 않고 화면 구성)
+    - zoneData: 마지막으로 전송한 지별 센서 데이터 (아직 없으면 생략)
+    - trend: trend_seconds를 주면 채널별 최근 추이 (링 버퍼, DB 조회 없음)
+    """
+    data = {}
+    if data_generator.last_zone_block is not None:
+        zone_data = data_generator.zone_data(data_generator.last_zone_block)
+        data["zoneData"] = zone_data if plant is None else data_generator.plant_zone_data(zone_data, plant)
+    if trend_seconds is not None:
+        data["trend"] = trend_buffer.describe(trend_seconds, plant)
+    await manager._send([websocket], json.dumps({
+        "type": "snapshot",
+        "timestamp": datetime.now().isoformat(),
+        "data": data
+    }, ensure_ascii=False), "snapshot")
+
+
+async def push_thresholds_update(snapshot):
+    """임계값 변경 즉시 새 임계값과 현재 상태 재판정 결과 전송"""
+    await manager.broadcast({
+        "type": "thresholds_update",
+        "timestamp": snapshot.lastUpdated.isoformat(),
+        "data": {
+            "version": snapshot.version,
+            "process": snapshot.process,
+            "effluent": snapshot.effluent,
+            "updatedBy": snapshot.updatedBy,
+            "status": data_generator.evaluate_current_status()
+        }
+    })
+
+
+async def publish_alarm_events(events: list):
+    """알림 상태 전이 이벤트 기록 및 전송 (전이가 없으면 아무것도 하지 않음)"""
+    if not events:
+        return
+    await run_in_threadpool(alarm_engine.persist, events)
+    await manager.broadcast({
+        "type": "alert",
+        "timestamp": events[0]["timestamp"],
+        "data": {"alerts": events}
+    })
+
+
+async def publish_process_status(timestamp: Optional[float] = None):
+    """처리장 공종 현황 전송"""
+    started = time.perf_counter()
+    process_status = data_generator.generate_process_status(timestamp)
+    generator_seconds.labels("process_status_update").observe(time.perf_counter() - started)
+    await manager.broadcast({
+        "type": "process_status_update",
+        "timestamp": process_status["timestamp"],
+        "data": process_status
+    })
+
+
+async def publish_prediction(timestamp: Optional[float] = None) -> list:
+    """예측 데이터 전송 (예측 엔진 현재 상태 기준), 예측 알림 상태 전이 이벤트 반환"""
+    # 두 요청은 같은 예측 엔진 상태의 전체 시점 추론 1회를 공유
+    forecast, curves = await asyncio.gather(
+        inference_service.forecast([3]),
+        inference_service.forecast(settings.FORECAST_HORIZONS)
+    )
+    started = time.perf_counter()
+    prediction_data = data_generator.generate_prediction_data(hours=3, forecast=forecast)
+    prediction_data["curves"] = data_generator.generate_prediction_curves(
+        settings.FORECAST_HORIZONS, forecast=curves
+    )
+    generator_seconds.labels("prediction_update").observe(time.perf_counter() - started)
+    events = alarm_engine.update_effluent("prediction", np.round(forecast.predicted[:, 0], 1), now=timestamp)
+    await manager.broadcast({
+        "type": "prediction_update",
+        "timestamp": prediction_data["timestamp"],
+        "data": prediction_data
+    })
+    return events
 
 
 async def start_data_streaming():
-    """실시간 데이터 스트리밍 시작"""
+    """실시간 데이터 스트리밍 시작 (LIVE_SOURCE=replay이면 녹화 재생)"""
+    if settings.LIVE_SOURCE == "replay":
+        await start_replay_streaming()
+        return
+
+    # 예측 엔진 초기화 (REST 조회는 예측 엔진을 갱신하지 않으므로 첫 TMS 전송 전에도 예측 가능하도록)
+    data_generator.ensure_forecast_state()
     while True:
         # 5초마다 데이터 전송
         await asyncio.sleep(5)
+        events = []
 
-        # 지별 센서 데이터 업데이트
-        zone_data = data_generator.generate_zone_data()
-        await manager.broadcast({
-            "type": "zone_data_update",
-            "timestamp": zone_data["timestamp"],
-            "data": zone_data
-        })
+        # 지별 센서 데이터 업데이트 (수집 데이터 사용 시 start_ingest_streaming에서 전송)
+        if settings.LIVE_SOURCE == "mock":
+            started = time.perf_counter()
+            zone_data = data_generator.generate_zone_data()
+            generator_seconds.labels("zone_data_update").observe(time.perf_counter() - started)
+            trend_buffer.append(data_generator.last_zone_block, time.time())
+            events += alarm_engine.update_process(data_generator.last_zone_block)
+            await manager.broadcast_zone_data(zone_data)
 
         # TMS 데이터 업데이트 (10초마다)
         if asyncio.get_event_loop().time() % 10 < 5:
+            started = time.perf_counter()
             tms_data = data_generator.generate_tms_data()
+            generator_seconds.labels("tms_update").observe(time.perf_counter() - started)
+            events += alarm_engine.update_effluent("tms", data_generator.last_tms_values)
             await manager.broadcast({
                 "type": "tms_update",
                 "timestamp": tms_data["timestamp"],
@@ -72,29 +220,75 @@ async def start_data_streaming():
 
         # 처리장 공종 현황 업데이트 (15초마다)
         if asyncio.get_event_loop().time() % 15 < 5:
-            process_status = data_generator.generate_process_status()
-            await manager.broadcast({
-                "type": "process_status_update",
-                "timestamp": process_status["timestamp"],
-                "data": process_status
-            })
+            await publish_process_status()
 
         # 예측 데이터 업데이트 (30초마다)
         if asyncio.get_event_loop().time() % 30 < 5:
-            prediction_data = data_generator.generate_prediction_data()
-            await manager.broadcast({
-                "type": "prediction_update",
-                "timestamp": prediction_data["timestamp"],
-                "data": prediction_data
-            })
+            events += await publish_prediction()
+
+        # 알림 발생/해제 (상태가 바뀐 경우에만 전송)
+        await publish_alarm_events(events)
+
+
+async def start_ingest_streaming():
+    """수집된 측정값 전송 (바뀐 경우에만, 최소 INGEST_BROADCAST_INTERVAL_MS 간격으로 묶어서)"""
+    while True:
+        await asyncio.sleep(settings.INGEST_BROADCAST_INTERVAL_MS / 1000)
+        latest, events = ingest_pipeline.drain()
+
+        if latest is not None:
+            trend_buffer.append(latest, ingest_pipeline.last_reading)
+            started = time.perf_counter()
+            zone_data = data_generator.publish_zone_data(latest)
+            generator_seconds.labels("zone_data_update").observe(time.perf_counter() - started)
+            await manager.broadcast_zone_data(zone_data)
+
+        await publish_alarm_events(events)
+
+
+async def start_replay_streaming():
+    """
+    녹화 재생 데이터 전송 (녹화 시각 간격 ÷ REPLAY_SPEED)
+    센서/TMS 값이 바뀐 프레임만 전송, 통계·알림 판정은 녹화 시각 기준
+    전송이 일정을 따라가지 못하면 밀린 프레임은 합쳐서 한 번에 전송 (replay_producer.stats() 참고)
+    녹화 파일 오류 등으로 중단되면 사유를 기록 (GET /api/monitoring/replay의 error)
+    """
+    try:
+        async for frame in replay_producer.frames():
+            await _publish_replay_frame(frame)
+    except Exception as e:
+        replay_producer.fail(e)
+
+
+async def _publish_replay_frame(frame):
+    """재생 프레임 1개 전송 (이동 통계에는 이번 프레임에 기록된 채널만 반영)"""
+    events = []
+
+    if frame.sensors is not None:
+        data_generator.stats.update(frame.sensor_updates, frame.timestamp)
+        trend_buffer.append(frame.sensors, frame.timestamp)
+        events += alarm_engine.update_process(frame.sensors, now=frame.timestamp)
+        started = time.perf_counter()
+        zone_data = data_generator.publish_zone_data(frame.sensors, frame.timestamp)
+        generator_seconds.labels("zone_data_update").observe(time.perf_counter() - started)
+        await manager.broadcast_zone_data(zone_data)
+
+    # TMS는 모든 항목이 한 번 이상 기록된 뒤부터 전송
+    if frame.tms is not None and np.isfinite(frame.tms).all():
+        started = time.perf_counter()
+        tms_data = data_generator.tms_data(frame.tms, frame.timestamp)
+        generator_seconds.labels("tms_update").observe(time.perf_counter() - started)
+        events += alarm_engine.update_effluent("tms", frame.tms, now=frame.timestamp)
+        await manager.broadcast({
+            "type": "tms_update",
+            "timestamp": tms_data["timestamp"],
+            "data": tms_data
+        })
+
+    if frame.process_status:
+        await publish_process_status(frame.timestamp)
+
+    if frame.prediction and data_generator.forecaster.observations:
+        events += await publish_prediction(frame.timestamp)
 
-        # 알림 업데이트 (7초마다)
-        if asyncio.get_event_loop().time() % 7 < 5:
-            alerts = data_generator.generate_alerts(limit=10)
-            if alerts["alerts"]:
-                # 알림이 있을 때만 전송
-                await manager.broadcast({
-                    "type": "alert",
-                    "timestamp": alerts["alerts"][0]["timestamp"] if alerts["alerts"] else None,
-                    "data": alerts
-                })
+    await publish_alarm_events(events)
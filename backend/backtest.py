@@ -0,0 +1,69 @@
+"""
+예측 정확도 백테스트 실행 스크립트
+
+사용 예:
+    python backtest.py --days 30 --interval-minutes 10 --horizons 1,3,6
+    python backtest.py --input tms_2025.csv --workers 4 --json result.json
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from app.services.backtest import load_tms_series, run_backtest
+from app.services.data_generator import data_generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="방류수질 예측 백테스트")
+    parser.add_argument("--input", help="TMS CSV 파일 (timestamp, toc, ss, tn, tp). 생략 시 Mock 시계열 생성")
+    parser.add_argument("--days", type=int, default=30, help="생성할 시계열 기간 (일)")
+    parser.add_argument("--interval-minutes", type=float, default=10, help="생성할 시계열 측정 간격 (분)")
+    parser.add_argument("--horizons", default="1,3,6", help="예측 시점 (시간, 쉼표 구분)")
+    parser.add_argument("--workers", type=int, default=0, help="파라미터별 병렬 처리 프로세스 수 (0: 사용 안 함)")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    horizons = sorted({int(value) for value in args.horizons.split(",") if value.strip()})
+    thresholds = data_generator.effluent_thresholds
+    parameters = list(thresholds.keys())
+
+    if args.input:
+        offsets, series = load_tms_series(args.input, parameters)
+        source = args.input
+    else:
+        end_time = datetime.now()
+        offsets, series = data_generator.generate_historical_tms_series(
+            start_time=end_time - timedelta(days=args.days),
+            end_time=end_time,
+            step_seconds=args.interval_minutes * 60
+        )
+        source = f"mock ({args.days}일, {args.interval_minutes}분 간격)"
+
+    result = run_backtest(offsets, series, thresholds, horizons, workers=args.workers)
+
+    print("=" * 80)
+    print(f"[BACKTEST] {source}")
+    print(f"[STEPS] {result['steps']}  [FORECASTS] {result['forecasts']}  "
+          f"[THROUGHPUT] {result['forecastsPerSecond']} forecasts/s  [WORKERS] {result['workers']}")
+    print("=" * 80)
+    print(f"{'param':<6}{'h':>4}{'n':>8}{'MAE':>10}{'RMSE':>10}{'naive MAE':>12}{'exceed':>8}{'hit':>8}{'false':>8}")
+    for param_result in result["parameters"]:
+        for metric in param_result["horizons"]:
+            print(
+                f"{param_result['parameter'].upper():<6}{metric['horizon']:>4}{metric['samples']:>8}"
+                f"{_fmt(metric['mae']):>10}{_fmt(metric['rmse']):>10}{_fmt(metric['persistenceMae']):>12}"
+                f"{metric['exceedances']:>8}{_fmt(metric['hitRate']):>8}{_fmt(metric['falseAlarmRate']):>8}"
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json_path}")
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+if __name__ == "__main__":
+    main()
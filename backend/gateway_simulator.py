@@ -0,0 +1,116 @@
+"""
+현장 게이트웨이 시뮬레이터 (TCP 라인 프로토콜 수집 테스트/벤치마크)
+
+설치된 지별 센서 채널 전체의 측정값을 `지,공종,센서 값 시각` 줄로 만들어 수집 서버로 전송
+
+사용 예:
+    python gateway_simulator.py --rate 1000 --duration 60
+    python gateway_simulator.py --connections 4 --rate 0 --duration 10     # 최대 속도 벤치마크
+    python gateway_simulator.py --invalid-ratio 0.01 --duration 5          # 잘못된 줄 섞어 보내기
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+
+import numpy as np
+
+from app.config import settings
+from app.services.data_generator import SENSOR_RANGES, data_generator
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+
+
+def build_channels():
+    """설치된 채널 목록 (줄 머리말, 측정 하한, 상한)"""
+    prefixes, low, high = [], [], []
+    for z_idx, r_idx, s_idx in np.argwhere(data_generator.installed).tolist():
+        process_type, sensor = PROCESS_TYPES[r_idx], PROCESS_SENSORS[s_idx]
+        range_low, range_high, _ = SENSOR_RANGES[(process_type, sensor)]
+        prefixes.append(f"{z_idx + 1},{process_type},{sensor} ")
+        low.append(range_low)
+        high.append(range_high)
+    return prefixes, np.array(low), np.array(high)
+
+
+async def run_connection(args, prefixes, low, high, rate: float, report: dict):
+    """연결 1개: 전체 채널 스냅샷을 반복 전송"""
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    rng = np.random.default_rng()
+    values = rng.uniform(low, high)
+    started = time.perf_counter()
+    sent = 0
+
+    while time.perf_counter() - started < args.duration:
+        # 채널별 랜덤 워크 (측정 범위 안에서)
+        values = np.clip(values + rng.normal(0, (high - low) * 0.02), low, high)
+        timestamp = f" {time.time():.3f}\n"
+        lines = [prefix + f"{value:.2f}" + timestamp for prefix, value in zip(prefixes, values.tolist())]
+        if args.invalid_ratio > 0:
+            for idx in np.flatnonzero(rng.random(len(lines)) < args.invalid_ratio).tolist():
+                lines[idx] = "invalid line\n"
+
+        for offset in range(0, len(lines), args.batch):
+            writer.write("".join(lines[offset:offset + args.batch]).encode())
+            wait_started = time.perf_counter()
+            await writer.drain()
+            report["maxDrainMs"] = max(report["maxDrainMs"], (time.perf_counter() - wait_started) * 1000)
+        sent += len(lines)
+        report["lines"] += len(lines)
+
+        if rate > 0:
+            # 목표 속도보다 빠르면 대기
+            ahead = sent / rate - (time.perf_counter() - started)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main_async(args):
+    prefixes, low, high = build_channels()
+    report = {"lines": 0, "maxDrainMs": 0.0}
+    rate = args.rate / args.connections if args.rate > 0 else 0
+
+    print(f"[GATEWAY] tcp://{args.host}:{args.port}  channels={len(prefixes)}  "
+          f"connections={args.connections}  rate={args.rate or 'max'}/s  duration={args.duration}s")
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_connection(args, prefixes, low, high, rate, report) for _ in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - started
+
+    print(f"[SENT] {report['lines']:,} lines in {elapsed:.2f}s  ({report['lines'] / elapsed:,.0f} lines/s)  "
+          f"[MAX DRAIN] {report['maxDrainMs']:.1f} ms")
+
+    if args.stats_url:
+        # 서버 쪽 반영 결과 (그룹 커밋이 끝날 시간을 잠시 기다림)
+        await asyncio.sleep(0.5)
+        try:
+            with urllib.request.urlopen(args.stats_url, timeout=5) as response:
+                stats = json.load(response)
+            print(f"[SERVER] accepted={stats['accepted']:,}  rejected={stats['rejected']:,}  "
+                  f"commits={stats['store']['commits']:,}  pauses={stats['lineProtocol']['pauses']}")
+        except OSError as e:
+            print(f"[SERVER] 수집 현황 조회 실패: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="게이트웨이 라인 프로토콜 시뮬레이터")
+    parser.add_argument("--host", default="127.0.0.1", help="수집 서버 주소")
+    parser.add_argument("--port", type=int, default=settings.LINE_PROTOCOL_PORT, help="수집 서버 포트")
+    parser.add_argument("--connections", type=int, default=1, help="동시 연결 수")
+    parser.add_argument("--rate", type=float, default=1000, help="전체 목표 전송 속도 (줄/초, 0: 최대 속도)")
+    parser.add_argument("--duration", type=float, default=10, help="전송 시간 (초)")
+    parser.add_argument("--batch", type=int, default=500, help="한 번에 쓰는 줄 수")
+    parser.add_argument("--invalid-ratio", type=float, default=0, help="잘못된 줄 비율 (검증 테스트용)")
+    parser.add_argument(
+        "--stats-url", default=f"http://127.0.0.1:{settings.PORT}/api/ingest/stats",
+        help="전송 후 조회할 수집 현황 URL (빈 값이면 생략)"
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
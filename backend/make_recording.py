@@ -0,0 +1,92 @@
+"""
+녹화 파일 생성 (LIVE_SOURCE=replay 재생 테스트/부하 시험용)
+
+모의 데이터로 지정 구간의 센서/TMS 측정값을 녹화 형식(timestamp, zone, reactor, sensor, value)으로 저장
+확장자로 형식 결정 (.csv / .parquet / .ndjson)
+
+사용 예:
+    python make_recording.py --output data/day.parquet --hours 24
+    python make_recording.py --output data/burst.csv --hours 1 --interval 1      # 1초 간격
+    REPLAY_PATH=data/day.parquet REPLAY_SPEED=100 LIVE_SOURCE=replay python main.py
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+
+from app.services.data_generator import data_generator
+from app.services.replay import TMS_REACTOR
+from app.services.threshold_engine import PROCESS_SENSORS, PROCESS_TYPES
+
+
+def build_table(start: float, hours: float, interval: float, tms_interval: float) -> pa.Table:
+    """구간 측정값 → 녹화 형식 Arrow 테이블 (시각순)"""
+    times = start + np.arange(0, hours * 3600, interval)
+    z_idx, r_idx, s_idx = data_generator.installed.nonzero()
+    sensors = data_generator._generate_sensor_block(times)[:, z_idx, r_idx, s_idx]
+
+    tms_times = start + np.arange(0, hours * 3600, tms_interval)
+    params = data_generator.forecaster.parameters
+    tms = np.round(data_generator.simulation.sample(data_generator._tms_channels, tms_times), 1)
+
+    channels = len(z_idx)
+    timestamp = np.concatenate([np.repeat(times, channels), np.repeat(tms_times, len(params))])
+    order = np.argsort(timestamp, kind="stable")
+    zone = np.concatenate([np.tile(z_idx + 1, len(times)), np.zeros(len(tms_times) * len(params), dtype=np.int64)])
+    reactor = np.concatenate([
+        np.tile(np.array(PROCESS_TYPES)[r_idx], len(times)), np.full(len(tms_times) * len(params), TMS_REACTOR)
+    ])
+    sensor = np.concatenate([np.tile(np.array(PROCESS_SENSORS)[s_idx], len(times)), np.tile(params, len(tms_times))])
+    value = np.concatenate([sensors.reshape(-1), tms.reshape(-1)])
+
+    zone_mask = np.concatenate([np.zeros(sensors.size, dtype=bool), np.ones(tms.size, dtype=bool)])[order]
+    return pa.table({
+        "timestamp": pa.array(timestamp[order]),
+        "zone": pa.array(zone[order], mask=zone_mask),     # TMS 행은 지 없음
+        "reactor": pa.array(reactor[order]),
+        "sensor": pa.array(sensor[order]),
+        "value": pa.array(value[order])
+    })
+
+
+def write_table(table: pa.Table, path: str):
+    """확장자별 저장"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    elif extension == ".csv":
+        from pyarrow import csv
+        csv.write_csv(table, path)
+    elif extension in (".ndjson", ".jsonl"):
+        with open(path, "w", encoding="utf-8") as f:
+            for row in table.to_pylist():
+                f.write(json.dumps(row) + "\n")
+    else:
+        raise SystemExit(f"지원하지 않는 형식입니다: {extension} (csv / parquet / ndjson)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모의 데이터 녹화 파일 생성")
+    parser.add_argument("--output", required=True, help="저장할 파일 (.csv / .parquet / .ndjson)")
+    parser.add_argument("--start", help="시작 시각 (ISO 8601, 생략 시 지금부터 hours 전)")
+    parser.add_argument("--hours", type=float, default=1, help="녹화 구간 (시간)")
+    parser.add_argument("--interval", type=float, default=5, help="센서 측정 간격 (초)")
+    parser.add_argument("--tms-interval", type=float, default=10, help="TMS 측정 간격 (초)")
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else time.time() - args.hours * 3600
+    started = time.perf_counter()
+    table = build_table(start, args.hours, args.interval, args.tms_interval)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_table(table, args.output)
+    print(f"{args.output}: {table.num_rows:,} rows, {os.path.getsize(args.output) / 1e6:.1f} MB "
+          f"({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -75,6 +75,50 @@ def test_monitoring():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+    # 2-5. 처리장 구성
+    print("\n[2-5] 처리장 구성")
+    try:
+        response = requests.get(f"{BASE_URL}/api/monitoring/topology")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"지 {data['zoneCount']}개, 채널 {data['channelCount']}개")
+        for plant in data['plants']:
+            print(f"  - {plant['id']} ({plant['name']}): {plant['zones']}개 지")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+    # 2-6. 채널별 최근 추이
+    print("\n[2-6] 채널별 최근 추이")
+    try:
+        response = requests.get(f"{BASE_URL}/api/monitoring/trend?window=30m")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"구간: {data['window']}초, 간격: {data['step']}초, 포인트: {data['points']}개 (시작: {data['start']})")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+    # 2-7. 채널별 이동 통계
+    print("\n[2-7] 채널별 이동 통계")
+    try:
+        response = requests.get(f"{BASE_URL}/api/monitoring/stats")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"갱신 횟수: {data['updates']}회, 이상 채널: {len(data['anomalies'])}개")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+    # 2-8. 알림 발생/해제 이벤트
+    print("\n[2-8] 알림 발생/해제 이벤트")
+    try:
+        response = requests.get(f"{BASE_URL}/api/monitoring/alarm-events?limit=5")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"이벤트 개수: {len(data['events'])}개")
+        for event in data['events'][:3]:
+            print(f"  - {event['timestamp']} {event['state']} {event['message']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_prediction():
     """예측 API 테스트"""
     print_section("3. Prediction API")
@@ -90,6 +134,17 @@ def test_prediction():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+    print("\n[3-2] 다중 시점 예측")
+    try:
+        response = requests.get(f"{BASE_URL}/api/prediction/forecast?horizons=1,3,6")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"예측 시점: {data['horizons']}시간 후 (출처: {data['source']})")
+        for pred in data['predictions']:
+            print(f"  - {pred['parameter']}: {pred['current']} → {pred['predicted']} {pred['unit']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_history():
     """이력 조회 API 테스트"""
     print_section("4. History API")
@@ -133,6 +188,29 @@ def test_history():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+    # 4-3. 시간 버킷 집계
+    print("\n[4-3] 시간 버킷 집계")
+    try:
+        payload = {
+            "zone": "all",
+            "processType": "aerobic",
+            "sensor": "do",
+            "groupBy": ["zone"],
+            "startDateTime": (datetime.now() - timedelta(hours=24)).isoformat(),
+            "endDateTime": datetime.now().isoformat(),
+            "interval": "minute",
+            "bucket": "6h",
+            "statistics": ["min", "mean", "p95"]
+        }
+        response = requests.post(f"{BASE_URL}/api/history/aggregate", json=payload)
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"그룹: {len(data['groups'])}개, 버킷: {data['bucket']}")
+        for group in data['groups'][:2]:
+            print(f"  - {group['zone']}: 평균 DO {group['values']['mean']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_settings():
     """환경설정 API 테스트"""
     print_section("5. Settings API")
@@ -165,6 +243,53 @@ def test_settings():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_ingest():
+    """수집 API 테스트"""
+    print_section("6. Ingest API")
+
+    # 6-1. 측정값 수집 (LIVE_SOURCE=ingest가 아니면 409)
+    print("\n[6-1] 측정값 수집")
+    try:
+        now = datetime.now().timestamp()
+        payload = [
+            [now, 1, "aerobic", "do", 2.1],
+            [now, 1, "aerobic", "ph", 7.0],
+            [now, 1, "aerobic", "unknown", 1.0]
+        ]
+        response = requests.post(f"{BASE_URL}/api/ingest/readings", json=payload)
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        if response.status_code == 409:
+            print(f"수집 비활성: {data['detail']}")
+        else:
+            print(f"저장: {data['accepted']}건, 거부: {data['rejected']}건 {data['rejectedByReason']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+    # 6-2. 수집 현황
+    print("\n[6-2] 수집 현황")
+    try:
+        response = requests.get(f"{BASE_URL}/api/ingest/stats")
+        print(f"✅ Status: {response.status_code}")
+        data = response.json()
+        print(f"출처: {data['source']}, 수집 요청: {data['requests']}회, 저장: {data['accepted']}건")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_metrics():
+    """런타임 계측값 테스트"""
+    print_section("7. Metrics")
+
+    try:
+        response = requests.get(f"{BASE_URL}/metrics")
+        print(f"✅ Status: {response.status_code}")
+        names = sorted({line.split()[2] for line in response.text.splitlines() if line.startswith("# TYPE")})
+        print(f"계측 항목: {len(names)}개")
+        for name in names[:5]:
+            print(f"  - {name}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def main():
     """메인 테스트 실행"""
     print("=" * 80)
@@ -179,6 +304,8 @@ def main():
         test_prediction()
         test_history()
         test_settings()
+        test_ingest()
+        test_metrics()
 
         print_section("✅ 테스트 완료")
         print("모든 API가 정상 작동합니다!")
@@ -0,0 +1,137 @@
+"""
+세그먼트 압축 코덱 테스트 스크립트
+시각(delta-of-delta)/값(Gorilla XOR) 인코딩이 원본을 비트 단위로 그대로 복원하는지 확인
+(서버 없이 실행: python test_segments.py, pytest로도 실행 가능)
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from app.services.segments import (
+    SegmentRows, SegmentStore, decode_timestamps, decode_values, encode_timestamps, encode_values
+)
+
+SUBNORMAL = np.nextafter(0.0, 1.0)
+
+
+def print_section(title):
+    """섹션 제목 출력"""
+    print("\n" + "=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+
+
+def roundtrip_timestamps(ms: np.ndarray) -> np.ndarray:
+    stream = encode_timestamps(ms)
+    return decode_timestamps(np.frombuffer(stream, dtype=np.uint8), len(ms), int(ms[0]))
+
+
+def roundtrip_values(values: np.ndarray) -> np.ndarray:
+    stream, windows = encode_values(values)
+    return decode_values(np.frombuffer(stream, dtype=np.uint8), len(values), windows)
+
+
+def assert_same_bits(decoded: np.ndarray, values: np.ndarray):
+    """부호 있는 0, NaN까지 구분하도록 비트로 비교"""
+    assert decoded.view(np.uint64).tolist() == np.asarray(values, dtype=np.float64).view(np.uint64).tolist()
+
+
+def test_timestamps_regular():
+    """일정 간격 (delta-of-delta = 0)"""
+    ms = 1_700_000_000_000 + np.arange(4096, dtype=np.int64) * 5000
+    assert roundtrip_timestamps(ms).tolist() == ms.tolist()
+
+
+def test_timestamps_jittered():
+    """간격 흔들림, 같은 시각 반복, 긴 공백 (12비트/32비트/64비트 코드 모두 사용)"""
+    rng = np.random.default_rng(0)
+    steps = 1000 + rng.integers(-300, 300, 2000)
+    steps[::97] = 0
+    steps[500] = 86_400_000 * 30
+    steps[1500] = 2 ** 40
+    ms = 1_700_000_000_000 + np.cumsum(steps).astype(np.int64)
+    assert roundtrip_timestamps(ms).tolist() == ms.tolist()
+
+
+def test_timestamps_single():
+    """측정값 1건 (시각은 머리말만)"""
+    ms = np.array([1_700_000_000_123], dtype=np.int64)
+    assert roundtrip_timestamps(ms).tolist() == ms.tolist()
+
+
+def test_values_special():
+    """±0, ±inf, 비정규 수, NaN, 최대/최소 크기"""
+    values = np.array([
+        0.0, -0.0, 0.0, np.inf, -np.inf, SUBNORMAL, -SUBNORMAL, SUBNORMAL * 3,
+        np.nan, 1.0, np.finfo(np.float64).max, np.finfo(np.float64).tiny, -0.0
+    ])
+    assert_same_bits(roundtrip_values(values), values)
+
+
+def test_values_constant():
+    """같은 값 반복 (첫 값 이후는 창 없이 제어 코드만 기록)"""
+    values = np.full(4096, 7.25)
+    stream, windows = encode_values(values)
+    assert windows == 1
+    assert_same_bits(roundtrip_values(values), values)
+
+    zeros = np.zeros(100)
+    assert_same_bits(roundtrip_values(zeros), zeros)
+
+
+def test_values_sensor_like():
+    """센서처럼 천천히 변하는 값과 무작위 값"""
+    rng = np.random.default_rng(1)
+    smooth = np.round(3.0 + np.cumsum(rng.normal(0, 0.01, 4096)), 3)
+    noisy = rng.normal(0, 1e6, 4096)
+    assert_same_bits(roundtrip_values(smooth), smooth)
+    assert_same_bits(roundtrip_values(noisy), noisy)
+
+
+def test_segment_file_roundtrip():
+    """세그먼트 파일 봉인 → 구간 조회 (블록 분할, 채널 여러 개)"""
+    rng = np.random.default_rng(2)
+    count = 10_000
+    timestamp = 1_700_000_000 + np.sort(rng.integers(0, 86_400_000, count)) / 1000.0
+    zone = rng.integers(0, 3, count)
+    reactor = rng.integers(0, 3, count)
+    sensor = rng.integers(0, 4, count)
+    value = rng.normal(5, 2, count)
+    value[:4] = [0.0, -0.0, np.inf, SUBNORMAL]
+    rows = SegmentRows(timestamp, zone, reactor, sensor, value)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SegmentStore(directory, 86400)
+        store.open()
+        start = store.span_start(timestamp[0])
+        store.seal(start, rows)
+        assert os.path.exists(os.path.join(directory, f"{start}.seg"))
+
+        result = store.query(timestamp[0], timestamp[-1] + 1)
+        store.close()
+
+    expected = np.lexsort((value.view(np.uint64), sensor, reactor, zone, timestamp))
+    actual = np.lexsort((result.value.view(np.uint64), result.sensor, result.reactor, result.zone, result.timestamp))
+    assert len(result) == count
+    assert np.array_equal(result.timestamp[actual], timestamp[expected])
+    assert np.array_equal(result.zone[actual], zone[expected])
+    assert_same_bits(result.value[actual], value[expected])
+
+
+def main():
+    """메인 테스트 실행"""
+    print_section("세그먼트 압축 코덱 테스트")
+    failed = 0
+    for name, test in [(name, fn) for name, fn in globals().items() if name.startswith("test_")]:
+        try:
+            test()
+            print(f"✅ {name}: {test.__doc__ or ''}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {name}: 복원 값이 원본과 다릅니다.")
+    print_section("✅ 테스트 완료" if not failed else f"❌ 실패 {failed}건")
+
+
+if __name__ == "__main__":
+    main()